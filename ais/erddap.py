@@ -3,18 +3,33 @@ Helpers to build ERDDAP queries for AIS-like datasets.
 You will need to consult your ERDDAP instance for the datasetID and variable names.
 """
 from __future__ import annotations
-from urllib.parse import urlencode, urljoin
+from datetime import date, datetime, timezone
+from urllib.parse import quote, urljoin
 
-def build_erddap_url(base_url: str, dataset_id: str, constraints: dict, fmt: str = "csv") -> str:
+def _constraint(op: str, value) -> str:
+    # ERDDAP wants string values double-quoted; times (datetime/Timestamp values) and numbers go in bare
+    if isinstance(value, datetime):
+        value = value.astimezone(timezone.utc) if value.tzinfo else value
+        value = value.strftime("%Y-%m-%dT%H:%M:%SZ")
+    elif isinstance(value, date):
+        value = value.isoformat()
+    elif isinstance(value, str):
+        value = '"' + value.replace('"', '\\"') + '"'
+    return quote(f"{op}{value}", safe="")
+
+def build_erddap_url(base_url: str, dataset_id: str, constraints: dict, fmt: str = "csv",
+                     variables: list[str] | None = None) -> str:
     """
     Example:
       constraints = {
-        "time>=": "2025-01-01T00:00:00Z",
-        "time<=": "2025-01-08T00:00:00Z",
+        "time>=": pd.Timestamp("2025-01-01", tz="UTC"),   # datetimes go in bare, whatever the variable name
+        "time<=": pd.Timestamp("2025-01-08", tz="UTC"),
         "longitude>=": -97.6, "longitude<=": -97.2,
         "latitude>=": 27.7, "latitude<=": 27.9,
         "shiptype=": 80
       }
+    gives .../tabledap/<id>.csv?<variables>&time%3E%3D2025-01-01T00%3A00%3A00Z&...
     """
-    query = urlencode(constraints, doseq=True)
+    parts = [",".join(variables or [])] + [_constraint(op, v) for op, v in constraints.items()]
+    query = "&".join(parts)
     return urljoin(base_url.rstrip("/") + "/", f"erddap/tabledap/{dataset_id}.{fmt}?{query}")
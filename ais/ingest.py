@@ -0,0 +1,188 @@
+"""
+Chunked, concurrent AIS ingestion from an ERDDAP tabledap endpoint.
+
+- The [start, end) window (and optionally the bbox) is split into chunks small enough for one request.
+- Chunks are fetched concurrently with a bounded asyncio pool on top of one pooled requests.Session,
+  with exponential-backoff retries on connection errors, truncated bodies and 5xx/429 responses; a
+  chunk that still fails leaves no `.part` file behind.
+- CSV responses are parsed incrementally (pandas chunks over the streamed body) and written as typed
+  Parquet batches; `.parquet` responses are streamed straight to disk.
+- Every finished chunk lands atomically as <out_dir>/chunk-<id>.parquet, so a rerun only fetches the
+  chunks that are missing (resumable checkpoints).
+
+ERDDAP answers "no matching results" with HTTP 404; such chunks are written as empty files.
+"""
+from __future__ import annotations
+import argparse, asyncio, hashlib, os, time
+from dataclasses import dataclass
+from pathlib import Path
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.exceptions import ProtocolError
+
+from src.utils.metrics import count, run_log
+
+from .erddap import build_erddap_url
+
+RETRY_STATUS = {429, 500, 502, 503, 504}
+# Connection errors plus bodies cut off mid-stream (unparseable CSV/Parquet) are retried alike
+RETRY_ERRORS = (requests.RequestException, ProtocolError, pd.errors.ParserError, pa.ArrowInvalid)
+
+@dataclass(frozen=True)
+class Chunk:
+    start: pd.Timestamp
+    end: pd.Timestamp
+    bbox: tuple[float, float, float, float]  # lon_min, lat_min, lon_max, lat_max
+    lon_max_closed: bool = True   # False on internal tile edges (the neighbouring tile owns them)
+    lat_max_closed: bool = True
+
+    @property
+    def chunk_id(self) -> str:
+        key = f"{self.start.isoformat()}|{self.end.isoformat()}|{self.bbox}"
+        if not (self.lon_max_closed and self.lat_max_closed):
+            key += f"|{self.lon_max_closed}|{self.lat_max_closed}"
+        return f"{self.start:%Y%m%dT%H%M}-{hashlib.sha1(key.encode()).hexdigest()[:8]}"
+
+    def constraints(self, lon: str = "longitude", lat: str = "latitude", time_var: str = "time") -> dict:
+        # Half-open in time and on internal tile edges so adjacent chunks never return the same row twice
+        return {f"{time_var}>=": self.start, f"{time_var}<": self.end,
+                f"{lon}>=": self.bbox[0], f"{lon}{'<=' if self.lon_max_closed else '<'}": self.bbox[2],
+                f"{lat}>=": self.bbox[1], f"{lat}{'<=' if self.lat_max_closed else '<'}": self.bbox[3]}
+
+def split_window(start: str, end: str, bbox: tuple[float, float, float, float],
+                 time_step: str = "6h", tiles: int = 1) -> list[Chunk]:
+    """
+    Split [start, end) into `time_step` slices and the bbox into tiles × tiles cells; cells are
+    half-open on internal edges, only the outer bbox edges are inclusive.
+    """
+    t = pd.date_range(pd.Timestamp(start, tz="UTC"), pd.Timestamp(end, tz="UTC"), freq=time_step)
+    if t[-1] < pd.Timestamp(end, tz="UTC"):
+        t = t.append(pd.DatetimeIndex([pd.Timestamp(end, tz="UTC")]))
+    lons = np.linspace(bbox[0], bbox[2], tiles + 1)
+    lats = np.linspace(bbox[1], bbox[3], tiles + 1)
+    cells = [((float(lons[i]), float(lats[j]), float(lons[i + 1]), float(lats[j + 1])), i == tiles - 1, j == tiles - 1)
+             for i in range(tiles) for j in range(tiles)]
+    return [Chunk(t0, t1, *cell) for t0, t1 in zip(t[:-1], t[1:]) for cell in cells]
+
+def _session(pool_size: int) -> requests.Session:
+    s = requests.Session()
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+    s.mount("http://", adapter)
+    s.mount("https://", adapter)
+    return s
+
+def _csv_to_parquet(resp: requests.Response, tmp: Path, dtypes: dict[str, str], batch_rows: int) -> int:
+    """Stream an ERDDAP CSV body (header row + units row) into a Parquet file in batches."""
+    resp.raw.decode_content = True
+    writer, n = None, 0
+    try:
+        for df in pd.read_csv(resp.raw, skiprows=[1], chunksize=batch_rows, dtype=dtypes):
+            if "time" in df:
+                df["time"] = pd.to_datetime(df["time"], utc=True)
+            table = pa.Table.from_pandas(df, preserve_index=False)
+            if writer is None:
+                schema = pa.schema([pa.field(f.name, pa.string() if pa.types.is_null(f.type) else f.type)
+                                    for f in table.schema])
+                writer = pq.ParquetWriter(tmp, schema)
+            writer.write_table(table.cast(writer.schema))
+            n += len(df)
+    finally:
+        if writer is not None:
+            writer.close()
+    if writer is None:
+        pq.write_table(pa.table({}), tmp)
+    return n
+
+def _fetch_chunk(session: requests.Session, url: str, out: Path, fmt: str, dtypes: dict[str, str],
+                 batch_rows: int, retries: int, backoff: float, timeout: float) -> int:
+    tmp = out.with_suffix(".part")
+    for attempt in range(retries + 1):
+        try:
+            with session.get(url, stream=True, timeout=timeout) as resp:
+                if resp.status_code == 404 and b"no matching results" in resp.content.lower():
+                    pq.write_table(pa.table({}), tmp)
+                    n = 0
+                elif resp.status_code in RETRY_STATUS:
+                    raise requests.HTTPError(f"HTTP {resp.status_code}", response=resp)
+                else:
+                    resp.raise_for_status()
+                    if fmt == "parquet":
+                        with tmp.open("wb") as f:
+                            for block in resp.iter_content(1 << 20):
+                                f.write(block)
+                        n = pq.read_metadata(tmp).num_rows
+                    else:
+                        n = _csv_to_parquet(resp, tmp, dtypes, batch_rows)
+            tmp.replace(out)
+            return n
+        except RETRY_ERRORS as e:
+            status = getattr(getattr(e, "response", None), "status_code", None)
+            if attempt == retries or (status is not None and status not in RETRY_STATUS):
+                tmp.unlink(missing_ok=True)
+                raise
+            time.sleep(backoff * 2**attempt)
+    raise RuntimeError("unreachable")
+
+async def ingest(base_url: str, dataset_id: str, out_dir: str | Path, chunks: list[Chunk],
+                 variables: list[str] | None = None, extra_constraints: dict | None = None,
+                 fmt: str = "csv", max_concurrency: int = 4, retries: int = 3, backoff: float = 1.0,
+                 timeout: float = 300.0, batch_rows: int = 200_000,
+                 dtypes: dict[str, str] | None = None) -> dict[str, int]:
+    """
+    Fetch all `chunks` not already present in `out_dir`. Returns {chunk_id: rows} for the chunks
+    fetched in this call (skipped checkpoints are not listed).
+    """
+    out_dir = Path(out_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    dtypes = dtypes or {"mmsi": "string"}
+    todo = [c for c in chunks if not (out_dir / f"chunk-{c.chunk_id}.parquet").exists()]
+    sem = asyncio.Semaphore(max_concurrency)
+    session = _session(max_concurrency)
+
+    async def run(c: Chunk) -> tuple[str, int]:
+        url = build_erddap_url(base_url, dataset_id, {**c.constraints(), **(extra_constraints or {})},
+                               fmt=fmt, variables=variables)
+        async with sem:
+            n = await asyncio.to_thread(_fetch_chunk, session, url, out_dir / f"chunk-{c.chunk_id}.parquet",
+                                        fmt, dtypes, batch_rows, retries, backoff, timeout)
+        return c.chunk_id, n
+
+    try:
+        return dict(await asyncio.gather(*(run(c) for c in todo)))
+    finally:
+        session.close()
+
+def read_ingested(out_dir: str | Path, columns: list[str] | None = None) -> pd.DataFrame:
+    files = sorted(Path(out_dir).glob("chunk-*.parquet"))
+    tables = [pq.read_table(f, columns=columns) for f in files if pq.read_metadata(f).num_rows]
+    return pa.concat_tables(tables, promote_options="default").to_pandas() if tables else pd.DataFrame(columns=columns)
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--base-url", default=os.environ.get("ERDDAP_BASE_URL"))
+    ap.add_argument("--dataset-id", default=os.environ.get("AIS_DATASET_ID"))
+    ap.add_argument("--start", required=True)
+    ap.add_argument("--end", required=True)
+    ap.add_argument("--bbox", type=float, nargs=4, required=True, metavar=("LON_MIN", "LAT_MIN", "LON_MAX", "LAT_MAX"))
+    ap.add_argument("--time-step", default="6h")
+    ap.add_argument("--tiles", type=int, default=1)
+    ap.add_argument("--variables", nargs="*", default=None)
+    ap.add_argument("--format", default="csv", choices=["csv", "parquet"])
+    ap.add_argument("--concurrency", type=int, default=4)
+    ap.add_argument("--out", required=True, help="Output directory for chunk-*.parquet")
+    ap.add_argument("--run-log", default=None, help="Append timings/counters to this JSONL run log")
+    args = ap.parse_args()
+    chunks = split_window(args.start, args.end, tuple(args.bbox), args.time_step, args.tiles)
+    with run_log(args.run_log, step="ais_ingest", start=args.start, end=args.end):
+        done = asyncio.run(ingest(args.base_url, args.dataset_id, args.out, chunks, variables=args.variables,
+                                  fmt=args.format, max_concurrency=args.concurrency))
+        count("chunks_fetched", len(done))
+        count("ais_rows", sum(done.values()))
+    print(f"fetched {len(done)} chunks ({sum(done.values())} rows); {len(chunks) - len(done)} already on disk")
+
+if __name__ == "__main__":
+    main()
@@ -1,20 +1,132 @@
 """
-Compute simple AIS-derived features: counts of arrivals/departures port-by-port.
-In practice you'll parse AIS messages (or ERDDAP rows) and apply spatiotemporal joins to port polygons.
+Compute AIS-derived port features: per-vessel port calls (arrival, departure, dwell) and counts per port.
+
+`PortCallDetector` is a streaming engine:
+- points are prefiltered against the ports' overall bbox, then matched to port polygons with an STRtree;
+- in-port rows are sorted per vessel and split into visits with a vectorized shift: a new visit starts
+  when the vessel, or the port, changes, or when the gap since the vessel's previous in-port fix
+  exceeds `debounce` (short excursions / missing fixes are bridged);
+- chunks must arrive in time order; visits that can still be extended are carried over per vessel,
+  so memory is bounded by the chunk size plus the number of open visits.
 """
 from __future__ import annotations
-import geopandas as gpd
+from typing import TYPE_CHECKING
+import numpy as np
 import pandas as pd
-from shapely.geometry import Point
+
+from src.utils.metrics import count, stage
+
+if TYPE_CHECKING:  # geopandas/shapely are imported lazily; they dominate import time
+    import geopandas as gpd
+
+VISIT_COLUMNS = ["vessel", "port", "arrival", "departure", "dwell", "n_obs"]
 
 def load_ports(ports_geojson: str) -> gpd.GeoDataFrame:
+    import geopandas as gpd
     return gpd.read_file(ports_geojson)
 
+class PortCallDetector:
+    def __init__(self, ports_gdf: gpd.GeoDataFrame, name_col: str = "name", debounce: str = "2h",
+                 min_dwell: str = "0s", vessel_col: str = "mmsi", lon_col: str = "lon",
+                 lat_col: str = "lat", time_col: str = "time"):
+        import shapely
+        from shapely.strtree import STRtree
+        self.names = ports_gdf[name_col].to_numpy()
+        self.geoms = np.asarray(ports_gdf.geometry.values)
+        self.tree = STRtree(self.geoms)
+        self.bounds = shapely.total_bounds(self.geoms)
+        self.debounce = pd.Timedelta(debounce)
+        self.min_dwell = pd.Timedelta(min_dwell)
+        self.vessel_col, self.lon_col, self.lat_col, self.time_col = vessel_col, lon_col, lat_col, time_col
+        # Open visits; times are int64 ns since epoch (UTC)
+        self.open = pd.DataFrame({"vessel": pd.Series(dtype=object), "port": pd.Series(dtype=np.int64),
+                                  "t_first": pd.Series(dtype=np.int64), "t_last": pd.Series(dtype=np.int64),
+                                  "n_obs": pd.Series(dtype=np.int64)})
+        self.watermark = None
+        self.rows_seen = 0
+
+    def match_ports(self, lon: np.ndarray, lat: np.ndarray) -> np.ndarray:
+        """Index of the containing port per point, -1 outside every port."""
+        port = np.full(len(lon), -1, dtype=np.int64)
+        x0, y0, x1, y1 = self.bounds
+        cand = np.flatnonzero((lon >= x0) & (lon <= x1) & (lat >= y0) & (lat <= y1))
+        if cand.size:
+            import shapely
+            pts = shapely.points(lon[cand], lat[cand])
+            pt_idx, poly_idx = self.tree.query(pts, predicate="within")
+            # First matching port per point if polygons overlap
+            pt_idx, first = np.unique(pt_idx, return_index=True)
+            port[cand[pt_idx]] = poly_idx[first]
+        return port
+
+    def update(self, ais_df: pd.DataFrame) -> pd.DataFrame:
+        """Consume one time-ordered chunk; return the visits that are now closed."""
+        self.rows_seen += len(ais_df)
+        if len(ais_df) == 0:
+            return self._finish(pd.DataFrame(columns=VISIT_COLUMNS))
+        t = pd.to_datetime(ais_df[self.time_col], utc=True).dt.tz_localize(None)
+        t = t.to_numpy(dtype="datetime64[ns]").view(np.int64)
+        wm = int(t.max())
+        self.watermark = wm if self.watermark is None else max(self.watermark, wm)
+        port = self.match_ports(ais_df[self.lon_col].to_numpy(dtype=float), ais_df[self.lat_col].to_numpy(dtype=float))
+        inside = port >= 0
+        rows = pd.DataFrame({"vessel": ais_df[self.vessel_col].to_numpy()[inside], "port": port[inside],
+                             "t_first": t[inside], "t_last": t[inside], "n_obs": 1})
+        visits = self._visits(pd.concat([self.open, rows], ignore_index=True))
+        still_open = visits["t_last"] > self.watermark - self.debounce.value
+        self.open = visits[still_open].reset_index(drop=True)
+        return self._finish(visits[~still_open])
+
+    def flush(self) -> pd.DataFrame:
+        """Close and return every visit still open (end of stream)."""
+        out, self.open = self.open, self.open.iloc[0:0]
+        return self._finish(out)
+
+    def _visits(self, rows: pd.DataFrame) -> pd.DataFrame:
+        if rows.empty:
+            return self.open.iloc[0:0]
+        rows = rows.sort_values(["vessel", "t_first"], kind="stable").reset_index(drop=True)
+        v, p = rows["vessel"].to_numpy(), rows["port"].to_numpy()
+        first, last = rows["t_first"].to_numpy(), rows["t_last"].to_numpy()
+        new = np.ones(len(rows), dtype=bool)
+        new[1:] = (v[1:] != v[:-1]) | (p[1:] != p[:-1]) | ((first[1:] - last[:-1]) > self.debounce.value)
+        gid = np.cumsum(new) - 1
+        g = rows.groupby(gid, sort=False)
+        return pd.DataFrame({"vessel": g["vessel"].first(), "port": g["port"].first(),
+                             "t_first": g["t_first"].min(), "t_last": g["t_last"].max(),
+                             "n_obs": g["n_obs"].sum()}).reset_index(drop=True)
+
+    def _finish(self, visits: pd.DataFrame) -> pd.DataFrame:
+        if visits.empty:
+            return pd.DataFrame(columns=VISIT_COLUMNS)
+        out = pd.DataFrame({"vessel": visits["vessel"].to_numpy(),
+                            "port": self.names[visits["port"].to_numpy(dtype=np.int64)],
+                            "arrival": pd.to_datetime(visits["t_first"].to_numpy(), utc=True),
+                            "departure": pd.to_datetime(visits["t_last"].to_numpy(), utc=True)})
+        out["dwell"] = out["departure"] - out["arrival"]
+        out["n_obs"] = visits["n_obs"].to_numpy(dtype=np.int64)
+        return out[out["dwell"] >= self.min_dwell].reset_index(drop=True)
+
+def detect_port_calls(chunks, ports_gdf: gpd.GeoDataFrame, **kwargs) -> pd.DataFrame:
+    """Run `PortCallDetector` over an iterable of time-ordered AIS chunks."""
+    det = PortCallDetector(ports_gdf, **kwargs)
+    with stage("port_calls") as s:
+        parts = []
+        for c in chunks:
+            count("ais_rows", len(c))
+            parts.append(det.update(c))
+        parts.append(det.flush())
+        s["visits"] = sum(len(p) for p in parts)
+    parts = [p for p in parts if len(p)]
+    if not parts:
+        return pd.DataFrame(columns=VISIT_COLUMNS)
+    return pd.concat(parts, ignore_index=True).sort_values(["vessel", "arrival"]).reset_index(drop=True)
+
 def count_port_calls(ais_df: pd.DataFrame, ports_gdf: gpd.GeoDataFrame,
-                     lon_col: str = "lon", lat_col: str = "lat", time_col: str = "time") -> pd.DataFrame:
-    gdf = gpd.GeoDataFrame(ais_df.copy(), geometry=gpd.points_from_xy(ais_df[lon_col], ais_df[lat_col]), crs="EPSG:4326")
-    joined = gpd.sjoin(gdf, ports_gdf, how="inner", predicate="within")
-    # Very naive: treat each vesselId transition into a port polygon as a 'call'
-    joined = joined.sort_values([time_col])
-    counts = joined.groupby(["name"]).agg(calls=("geometry","count")).reset_index()
+                     lon_col: str = "lon", lat_col: str = "lat", time_col: str = "time",
+                     vessel_col: str = "mmsi", debounce: str = "2h") -> pd.DataFrame:
+    """Port calls (per-vessel visits) counted per port: columns name, calls."""
+    visits = detect_port_calls([ais_df], ports_gdf, debounce=debounce, vessel_col=vessel_col,
+                               lon_col=lon_col, lat_col=lat_col, time_col=time_col)
+    counts = visits.groupby("port").size().rename("calls").reset_index().rename(columns={"port": "name"})
     return counts
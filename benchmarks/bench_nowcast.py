@@ -0,0 +1,46 @@
+"""
+Nowcast engine vs looping `ewma` per tank.
+
+    python -m benchmarks.bench_nowcast --weeks 104 --tanks 1000 5000 20000
+
+Per-tank EWMA (one pandas `ewm` per series, the current pattern) against the vectorized
+local-level Kalman filter and filter+smoother over all series at once, on weekly series
+with ~30% missing acquisitions.
+"""
+from __future__ import annotations
+import argparse, time
+import numpy as np
+import pandas as pd
+
+from src.models.nowcast import ewma, kalman_filter, kalman_smoother
+
+def synthetic_series(weeks: int, tanks: int, seed: int = 0) -> np.ndarray:
+    rng = np.random.default_rng(seed)
+    y = 1e5 + np.cumsum(rng.normal(0, 2e3, (weeks, tanks)), axis=0) + rng.normal(0, 4e3, (weeks, tanks))
+    y[rng.random(y.shape) < 0.3] = np.nan
+    return y
+
+def _time(fn, repeat: int = 3) -> float:
+    best = np.inf
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - t0)
+    return best
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--weeks", type=int, default=104)
+    ap.add_argument("--tanks", type=int, nargs="+", default=[1000, 5000, 20000])
+    args = ap.parse_args()
+    print(f"{'tanks':>7} {'ewma loop':>11} {'kalman':>9} {'+smoother':>10} {'speedup':>8}")
+    for n in args.tanks:
+        y = synthetic_series(args.weeks, n)
+        df = pd.DataFrame(y)
+        loop = _time(lambda: [ewma(df[c].dropna()) for c in df.columns], repeat=1)
+        kf = _time(lambda: kalman_filter(y, 4e3**2, 2e3**2))
+        ks = _time(lambda: kalman_smoother(y, 4e3**2, 2e3**2))
+        print(f"{n:>7} {loop:>10.3f}s {kf:>8.3f}s {ks:>9.3f}s {loop / kf:>7.0f}x")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,44 @@
+"""
+Throughput benchmark for AIS port-call detection (rows/sec).
+
+    python -m benchmarks.bench_port_calls --rows 2000000 --chunk-rows 250000
+
+Compares the streaming `detect_port_calls` against the previous approach
+(GeoDataFrame copy + full sjoin + per-port count).
+"""
+from __future__ import annotations
+import argparse, time
+import geopandas as gpd
+import pandas as pd
+
+from ais.ports import detect_port_calls, load_ports
+from src.utils.synthetic import synthetic_ais
+
+def legacy_counts(ais_df: pd.DataFrame, ports: gpd.GeoDataFrame) -> pd.DataFrame:
+    gdf = gpd.GeoDataFrame(ais_df.copy(), geometry=gpd.points_from_xy(ais_df["lon"], ais_df["lat"]), crs="EPSG:4326")
+    joined = gpd.sjoin(gdf, ports, how="inner", predicate="within").sort_values(["time"])
+    return joined.groupby(["name"]).agg(calls=("geometry", "count")).reset_index()
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--ports", default="data/ports/ports.geojson")
+    ap.add_argument("--rows", type=int, default=2_000_000)
+    ap.add_argument("--chunk-rows", type=int, default=250_000)
+    args = ap.parse_args()
+    ports = load_ports(args.ports)
+    ais = synthetic_ais(tuple(ports.total_bounds), args.rows)
+
+    t0 = time.perf_counter()
+    legacy_counts(ais, ports)
+    legacy = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    chunks = (ais.iloc[i:i + args.chunk_rows] for i in range(0, len(ais), args.chunk_rows))
+    visits = detect_port_calls(chunks, ports)
+    engine = time.perf_counter() - t0
+    print(f"rows={len(ais):,}  visits={len(visits):,}")
+    print(f"legacy sjoin count : {len(ais) / legacy:>12,.0f} rows/s")
+    print(f"streaming engine   : {len(ais) / engine:>12,.0f} rows/s")
+
+if __name__ == "__main__":
+    main()
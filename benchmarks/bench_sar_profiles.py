@@ -0,0 +1,53 @@
+"""
+Benchmark: per-tank `annulus_azimuth_profile` loop vs batched `azimuth_profiles`.
+
+    python -m benchmarks.bench_sar_profiles --size 1024 --tanks 10 100 1000
+
+The per-tank loop costs a full-frame pass per tank, so for large N it is timed on the
+first --loop-limit tanks and scaled linearly (marked with '*').
+"""
+from __future__ import annotations
+import argparse, time
+import numpy as np
+
+from src.features.sar_double_bounce import annulus_azimuth_profile, azimuth_profiles
+
+def synthetic_scene(size: int, n_tanks: int, seed: int = 0):
+    rng = np.random.default_rng(seed)
+    img = rng.gamma(2.0, 0.25, size=(size, size)).astype("float32")
+    r_px = rng.choice([8.0, 12.0, 16.0, 20.0], size=n_tanks)
+    cx = rng.integers(0, size, size=n_tanks).astype(float)
+    cy = rng.integers(0, size, size=n_tanks).astype(float)
+    return img, np.column_stack([cx, cy, r_px])
+
+def bench(size: int, n_tanks: int, bins: int, loop_limit: int, repeat: int = 3) -> dict:
+    img, tanks = synthetic_scene(size, n_tanks)
+    m = min(n_tanks, loop_limit)
+    t0 = time.perf_counter()
+    for cx, cy, r in tanks[:m]:
+        annulus_azimuth_profile(img, cx, cy, r, 0.7, 1.1, bins)
+    loop_s = (time.perf_counter() - t0) * n_tanks / m
+
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        azimuth_profiles(img, tanks, 0.7, 1.1, bins)
+        best = min(best, time.perf_counter() - t0)
+    return {"n_tanks": n_tanks, "loop_s": loop_s, "batched_s": best,
+            "speedup": loop_s / best, "extrapolated": m < n_tanks}
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--size", type=int, default=1024, help="Scene is size x size pixels")
+    ap.add_argument("--tanks", type=int, nargs="+", default=[10, 100, 1000])
+    ap.add_argument("--bins", type=int, default=360)
+    ap.add_argument("--loop-limit", type=int, default=100)
+    args = ap.parse_args()
+    print(f"{'tanks':>6} {'loop_s':>10} {'batched_s':>10} {'speedup':>9}")
+    for n in args.tanks:
+        r = bench(args.size, n, args.bins, args.loop_limit)
+        star = "*" if r["extrapolated"] else " "
+        print(f"{n:>6} {r['loop_s']:>9.3f}{star} {r['batched_s']:>10.4f} {r['speedup']:>8.1f}x")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+"""
+Peak-RSS benchmark for per-tank profile extraction from a GeoTIFF scene.
+
+    python -m benchmarks.bench_scene_memory --sizes 2048 8192 --tanks 500
+
+Scene generation and each mode run in their own subprocess so ru_maxrss is isolated
+(Linux carries the high-water mark across fork/exec):
+  full     - decode the whole band, then `azimuth_profiles`
+  windowed - `scene_profiles` with rasterio windowed reads
+  memmap   - `scene_profiles` on a prebuilt uncompressed cache
+
+peak_rss includes clean file-backed pages the kernel maps around memmap faults (reclaimable
+page cache); anon_mb is the anonymous (heap) RSS at the end of the run.
+"""
+from __future__ import annotations
+import argparse, json, resource, subprocess, sys, tempfile, time
+from pathlib import Path
+import numpy as np
+
+def write_scene(path: Path, size: int, block: int = 512) -> None:
+    import rasterio
+    from rasterio.transform import from_origin
+    rng = np.random.default_rng(0)
+    with rasterio.open(path, "w", driver="GTiff", height=size, width=size, count=1, dtype="float32",
+                       crs="EPSG:32614", transform=from_origin(500_000, 4_000_000, 10, 10),
+                       tiled=True, blockxsize=block, blockysize=block, compress="deflate") as ds:
+        for r0 in range(0, size, block):
+            h = min(block, size - r0)
+            ds.write(rng.gamma(2.0, 0.25, size=(h, size)).astype("float32"), 1,
+                     window=((r0, r0 + h), (0, size)))
+
+def tank_px(size: int, n: int) -> np.ndarray:
+    rng = np.random.default_rng(1)
+    return np.column_stack([rng.integers(0, size, n), rng.integers(0, size, n), rng.choice([4.0, 5.5, 6.0], n)])
+
+def anon_rss_mb() -> float:
+    for line in Path("/proc/self/status").read_text().splitlines():
+        if line.startswith("RssAnon:"):
+            return int(line.split()[1]) / 1024
+    return float("nan")
+
+def run_mode(mode: str, tif: str, size: int, n: int) -> dict:
+    from src.features.sar_double_bounce import azimuth_profiles
+    from src.utils.scene import scene_profiles
+    tanks = tank_px(size, n)
+    t0 = time.perf_counter()
+    if mode == "full":
+        import rasterio
+        with rasterio.open(tif) as ds:
+            azimuth_profiles(ds.read(1), tanks)
+    elif mode == "windowed":
+        scene_profiles(tif, tanks)
+    else:
+        scene_profiles(tif, tanks, cache_path=Path(tif).with_suffix(".npy"))
+    return {"mode": mode, "size": size, "tanks": n, "seconds": time.perf_counter() - t0,
+            "peak_rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+            "anon_mb": anon_rss_mb()}
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--sizes", type=int, nargs="+", default=[2048, 8192])
+    ap.add_argument("--tanks", type=int, default=500)
+    ap.add_argument("--child", nargs=4, metavar=("MODE", "TIF", "SIZE", "TANKS"), help=argparse.SUPPRESS)
+    args = ap.parse_args()
+    if args.child and args.child[0] == "make":
+        from src.utils.scene import build_scene_cache
+        tif = Path(args.child[1])
+        write_scene(tif, int(args.child[2]))
+        build_scene_cache(tif, tif.with_suffix(".npy"))
+        return
+    if args.child:
+        mode, tif, size, n = args.child
+        print(json.dumps(run_mode(mode, tif, int(size), int(n))))
+        return
+
+    print(f"{'size':>6} {'mode':>9} {'seconds':>8} {'peak_rss_mb':>12} {'anon_mb':>8}")
+    with tempfile.TemporaryDirectory() as d:
+        for size in args.sizes:
+            tif = Path(d) / f"scene_{size}.tif"
+            for mode in ("make", "full", "windowed", "memmap"):
+                out = subprocess.run([sys.executable, "-m", "benchmarks.bench_scene_memory",
+                                      "--child", mode, str(tif), str(size), str(args.tanks)],
+                                     check=True, capture_output=True, text=True).stdout
+                if mode == "make":
+                    continue
+                r = json.loads(out)
+                print(f"{size:>6} {mode:>9} {r['seconds']:>8.3f} {r['peak_rss_mb']:>12.1f} {r['anon_mb']:>8.1f}")
+
+if __name__ == "__main__":
+    main()
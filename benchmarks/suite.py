@@ -0,0 +1,208 @@
+"""
+End-to-end benchmark suite on synthetic scenes with N tanks (src.utils.synthetic).
+
+    python -m benchmarks.suite --tanks 100 1000 5000 --history benchmarks/history.json
+    python -m benchmarks.suite --tanks 1000 --stages profiles arc_features --compare
+
+Stages (each timed separately, inputs prepared outside the timer):
+  profiles         windowed SAR azimuth profiles from a GeoTIFF scene   (tanks/s)
+  arc_features     batched arc features on those profiles                (tanks/s)
+  optical          batched shadow metrics from an optical GeoTIFF scene  (tanks/s)
+  quality_gate     quality pre-pass on a 4× decimated overview of that scene (tanks/s)
+  calibration      feature rows → height fraction → volume               (rows/s)
+  calibration_fit  robust per-tank lo/hi over 260 weeks of history       (rows/s)
+  aggregation      feature store week → site aggregate (aggregate_week)  (tanks/s)
+  port_calls       streaming port-call detection on synthetic AIS        (rows/s, 200 rows per tank)
+
+Per (stage, N) the best-of-`repeat` wall time, throughput and the tracemalloc peak (Python/NumPy
+heap of one extra untimed pass; GDAL's own cache is not included) are recorded, plus the log-log
+scaling slope of each stage over the N values. Every run is
+appended to a JSON history with the git commit and library versions; --compare checks the run
+against the previous one from the same machine and exits non-zero on regressions.
+"""
+from __future__ import annotations
+import argparse, json, platform, subprocess, sys, tempfile, time, tracemalloc
+from pathlib import Path
+import numpy as np
+import pandas as pd
+
+from src.utils.synthetic import synthetic_ais, synthetic_scene
+
+STAGES: dict[str, callable] = {}
+
+def stage(name: str):
+    """Register `setup(n, tmp) -> (run, items)`: `run()` is timed and processes `items` units."""
+    def deco(fn):
+        STAGES[name] = fn
+        return fn
+    return deco
+
+def _write_tif(path: Path, img: np.ndarray) -> str:
+    import rasterio
+    from rasterio.transform import from_origin
+    with rasterio.open(path, "w", driver="GTiff", height=img.shape[0], width=img.shape[1], count=1,
+                       dtype="float32", crs="EPSG:4326", transform=from_origin(-96.8, 36.0, 1e-4, 1e-4),
+                       tiled=True, blockxsize=256, blockysize=256) as ds:
+        ds.write(img, 1)
+    return str(path)
+
+def _features(n: int) -> pd.DataFrame:
+    rng = np.random.default_rng(n)
+    return pd.DataFrame({"tank_id": [f"tank_{i:06d}" for i in range(n)], "week": "2025-01-03",
+                         "radius_m": rng.uniform(15, 60, n), "roof_type": "floating",
+                         "peak_to_mean": rng.uniform(1.1, 2.7, n), "lo": 1.15, "hi": 2.6})
+
+@stage("profiles")
+def _profiles(n: int, tmp: Path):
+    from src.utils.scene import scene_profiles
+    img, tanks, _ = synthetic_scene(n, "sar")
+    tif = _write_tif(tmp / f"sar_{n}.tif", img)
+    return (lambda: scene_profiles(tif, tanks, 0.7, 1.1, 360)), n
+
+@stage("arc_features")
+def _arc_features(n: int, tmp: Path):
+    from src.features.sar_double_bounce import arc_features_batch, azimuth_profiles
+    img, tanks, _ = synthetic_scene(n, "sar")
+    prof = azimuth_profiles(img, tanks, 0.7, 1.1, 360)
+    return (lambda: arc_features_batch(prof)), n
+
+@stage("optical")
+def _optical(n: int, tmp: Path):
+    from src.utils.scene import scene_shadow_metrics
+    img, tanks, _ = synthetic_scene(n, "optical")
+    tif = _write_tif(tmp / f"optical_{n}.tif", img)
+    return (lambda: scene_shadow_metrics(tif, tanks)), n
+
+@stage("quality_gate")
+def _quality_gate(n: int, tmp: Path):
+    from src.utils.scene import METERS_PER_DEGREE, scene_quality
+    img, tanks, _ = synthetic_scene(n, "optical")
+    tif = _write_tif(tmp / f"optical_{n}.tif", img)
+    lon, lat = -96.8 + tanks[:, 0] * 1e-4, 36.0 - tanks[:, 1] * 1e-4
+    radius_m = tanks[:, 2] * 1e-4 * METERS_PER_DEGREE
+    return (lambda: scene_quality(tif, lon, lat, radius_m, decimate=4)), n
+
+@stage("calibration")
+def _calibration(n: int, tmp: Path):
+    from src.models.calibration import apply_to_dataframe
+    df = _features(n)
+    df["diameter_m"], df["shell_height_m"] = df["radius_m"] * 2, 18.0
+    return (lambda: apply_to_dataframe(df, "peak_to_mean", "lo", "hi", "diameter_m", "shell_height_m",
+                                       roof_type_col="roof_type")), n
+
+@stage("calibration_fit")
+def _calibration_fit(n: int, tmp: Path):
+    from src.models.calibration import fit_bounds
+    weeks = pd.date_range("2020-01-03", periods=260, freq="7D").strftime("%Y-%m-%d")
+    idx = np.random.default_rng(n).uniform(1.1, 2.7, n * len(weeks))
+    df = pd.DataFrame({"tank_id": np.repeat([f"tank_{i:06d}" for i in range(n)], len(weeks)),
+                       "week": np.tile(weeks, n), "peak_to_mean": idx})
+    return (lambda: fit_bounds(df)), len(df)
+
+@stage("aggregation")
+def _aggregation(n: int, tmp: Path):
+    from src.feature_store import write_features
+    from src.pipelines.aggregate_week import aggregate
+    from src.tanks import TankRegistry
+    df = _features(n)
+    store = tmp / f"store_{n}"
+    write_features(df, store, sensor="synthetic")
+    reg = TankRegistry.from_frame(df.assign(lon=-96.8, lat=36.0))
+    tanks = str(reg.save(tmp / f"tanks_{n}.npz"))
+    return (lambda: aggregate(str(store), tanks, str(tmp / f"agg_{n}.csv"), 18.0, week="2025-01-03")), n
+
+@stage("port_calls")
+def _port_calls(n: int, tmp: Path):
+    from ais.ports import detect_port_calls, load_ports
+    ports = load_ports("data/ports/ports.geojson")
+    ais = synthetic_ais(tuple(ports.total_bounds), 200 * n)
+    chunks = 250_000
+    return (lambda: detect_port_calls((ais.iloc[i:i + chunks] for i in range(0, len(ais), chunks)), ports)), len(ais)
+
+def measure(name: str, n: int, tmp: Path, repeat: int = 3) -> dict:
+    run, items = STAGES[name](n, tmp)
+    run()  # warm-up: imports, LUT caches, page cache
+    best = min(_timed(run) for _ in range(repeat))
+    tracemalloc.start()
+    run()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return {"stage": name, "n": n, "items": items, "seconds": best, "throughput": items / best,
+            "peak_mb": peak / 2**20}
+
+def _timed(run) -> float:
+    t0 = time.perf_counter()
+    run()
+    return time.perf_counter() - t0
+
+def environment() -> dict:
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True).stdout.strip()
+    except OSError:
+        commit = ""
+    return {"time": pd.Timestamp.now(tz="UTC").isoformat(), "commit": commit, "machine": platform.node(),
+            "python": platform.python_version(), "numpy": np.__version__, "pandas": pd.__version__}
+
+def load_history(path: str | Path) -> list[dict]:
+    path = Path(path)
+    return json.loads(path.read_text()) if path.exists() else []
+
+def append_history(path: str | Path, run: dict) -> None:
+    path = Path(path)
+    history = load_history(path) + [run]
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_suffix(".tmp")
+    tmp.write_text(json.dumps(history, indent=1))
+    tmp.replace(path)
+
+def compare(previous: dict, current: dict, tolerance: float = 1.25) -> list[str]:
+    """Stage/N results that got slower than `tolerance` × the previous run (same stage and N)."""
+    prev = {(r["stage"], r["n"]): r for r in previous["results"]}
+    out = []
+    for r in current["results"]:
+        p = prev.get((r["stage"], r["n"]))
+        if p is not None and r["seconds"] > tolerance * p["seconds"]:
+            out.append(f"{r['stage']} n={r['n']}: {p['seconds']:.4f}s -> {r['seconds']:.4f}s "
+                       f"({r['seconds'] / p['seconds']:.2f}x, commit {previous['env']['commit']} -> {current['env']['commit']})")
+    return out
+
+def run_suite(tanks: list[int], stages: list[str], repeat: int = 3) -> dict:
+    results = []
+    with tempfile.TemporaryDirectory() as tmp:
+        for name in stages:
+            for n in tanks:
+                r = measure(name, n, Path(tmp), repeat=repeat)
+                print(f"{name:>13} n={n:<7} {r['seconds']:>9.4f}s {r['throughput']:>14,.0f} items/s "
+                      f"peak {r['peak_mb']:>8.1f} MB", flush=True)
+                results.append(r)
+    return {"env": environment(), "results": results, "scaling": scaling(results)}
+
+def scaling(results: list[dict]) -> dict[str, float]:
+    """Log-log slope of seconds vs N per stage (1.0 = linear)."""
+    out = {}
+    for name, rs in pd.DataFrame(results).groupby("stage", sort=False):
+        if rs["n"].nunique() > 1:
+            out[name] = float(np.polyfit(np.log(rs["n"]), np.log(rs["seconds"]), 1)[0])
+    return out
+
+def main(argv: list[str] | None = None) -> int:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--tanks", type=int, nargs="+", default=[100, 1000, 5000])
+    ap.add_argument("--stages", nargs="+", default=list(STAGES), choices=list(STAGES))
+    ap.add_argument("--repeat", type=int, default=3)
+    ap.add_argument("--history", default="benchmarks/history.json")
+    ap.add_argument("--compare", action="store_true", help="Fail if slower than the last run on this machine")
+    ap.add_argument("--tolerance", type=float, default=1.25)
+    args = ap.parse_args(argv)
+    run = run_suite(args.tanks, args.stages, repeat=args.repeat)
+    previous = [h for h in load_history(args.history) if h["env"]["machine"] == run["env"]["machine"]]
+    append_history(args.history, run)
+    if args.compare and previous:
+        regressions = compare(previous[-1], run, args.tolerance)
+        for line in regressions:
+            print(f"REGRESSION {line}", file=sys.stderr)
+        return 1 if regressions else 0
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,11 +1,106 @@
 """
 Aggregate per-tank features/volumes into site totals.
+
+`WeeklyState` keeps a small JSON state next to the outputs so weeks can be added one at a time:
+the last per-tank volumes, per-week site totals, and the EWMA state of `models.nowcast.ewma`.
+Adding week N costs O(tanks in week N); re-adding a week with the same input fingerprint
+returns the stored row without recomputation.
 """
 from __future__ import annotations
+import hashlib, json
+from pathlib import Path
 import pandas as pd
 
+from .models.nowcast import ewma_update
+
 def sum_volumes(per_tank: pd.DataFrame, vol_col: str = "volume_bbl") -> float:
     return float(per_tank[vol_col].sum())
 
 def weekly_change(series: pd.Series) -> pd.Series:
     return series.diff()
+
+def input_fingerprint(*paths: str | Path, **params) -> str:
+    """
+    Cheap identity of a week's inputs: (name, size, mtime) of every file (recursively for
+    directories such as a feature-store partition) plus the aggregation parameters. Empty paths
+    (optional inputs that are not set) are skipped.
+    """
+    parts = []
+    for p in map(Path, filter(None, paths)):
+        files = sorted(f for f in p.rglob("*") if f.is_file()) if p.is_dir() else [p]
+        for f in files:
+            st = f.stat()
+            parts.append(f"{f}:{st.st_size}:{st.st_mtime_ns}")
+    parts += [f"{k}={params[k]}" for k in sorted(params)]
+    return hashlib.sha1("|".join(parts).encode()).hexdigest()
+
+class WeeklyState:
+    """
+    Running aggregation state persisted as JSON:
+      weeks:        {week: {total_volume_bbl, weekly_change_bbl, nowcast_ewma_bbl, num_tanks, fingerprint}}
+      last_volumes: {tank_id: volume_bbl} for the latest week
+      prev_volumes: the same for the week before it (so the latest week can be redone)
+      tanks:        cached {tank_id: radius_m} keyed by the tanks GeoJSON fingerprint
+    Weeks are appended in order; only the latest week may be recomputed with new inputs.
+    """
+    def __init__(self, path: str | Path, alpha: float = 0.5):
+        self.path = Path(path)
+        self.alpha = alpha
+        self.data = {"alpha": alpha, "weeks": {}, "last_volumes": {}, "prev_volumes": {}, "tanks": {}}
+        if self.path.exists():
+            self.data.update(json.loads(self.path.read_text()))
+            self.alpha = self.data["alpha"]
+
+    def save(self) -> None:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.path.with_suffix(".tmp")
+        tmp.write_text(json.dumps(self.data))
+        tmp.replace(self.path)
+
+    @property
+    def last_week(self) -> str | None:
+        return max(self.data["weeks"]) if self.data["weeks"] else None
+
+    def tank_radii(self, tanks_geojson: str | Path) -> pd.Series:
+        """radius_m by tank_id; the tanks file is only parsed when it changed."""
+        fp = input_fingerprint(tanks_geojson)
+        cached = self.data["tanks"]
+        if cached.get("fingerprint") != fp:
+            from .utils.scene import load_tanks
+            t = load_tanks(tanks_geojson)
+            cached = {"fingerprint": fp, "radius_m": dict(zip(t["tank_id"], t["radius_m"].astype(float)))}
+            self.data["tanks"] = cached
+        return pd.Series(cached["radius_m"], name="radius_m", dtype=float)
+
+    def lookup(self, week: str, fingerprint: str) -> dict | None:
+        row = self.data["weeks"].get(week)
+        if row is not None and row["fingerprint"] == fingerprint:
+            return {"week": week, **{k: v for k, v in row.items() if k != "fingerprint"}}
+        return None
+
+    def add_week(self, week: str, tank_ids, volumes, fingerprint: str) -> dict:
+        """
+        Fold one week's per-tank volumes into the state and return its site row:
+        week, total_volume_bbl, num_tanks, weekly_change_bbl, nowcast_ewma_bbl.
+        """
+        weeks = self.data["weeks"]
+        last = self.last_week
+        if last is not None and week < last:
+            # Older weeks (seen or not) would be chained onto the latest week as their previous one
+            raise ValueError(f"week {week} precedes the latest aggregated week {last}; rebuild the state")
+        if week == last:
+            # Redo the latest week on top of the week before it
+            del weeks[week]
+            self.data["last_volumes"] = self.data["prev_volumes"]
+        prev = weeks.get(self.last_week) if self.last_week else None
+
+        # One volume per tank: a tank seen in several scenes of the week counts once (their mean)
+        vols = pd.Series(list(volumes), index=list(tank_ids), dtype=float).groupby(level=0, sort=False).mean()
+        total = float(vols.sum())
+        change = total - prev["total_volume_bbl"] if prev else float("nan")
+        nowcast = ewma_update(prev["nowcast_ewma_bbl"] if prev else None, total, self.alpha)
+        weeks[week] = {"total_volume_bbl": total, "num_tanks": int(len(vols)),
+                       "weekly_change_bbl": change, "nowcast_ewma_bbl": nowcast, "fingerprint": fingerprint}
+        self.data["prev_volumes"] = self.data["last_volumes"]
+        self.data["last_volumes"] = vols.to_dict()
+        return self.lookup(week, fingerprint)
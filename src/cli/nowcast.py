@@ -1,39 +1,83 @@
 """
 Typer CLI to glue pieces together. Includes a demo that synthesizes a circular tank ROI
 with a bright arc to validate SAR features without external data.
+
+Only typer is imported at startup; numpy, pydantic, rich and the feature modules are imported
+inside the commands that use them (tests/test_import_time.py enforces the budget).
+
+Global options (before the command):
+  --run-log PATH     append stage timings/counters of the command to a JSONL run log (src.utils.metrics)
+  --profile KIND     "cprofile" (pstats dump) or "pyinstrument" (HTML report, if installed)
+  --profile-out PATH where the profile goes (default: nowcast.prof / nowcast.html)
 """
 from __future__ import annotations
-import typer, numpy as np
-from rich import print
-from ..config import load_config
-from ..features.sar_double_bounce import annulus_azimuth_profile, arc_features
-from ..features.optical_shadow import shadow_metrics
+import typer
 
 app = typer.Typer(help="Cushing free-data pipeline CLI")
 
+def _start_profiler(kind: str, out: str | None):
+    """Start a profiler; returns a callable that stops it and writes the report to `out`."""
+    if kind == "cprofile":
+        import cProfile
+        prof = cProfile.Profile()
+        prof.enable()
+        def stop():
+            prof.disable()
+            prof.dump_stats(out or "nowcast.prof")
+        return stop
+    if kind == "pyinstrument":
+        try:
+            from pyinstrument import Profiler
+        except ImportError:
+            raise typer.BadParameter("pyinstrument is not installed (pip install pyinstrument)", param_hint="--profile")
+        prof = Profiler()
+        prof.start()
+        def stop():
+            prof.stop()
+            with open(out or "nowcast.html", "w", encoding="utf-8") as f:
+                f.write(prof.output_html())
+        return stop
+    raise typer.BadParameter(f"unknown profiler {kind!r} (cprofile, pyinstrument)", param_hint="--profile")
+
+@app.callback()
+def main(ctx: typer.Context, run_log: str = typer.Option(None, help="Append stage timings to this JSONL run log"),
+         profile: str = typer.Option(None, help="Profile the command: cprofile or pyinstrument"),
+         profile_out: str = typer.Option(None, help="Profile output path")):
+    if profile:
+        ctx.call_on_close(_start_profiler(profile, profile_out))
+    if run_log:
+        from ..utils.metrics import run_log as _run_log
+        ctx.with_resource(_run_log(run_log, step=ctx.invoked_subcommand or ""))
+
 @app.command()
 def validate_config(path: str = "config/default.yaml"):
+    from rich import print
+    from ..config import load_config
     cfg = load_config(path)
     print("[green]Loaded config[/green]:", cfg.model_dump())
 
+@app.command()
+def export_csv(table: str, out: str):
+    """
+    Write an Arrow IPC pipeline table (e.g. site_aggregate.arrow) as CSV.
+    """
+    from ..interchange import export_csv as _export
+    _export(table, out)
+
 @app.command()
 def demo_sar_arc(radius_px: int = 50, peak_angle_deg: float = 45.0, noise: float = 0.1):
     """
     Create a synthetic tank disk with a bright semicircular arc and compute arc features.
     """
+    import numpy as np
+    from rich import print
+    from ..features.sar_double_bounce import annulus_azimuth_profile, arc_features
+    from ..utils.synthetic import paint_sar_tank
     H = W = 2*radius_px + 20
     cx = cy = H//2
-    y,x = np.indices((H,W))
-    dist2 = (x-cx)**2 + (y-cy)**2
-    img = np.random.normal(0.5, noise, size=(H,W)).astype("float32")
-    disk = dist2 <= radius_px**2
-    img[~disk] = 0.0
-
-    # Paint a bright arc at given azimuth (thick near rim)
-    r_in = int(radius_px*0.8); r_out = int(radius_px*1.05)
-    theta = (np.degrees(np.arctan2(-(y-cy), (x-cx))) + 360) % 360
-    arc_mask = (dist2 >= r_in**2) & (dist2 <= r_out**2) & (np.abs(((theta - peak_angle_deg + 180) % 360) - 180) < 25)
-    img[arc_mask] += 0.5  # brighten
+    img = np.zeros((H, W), dtype="float32")
+    # Noisy roof disk plus a bright arc at the given azimuth (thick near rim)
+    paint_sar_tank(img, cx, cy, radius_px, peak_angle_deg=peak_angle_deg, noise=noise)
 
     prof = annulus_azimuth_profile(img, cx, cy, r_px=radius_px, r_in_frac=0.7, r_out_frac=1.1, azimuth_bins=360)
     feats = arc_features(prof)
@@ -44,18 +88,15 @@ def demo_optical_shadow(radius_px: int = 50, dark_frac: float = 0.3, noise: floa
     """
     Create a synthetic optical tank crop with a dark (shadow-like) sector.
     """
+    import numpy as np
+    from rich import print
+    from ..features.optical_shadow import shadow_metrics
+    from ..utils.synthetic import paint_shadow_tank
     H = W = 2*radius_px + 20
     cx = cy = H//2
-    y,x = np.indices((H,W))
-    dist2 = (x-cx)**2 + (y-cy)**2
-    img = np.random.normal(0.6, noise, size=(H,W)).astype("float32")
-    disk = dist2 <= radius_px**2
-    img[~disk] = 1.0
-
-    # Darken a wedge to simulate shadow
-    theta = (np.degrees(np.arctan2(-(y-cy), (x-cx))) + 360) % 360
-    wedge = (dist2 <= radius_px**2) & (theta>300) | ((theta<20) & (dist2 <= radius_px**2))
-    img[wedge] -= 0.3
+    img = np.ones((H, W), dtype="float32")
+    # Noisy roof disk with a darkened wedge to simulate shadow
+    paint_shadow_tank(img, cx, cy, radius_px, start_deg=300.0, end_deg=20.0, noise=noise)
 
     m = shadow_metrics(img, cx, cy, r_px=radius_px, threshold="otsu")
     print("[cyan]Shadow metrics[/cyan]:", m)
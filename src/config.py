@@ -28,15 +28,63 @@ class SarArc(BaseModel):
     annulus_inner_frac: float = 0.7
     annulus_outer_frac: float = 1.1
     azimuth_bins: int = 360
+    # Quality pre-pass on a decimated overview (src.features.quality); 0 disables a check
+    min_quality: float = 0.0                # valid fraction of the tank disk
+    min_contrast: float = 0.0               # brightest disk pixel / scene median
+    overview_decimation: int = 4
 
 class OpticalShadow(BaseModel):
     threshold: str | float = "otsu"
-    min_quality: float = 0.6
+    min_quality: float = 0.6                # clear (SCL) / valid fraction of the tank disk; below: skipped
+    min_contrast: float = 0.0
+    overview_decimation: int = 4
 
 class FeatureConfig(BaseModel):
     sar_arc: SarArc = SarArc()
     optical_shadow: OpticalShadow = OpticalShadow()
 
+class NowcastConfig(BaseModel):
+    # Local-level Kalman nowcast; noise standard deviations as fractions of each tank's capacity
+    process_sd_frac: float = 0.05           # level drift per week
+    sensor_sd_frac: dict[str, float] = Field(default_factory=lambda: {
+        "s1": 0.08, "s2": 0.12, "landsat": 0.15, "synthetic": 0.05})
+    default_sd_frac: float = 0.15           # sensors missing from sensor_sd_frac
+    z: float = 1.96                         # band half-width in standard deviations
+
+class CalibrationConfig(BaseModel):
+    # Per-tank lo/hi fitted from the feature history (models.calibration.fit_bounds)
+    index_col: str = "peak_to_mean"
+    q_lo: float = 0.05                      # lo/hi quantiles of the kept history
+    q_hi: float = 0.95
+    mad_k: float = 4.0                      # reject rows beyond mad_k robust SDs of the tank median
+    min_obs: int = 8                        # fewer kept rows: keep the feature rows' own lo/hi
+    window_weeks: int = 156                 # trailing history used per fit
+
+class ProviderConfig(BaseModel):
+    # One searchable imagery source (src.data.catalog); kind "asf" (S1 search API) or "stac"
+    kind: str = "stac"
+    url: str
+    collection: Optional[str] = None        # stac only
+    asset: Optional[str] = None             # stac only: asset key downloaded per item
+    mask_asset: Optional[str] = None        # stac only: sidecar saved as <item>_SCL (e.g. S2 "scl")
+    max_concurrency: int = 4                # parallel downloads from this provider
+
+class AcquisitionConfig(BaseModel):
+    # Scene search cache + download cache (src.pipelines.acquire_week)
+    catalog: str = "data/catalog.sqlite"
+    catalog_max_age_days: Optional[float] = None   # None: cached searches never expire by age
+    catalog_settle_days: Optional[float] = 3.0     # re-search windows cached < this long after they ended
+    cache_dir: str = "data/cache"
+    quota_gb: Optional[float] = None        # LRU eviction above this; None: unbounded
+    retries: int = 3
+    hyp3_url: str = "https://hyp3-api.asf.alaska.edu"
+    providers: dict[str, ProviderConfig] = Field(default_factory=lambda: {
+        "s1": ProviderConfig(kind="asf", url="https://api.daac.asf.alaska.edu/services/search/param"),
+        "s2": ProviderConfig(url="https://earth-search.aws.element84.com/v1", collection="sentinel-2-l2a",
+                             asset="red", mask_asset="scl", max_concurrency=8),
+        "landsat": ProviderConfig(url="https://landsatlook.usgs.gov/stac-server", collection="landsat-c2l2-sr",
+                                  asset="red", max_concurrency=8)})
+
 class AISConfig(BaseModel):
     erddap_base_url: str
     dataset_id: str
@@ -52,6 +100,9 @@ class RootConfig(BaseModel):
     areas: dict[str, AreaConfig]
     sensors: Sensors = Sensors()
     features: FeatureConfig = FeatureConfig()
+    nowcast: NowcastConfig = NowcastConfig()
+    calibration: CalibrationConfig = CalibrationConfig()
+    acquisition: AcquisitionConfig = AcquisitionConfig()
     ais: AISConfig
 
 def load_config(path: str = "config/default.yaml") -> RootConfig:
@@ -0,0 +1,142 @@
+"""
+Lazy (time, y, x) scene cube over an AOI and per-tank azimuth profile histories as a dask reduction.
+
+- `open_cube`: every RTC GeoTIFF is opened lazily with rioxarray (dask chunks of `chunk` pixels),
+  clipped to the AOI bounding box and stacked along time (acquisition time parsed from the file
+  name). Scenes must share a CRS and pixel grid (e.g. RTC products of one frame); differing
+  extents are aligned by an outer join, pixels a scene does not cover are NaN.
+- `tank_profiles`: tanks are grouped by the spatial chunk their center falls in; each group reads
+  only the bounding window of its tanks' annuli, one scene at a time, and runs the batched
+  `azimuth_profiles` on it. The result is a lazy (time, tank, azimuth) DataArray with one task
+  per (scene, group), so only chunks that intersect tanks are ever read and memory stays bounded by
+  the slab of scenes being computed. Tanks a scene does not cover get NaN profiles.
+"""
+from __future__ import annotations
+import re
+from pathlib import Path
+from typing import TYPE_CHECKING
+import numpy as np
+import pandas as pd
+
+from .features.sar_double_bounce import azimuth_profiles
+from .utils.io import read_geojson
+from .utils.scene import tank_windows, tanks_to_pixels
+
+if TYPE_CHECKING:  # xarray/dask/rioxarray are imported lazily
+    import xarray as xr
+
+_STAMP = re.compile(r"(\d{8}T\d{6})|(\d{4}-?\d{2}-?\d{2})")
+
+def scene_time(path: str | Path) -> pd.Timestamp:
+    """Acquisition time from a file name (S1 style 20250103T002345, else the first date in it)."""
+    m = _STAMP.search(Path(path).stem)
+    if m is None:
+        raise ValueError(f"no acquisition time in scene name {Path(path).name!r}; pass times=")
+    return pd.Timestamp(m.group(0))
+
+def aoi_bounds(aoi_geojson: str | Path) -> tuple[float, float, float, float]:
+    """lon/lat bounding box of every coordinate in an AOI GeoJSON."""
+    def coords(c):
+        if isinstance(c[0], (int, float)):
+            yield c[:2]
+        else:
+            for sub in c:
+                yield from coords(sub)
+    g = read_geojson(aoi_geojson)
+    feats = g["features"] if g.get("type") == "FeatureCollection" else [g]
+    xy = np.array([p for f in feats for p in coords((f.get("geometry") or f)["coordinates"])], dtype=float)
+    return float(xy[:, 0].min()), float(xy[:, 1].min()), float(xy[:, 0].max()), float(xy[:, 1].max())
+
+def _snap(v: np.ndarray, res: float) -> np.ndarray:
+    """Round coordinates to 1e-6 pixel (of the first scene) so equal grid positions compare equal."""
+    q = abs(res) * 1e-6
+    return np.round(v / q) * q
+
+def open_cube(scenes: list[str], aoi: str | tuple[float, float, float, float] | None = None,
+              times: list | None = None, chunk: int = 1024, band: int = 1) -> xr.DataArray:
+    """
+    Lazy (time, y, x) float32 cube of `scenes` clipped to `aoi` (GeoJSON path or lon/lat bounds).
+    Scenes that do not intersect the AOI are dropped. y runs north → south like the rasters.
+    """
+    import rioxarray
+    import xarray as xr
+    from rioxarray.exceptions import NoDataInBounds
+    bounds = aoi_bounds(aoi) if isinstance(aoi, (str, Path)) else aoi
+    times = [scene_time(s) for s in scenes] if times is None else [pd.Timestamp(t) for t in times]
+    layers, crs, res = [], None, None
+    for path, t in sorted(zip(scenes, times), key=lambda st: st[1]):
+        da = rioxarray.open_rasterio(path, chunks={"y": chunk, "x": chunk}, masked=True).sel(band=band, drop=True)
+        if crs is None:
+            crs, res = da.rio.crs, da.rio.resolution()
+        elif da.rio.crs != crs:
+            raise ValueError(f"{path}: CRS {da.rio.crs} differs from the cube's {crs}")
+        if bounds is not None:
+            try:
+                da = da.rio.clip_box(*bounds, crs="EPSG:4326")
+            except NoDataInBounds:
+                continue
+        da = da.assign_coords(x=_snap(da.x.values, res[0]), y=_snap(da.y.values, res[1]))
+        layers.append(da.astype(np.float32).expand_dims(time=[t]).assign_coords(scene_id=("time", [Path(path).stem])))
+    if not layers:
+        raise ValueError("no scene intersects the AOI")
+    cube = xr.concat(layers, dim="time", join="outer", fill_value=np.nan, coords="different", compat="equals")
+    if cube.sizes["y"] > 1 and cube.y.values[0] < cube.y.values[-1]:
+        cube = cube.isel(y=slice(None, None, -1))
+    return cube.rio.write_crs(crs).rename("backscatter")
+
+def cube_transform(cube: xr.DataArray):
+    """Affine transform of the cube's pixel grid (from its x/y coordinates)."""
+    from affine import Affine
+    x, y = cube.x.values, cube.y.values
+    dx = float(x[1] - x[0]) if len(x) > 1 else float(cube.rio.resolution()[0])
+    dy = float(y[1] - y[0]) if len(y) > 1 else float(cube.rio.resolution()[1])
+    return Affine(dx, 0.0, float(x[0]) - dx / 2, 0.0, dy, float(y[0]) - dy / 2)
+
+def _chunk_of(pos: np.ndarray, chunks: tuple[int, ...]) -> np.ndarray:
+    return np.searchsorted(np.cumsum(chunks), pos, side="right")
+
+def _group_profiles(block: np.ndarray, tanks_local: np.ndarray, r_in_frac: float, r_out_frac: float,
+                    azimuth_bins: int) -> np.ndarray:
+    out = np.empty((block.shape[0], len(tanks_local), azimuth_bins), dtype=np.float32)
+    for k, img in enumerate(block):
+        out[k] = azimuth_profiles(img, tanks_local, r_in_frac, r_out_frac, azimuth_bins)
+    return out
+
+def tank_profiles(cube: xr.DataArray, tanks: pd.DataFrame, r_in_frac: float = 0.7, r_out_frac: float = 1.1,
+                  azimuth_bins: int = 360) -> xr.DataArray:
+    """
+    Lazy (time, tank, azimuth) profiles of `tanks` (tank_id, lon, lat, radius_m) over `cube`.
+    Call `.compute()` on a time slice (e.g. `.isel(time=slice(0, 16))`) to bound memory.
+    """
+    import dask.array as da
+    import xarray as xr
+    tanks_px = tanks_to_pixels(tanks["lon"], tanks["lat"], tanks["radius_m"], cube_transform(cube), cube.rio.crs)
+    win = tank_windows(tanks_px, (cube.sizes["y"], cube.sizes["x"]), r_out_frac)
+    inside = np.flatnonzero((win[:, 2] > 0) & (win[:, 3] > 0))
+    data = cube.data if isinstance(cube.data, da.Array) else da.from_array(cube.data, chunks=(1, -1, -1))
+    _, ychunks, xchunks = data.chunks
+    key = _chunk_of(tanks_px[inside, 1], ychunks) * len(xchunks) + _chunk_of(tanks_px[inside, 0], xchunks)
+
+    parts, order = [], []
+    for k in np.unique(key):
+        members = inside[key == k]
+        w = win[members]
+        r0, c0 = int(w[:, 0].min()), int(w[:, 1].min())
+        r1, c1 = int((w[:, 0] + w[:, 2]).max()), int((w[:, 1] + w[:, 3]).max())
+        slab = data[:, r0:r1, c0:c1].rechunk({1: -1, 2: -1})
+        local = tanks_px[members] - (c0, r0, 0)
+        parts.append(slab.map_blocks(_group_profiles, local, r_in_frac, r_out_frac, azimuth_bins,
+                                     dtype=np.float32, chunks=(slab.chunks[0], (len(members),), (azimuth_bins,))))
+        order.append(members)
+    outside = np.setdiff1d(np.arange(len(tanks_px)), inside)
+    if len(outside):
+        parts.append(da.full((data.shape[0], len(outside), azimuth_bins), np.nan, dtype=np.float32,
+                             chunks=(data.chunks[0], len(outside), azimuth_bins)))
+        order.append(outside)
+    stacked = da.concatenate(parts, axis=1)[:, np.argsort(np.concatenate(order))]
+    edges = np.linspace(0, 360, azimuth_bins + 1)
+    return xr.DataArray(stacked, dims=("time", "tank", "azimuth"),
+                        coords={"time": cube.time.values, "scene_id": ("time", cube.scene_id.values),
+                                "tank": tanks["tank_id"].to_numpy(dtype=str),
+                                "azimuth": (edges[:-1] + edges[1:]) / 2},
+                        name="profile")
@@ -0,0 +1,193 @@
+"""
+Provider-agnostic scene discovery with a local SQLite search cache.
+
+- `Scene`: one downloadable file of an acquisition (provider, id, time, url, size, checksum, bbox).
+- Providers implement `search(session, bbox, start, end) -> list[Scene]`:
+    `AsfProvider`   Sentinel-1 through the ASF search API (GeoJSON output, md5 from the catalog)
+    `StacProvider`  any STAC API (/search with next-link paging), e.g. Sentinel-2 L2A on Earth Search
+                    or Landsat C2 L2 on LandsatLook; one asset per item (plus an optional mask
+                    sidecar, id `<item>_SCL`), STAC file:size/file:checksum
+- `SceneCatalog`: results are cached per (provider settings, AOI bbox, time window), so re-running
+  a week (or another step over the same window) does not hit the provider APIs again. A search
+  cached less than `settle` seconds after its window ended is refreshed on the next lookup, since
+  providers publish scenes with some latency; once cached after that, the window is stable.
+"""
+from __future__ import annotations
+import hashlib, json, sqlite3, time
+from datetime import datetime, timezone
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from urllib.parse import urlparse
+
+import requests
+
+Bbox = tuple[float, float, float, float]  # lon_min, lat_min, lon_max, lat_max
+
+@dataclass(frozen=True)
+class Scene:
+    provider: str
+    scene_id: str
+    time: str
+    url: str
+    size: int | None = None
+    checksum: str | None = None          # "<algo>:<hex>", algo in hashlib (md5, sha256, ...)
+    bbox: Bbox | None = None
+
+    @property
+    def filename(self) -> str:
+        """URL file name, or `<scene_id><suffix>` when it does not carry the id (STAC assets: B04.tif)."""
+        name = Path(urlparse(self.url).path).name
+        if not name:
+            return f"{self.scene_id}.bin"
+        return name if self.scene_id in name else f"{self.scene_id}{Path(name).suffix}"
+
+    def to_json(self) -> dict:
+        return asdict(self)
+
+    @classmethod
+    def from_json(cls, d: dict) -> Scene:
+        return cls(**{**d, "bbox": tuple(d["bbox"]) if d.get("bbox") else None})
+
+def _bbox_of(geometry: dict | None) -> Bbox | None:
+    if not geometry:
+        return None
+    def walk(c):
+        if isinstance(c[0], (int, float)):
+            yield c
+        else:
+            for sub in c:
+                yield from walk(sub)
+    xs, ys = zip(*((p[0], p[1]) for p in walk(geometry["coordinates"])))
+    return (min(xs), min(ys), max(xs), max(ys))
+
+def stac_checksum(multihash: str | None) -> str | None:
+    """STAC file:checksum (hex multihash) → "<algo>:<hex>" for sha2-256 / md5, else None."""
+    if not multihash:
+        return None
+    for prefix, algo in (("1220", "sha256"), ("d50110", "md5")):
+        if multihash.startswith(prefix):
+            return f"{algo}:{multihash[len(prefix):]}"
+    return None
+
+class Provider:
+    """Base class: `name` labels scenes, `max_concurrency` bounds parallel downloads from it."""
+    name = "provider"
+    max_concurrency = 4
+
+    def cache_key(self) -> str:
+        """What the search results depend on (not concurrency/timeouts)."""
+        params = {k: v for k, v in vars(self).items() if k not in ("max_concurrency", "timeout")}
+        return json.dumps({"class": type(self).__name__, **params}, sort_keys=True, default=str)
+
+    def search(self, session: requests.Session, bbox: Bbox, start: str, end: str) -> list[Scene]:
+        raise NotImplementedError
+
+class AsfProvider(Provider):
+    def __init__(self, url: str = "https://api.daac.asf.alaska.edu/services/search/param", name: str = "s1",
+                 processing_level: str = "GRD_HD", beam_mode: str = "IW", polarization: str | None = None,
+                 max_results: int = 1000, max_concurrency: int = 4, timeout: float = 120.0):
+        self.url, self.name, self.processing_level, self.beam_mode = url, name, processing_level, beam_mode
+        self.polarization, self.max_results = polarization, max_results
+        self.max_concurrency, self.timeout = max_concurrency, timeout
+
+    def search(self, session, bbox, start, end):
+        x0, y0, x1, y1 = bbox
+        params = {"platform": "Sentinel-1", "processingLevel": self.processing_level, "beamMode": self.beam_mode,
+                  "intersectsWith": f"POLYGON(({x0} {y0},{x1} {y0},{x1} {y1},{x0} {y1},{x0} {y0}))",
+                  "start": start, "end": end, "output": "geojson", "maxResults": self.max_results}
+        if self.polarization:
+            params["polarization"] = self.polarization
+        resp = session.get(self.url, params=params, timeout=self.timeout)
+        resp.raise_for_status()
+        out = []
+        for f in resp.json().get("features", []):
+            p = f["properties"]
+            out.append(Scene(self.name, p["sceneName"], p["startTime"], p["url"],
+                             int(p["bytes"]) if p.get("bytes") else None,
+                             f"md5:{p['md5sum']}" if p.get("md5sum") else None, _bbox_of(f.get("geometry"))))
+        return out
+
+class StacProvider(Provider):
+    def __init__(self, url: str, collection: str, asset: str, name: str, limit: int = 100,
+                 query: dict | None = None, mask_asset: str | None = None, max_concurrency: int = 8,
+                 timeout: float = 120.0):
+        self.url, self.collection, self.asset, self.name = url.rstrip("/"), collection, asset, name
+        self.mask_asset = mask_asset
+        self.limit, self.query, self.max_concurrency, self.timeout = limit, query or {}, max_concurrency, timeout
+
+    def search(self, session, bbox, start, end):
+        body = {"collections": [self.collection], "bbox": list(bbox), "datetime": f"{start}/{end}",
+                "limit": self.limit, **({"query": self.query} if self.query else {})}
+        url, out = f"{self.url}/search", []
+        while url:
+            resp = session.post(url, json=body, timeout=self.timeout)
+            resp.raise_for_status()
+            page = resp.json()
+            for item in page.get("features", []):
+                a = item.get("assets", {}).get(self.asset)
+                if a is None:
+                    continue
+                bbox = tuple(item["bbox"]) if item.get("bbox") else _bbox_of(item.get("geometry"))
+                t = item["properties"]["datetime"]
+                out.append(Scene(self.name, item["id"], t, a["href"], a.get("file:size"),
+                                 stac_checksum(a.get("file:checksum")), bbox))
+                m = item["assets"].get(self.mask_asset) if self.mask_asset else None
+                if m is not None:
+                    out.append(Scene(self.name, f"{item['id']}_SCL", t, m["href"], m.get("file:size"),
+                                     stac_checksum(m.get("file:checksum")), bbox))
+            nxt = next((l for l in page.get("links", []) if l.get("rel") == "next"), None)
+            url = nxt["href"] if nxt else None
+            if nxt and nxt.get("body"):
+                body = {**body, **nxt["body"]} if nxt.get("merge") else nxt["body"]
+        return out
+
+_SCHEMA = "CREATE TABLE IF NOT EXISTS searches (key TEXT PRIMARY KEY, provider TEXT, created REAL, scenes TEXT)"
+
+class SceneCatalog:
+    """
+    SQLite cache of provider search results, keyed by provider settings + bbox + time window.
+    `settle` (seconds) refreshes entries cached before the window end + settle (recent windows may
+    still gain scenes, old ones are stable); `max_age` (seconds) additionally expires every entry.
+    """
+    def __init__(self, path: str | Path, max_age: float | None = None, settle: float | None = 3 * 86400):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.max_age = max_age
+        self.settle = settle
+        self.db = sqlite3.connect(self.path, timeout=60, check_same_thread=False)
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.execute(_SCHEMA)
+        self.stats = {"hits": 0, "misses": 0}
+
+    def close(self) -> None:
+        self.db.close()
+
+    @staticmethod
+    def key(provider: Provider, bbox: Bbox, start: str, end: str) -> str:
+        box = ",".join(f"{v:.6f}" for v in bbox)
+        return hashlib.sha1(f"{provider.cache_key()}|{box}|{start}|{end}".encode()).hexdigest()
+
+    def search(self, provider: Provider, session: requests.Session, bbox: Bbox, start: str, end: str,
+               refresh: bool = False) -> list[Scene]:
+        key = self.key(provider, bbox, start, end)
+        q = "SELECT created, scenes FROM searches WHERE key = ?"
+        row = None if refresh else self.db.execute(q, (key,)).fetchone()
+        if row is not None and self._fresh(row[0], end):
+            self.stats["hits"] += 1
+            return [Scene.from_json(d) for d in json.loads(row[1])]
+        self.stats["misses"] += 1
+        scenes = provider.search(session, bbox, start, end)
+        with self.db:
+            self.db.execute("INSERT OR REPLACE INTO searches VALUES (?, ?, ?, ?)",
+                            (key, provider.name, time.time(), json.dumps([s.to_json() for s in scenes])))
+        return scenes
+
+    def _fresh(self, created: float, end: str) -> bool:
+        if self.max_age is not None and time.time() - created > self.max_age:
+            return False
+        return self.settle is None or created >= _epoch(end) + self.settle
+
+def _epoch(iso: str) -> float:
+    """Seconds since the epoch of an ISO date/time (UTC unless it carries an offset)."""
+    t = datetime.fromisoformat(iso)
+    return (t if t.tzinfo else t.replace(tzinfo=timezone.utc)).timestamp()
@@ -0,0 +1,167 @@
+"""
+Concurrent, resumable scene downloads into a disk-quota-aware local cache.
+
+- `download`: streams into `<file>.part`; after an interruption the next attempt resumes with an
+  HTTP Range request (206 appends, 200 restarts). Size and checksum (when the catalog has them)
+  are verified before the file is atomically moved into place; a mismatch discards the partial
+  file and retries from scratch. Connection errors and 5xx/429 retry with exponential backoff.
+- `SceneCache`: <root>/<provider>/<filename>. Before each download, space is reserved against the
+  quota; least recently used files are evicted (never those of the batch being fetched).
+- `AcquisitionManager`: searches through the `SceneCatalog` and fetches scenes with one pooled
+  session, at most `provider.max_concurrency` downloads per provider at a time.
+"""
+from __future__ import annotations
+import asyncio, hashlib, os, time
+from pathlib import Path
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from .catalog import Bbox, Provider, Scene, SceneCatalog
+
+RETRY_STATUS = {429, 500, 502, 503, 504}
+
+class ChecksumError(ValueError):
+    pass
+
+class QuotaExceeded(OSError):
+    pass
+
+def _session(pool_size: int) -> requests.Session:
+    s = requests.Session()
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+    s.mount("http://", adapter)
+    s.mount("https://", adapter)
+    return s
+
+def verify(path: Path, size: int | None = None, checksum: str | None = None) -> None:
+    """Raise ChecksumError unless `path` has `size` bytes and matches "<algo>:<hex>" `checksum`."""
+    if size is not None and path.stat().st_size != size:
+        raise ChecksumError(f"{path.name}: {path.stat().st_size} bytes, expected {size}")
+    if checksum:
+        algo, _, want = checksum.partition(":")
+        h = hashlib.new(algo)
+        with path.open("rb") as f:
+            for block in iter(lambda: f.read(1 << 20), b""):
+                h.update(block)
+        if h.hexdigest() != want.lower():
+            raise ChecksumError(f"{path.name}: {algo} {h.hexdigest()} != {want}")
+
+def download(session: requests.Session, scene: Scene, dest: Path, retries: int = 3, backoff: float = 1.0,
+             timeout: float = 300.0, block_size: int = 1 << 20) -> Path:
+    dest.parent.mkdir(parents=True, exist_ok=True)
+    part = dest.with_name(dest.name + ".part")
+    for attempt in range(retries + 1):
+        try:
+            have = part.stat().st_size if part.exists() else 0
+            headers = {"Range": f"bytes={have}-"} if have else {}
+            with session.get(scene.url, headers=headers, stream=True, timeout=timeout) as resp:
+                if resp.status_code in RETRY_STATUS:
+                    raise requests.HTTPError(f"HTTP {resp.status_code}", response=resp)
+                if resp.status_code != 416:   # 416: the partial file is already complete
+                    resp.raise_for_status()
+                    resumed = resp.status_code == 206
+                    if resumed and not resp.headers.get("Content-Range", "").startswith(f"bytes {have}-"):
+                        raise ChecksumError(f"{scene.scene_id}: server resumed at the wrong offset")
+                    with part.open("ab" if resumed else "wb") as f:
+                        for block in resp.iter_content(block_size):
+                            f.write(block)
+            verify(part, scene.size, scene.checksum)
+            part.replace(dest)
+            return dest
+        except ChecksumError:
+            part.unlink(missing_ok=True)
+            if attempt == retries:
+                raise
+        except requests.RequestException as e:
+            status = getattr(getattr(e, "response", None), "status_code", None)
+            if attempt == retries or (status is not None and status not in RETRY_STATUS):
+                raise
+            time.sleep(backoff * 2**attempt)
+    raise RuntimeError("unreachable")
+
+class SceneCache:
+    """Files under `root`, at most `quota_bytes` in total (None: unbounded); LRU by mtime."""
+    def __init__(self, root: str | Path, quota_bytes: int | None = None):
+        self.root = Path(root)
+        self.root.mkdir(parents=True, exist_ok=True)
+        self.quota = quota_bytes
+        self.files = {p: p.stat().st_size for p in self.root.rglob("*") if p.is_file() and p.suffix != ".part"}
+        self.reserved = 0
+        self.stats = {"hits": 0, "downloads": 0, "evictions": 0}
+
+    def path(self, scene: Scene) -> Path:
+        return self.root / scene.provider / scene.filename
+
+    def get(self, scene: Scene) -> Path | None:
+        p = self.path(scene)
+        if p not in self.files:
+            return None
+        os.utime(p)
+        self.stats["hits"] += 1
+        return p
+
+    def usage(self) -> int:
+        return sum(self.files.values()) + self.reserved
+
+    def reserve(self, nbytes: int, keep: set[Path] = frozenset()) -> None:
+        """Make room for `nbytes` by evicting LRU files outside `keep`; QuotaExceeded if impossible."""
+        if self.quota is not None and self.usage() + nbytes > self.quota:
+            for p in sorted((p for p in self.files if p not in keep), key=lambda p: p.stat().st_mtime):
+                self.evict(p)
+                if self.usage() + nbytes <= self.quota:
+                    break
+            if self.usage() + nbytes > self.quota:
+                raise QuotaExceeded(f"cache quota {self.quota} bytes cannot fit {nbytes} more")
+        self.reserved += nbytes
+
+    def release(self, nbytes: int) -> None:
+        self.reserved -= nbytes
+
+    def add(self, path: Path) -> None:
+        self.files[path] = path.stat().st_size
+        self.stats["downloads"] += 1
+
+    def evict(self, path: Path) -> None:
+        path.unlink(missing_ok=True)
+        self.files.pop(path, None)
+        self.stats["evictions"] += 1
+
+class AcquisitionManager:
+    def __init__(self, providers: dict[str, Provider], cache: SceneCache, catalog: SceneCatalog | None = None,
+                 retries: int = 3, backoff: float = 1.0, timeout: float = 300.0, default_concurrency: int = 4):
+        self.providers, self.cache, self.catalog = providers, cache, catalog
+        self.retries, self.backoff, self.timeout = retries, backoff, timeout
+        self.default_concurrency = default_concurrency
+        self.session = _session(sum(p.max_concurrency for p in providers.values()) + default_concurrency)
+
+    def close(self) -> None:
+        self.session.close()
+
+    def search(self, provider: str, bbox: Bbox, start: str, end: str, refresh: bool = False) -> list[Scene]:
+        p = self.providers[provider]
+        if self.catalog is None:
+            return p.search(self.session, bbox, start, end)
+        return self.catalog.search(p, self.session, bbox, start, end, refresh=refresh)
+
+    async def fetch(self, scenes: list[Scene]) -> dict[str, Path]:
+        """Download every scene not in the cache; returns {scene_id: local path} for all of them."""
+        sems = {name: asyncio.Semaphore(p.max_concurrency) for name, p in self.providers.items()}
+        keep = {self.cache.path(s) for s in scenes}
+
+        async def one(s: Scene) -> tuple[str, Path]:
+            hit = self.cache.get(s)
+            if hit is not None:
+                return s.scene_id, hit
+            sem = sems.setdefault(s.provider, asyncio.Semaphore(self.default_concurrency))
+            async with sem:
+                self.cache.reserve(s.size or 0, keep)
+                try:
+                    path = await asyncio.to_thread(download, self.session, s, self.cache.path(s),
+                                                   self.retries, self.backoff, self.timeout)
+                finally:
+                    self.cache.release(s.size or 0)
+                self.cache.add(path)
+            return s.scene_id, path
+
+        return dict(await asyncio.gather(*(one(s) for s in scenes)))
@@ -1,7 +1,20 @@
 """
-Landsat (and HLS) stubs.
+Landsat Collection 2 L2 discovery through a STAC API (`src.data.catalog.StacProvider`, LandsatLook by default).
 """
 from __future__ import annotations
 
-def search_landsat(aoi_geojson_path: str, start: str, end: str) -> list[dict]:
-    return [{"product_id":"L8_stub_001","start":start,"end":end}]
+from .catalog import SceneCatalog, StacProvider
+
+LANDSAT_PROVIDER = dict(url="https://landsatlook.usgs.gov/stac-server", collection="landsat-c2l2-sr", asset="red",
+                        name="landsat")
+
+def search_landsat(aoi_geojson_path: str, start: str, end: str, catalog: SceneCatalog | None = None,
+                   provider: StacProvider | None = None) -> list[dict]:
+    import requests
+    from ..cube import aoi_bounds
+    provider = provider or StacProvider(**LANDSAT_PROVIDER)
+    bbox = aoi_bounds(aoi_geojson_path)
+    with requests.Session() as session:
+        scenes = (catalog.search(provider, session, bbox, start, end) if catalog is not None
+                  else provider.search(session, bbox, start, end))
+    return [s.to_json() for s in scenes]
@@ -1,18 +1,29 @@
 """
-Sentinel-1 search and RTC queue stubs (ASF/HyP3).
+Sentinel-1 search (ASF, `src.data.catalog.AsfProvider`) and RTC processing (HyP3, `src.data.hyp3`).
 """
 from __future__ import annotations
-from datetime import date
 from typing import List
 
-def search_s1(aoi_geojson_path: str, start: str, end: str, pols=("VV","VH")) -> List[dict]:
+from .catalog import AsfProvider, SceneCatalog
+from .hyp3 import Hyp3Client
+
+def search_s1(aoi_geojson_path: str, start: str, end: str, pols=("VV","VH"),
+              catalog: SceneCatalog | None = None, provider: AsfProvider | None = None) -> List[dict]:
     """
-    Return a list of S1 scenes (stub). Replace with asf_search or Copernicus APIs.
+    S1 GRD scenes intersecting the AOI's bounding box, as `Scene` dicts. With `catalog`, the
+    search is answered from (and stored in) the local SQLite search cache.
     """
-    return [{"scene_id":"S1_stub_001","start":start,"end":end,"pols":list(pols)}]
+    import requests
+    from ..cube import aoi_bounds
+    provider = provider or AsfProvider(polarization="+".join(pols))
+    bbox = aoi_bounds(aoi_geojson_path)
+    with requests.Session() as session:
+        scenes = (catalog.search(provider, session, bbox, start, end) if catalog is not None
+                  else provider.search(session, bbox, start, end))
+    return [s.to_json() for s in scenes]
 
-def queue_hyp3_rtc(scene_ids: list[str]) -> None:
+def queue_hyp3_rtc(scene_ids: list[str], name: str = "oil-nowcast", client: Hyp3Client | None = None) -> list[str]:
     """
-    Submit RTC jobs to HyP3 (stub).
+    Submit RTC jobs to HyP3 in batches; returns the job ids (poll them with `Hyp3Client.wait`).
     """
-    raise NotImplementedError("Use hyp3_sdk to submit jobs")
+    return (client or Hyp3Client()).submit(list(scene_ids), name=name)
@@ -1,7 +1,19 @@
 """
-Sentinel-2 discovery/fetch stubs.
+Sentinel-2 L2A discovery through a STAC API (`src.data.catalog.StacProvider`, Earth Search by default).
 """
 from __future__ import annotations
 
-def search_s2(aoi_geojson_path: str, start: str, end: str) -> list[dict]:
-    return [{"product_id":"S2_stub_001","start":start,"end":end}]
+from .catalog import SceneCatalog, StacProvider
+
+S2_PROVIDER = dict(url="https://earth-search.aws.element84.com/v1", collection="sentinel-2-l2a", asset="red", name="s2")
+
+def search_s2(aoi_geojson_path: str, start: str, end: str, catalog: SceneCatalog | None = None,
+              provider: StacProvider | None = None) -> list[dict]:
+    import requests
+    from ..cube import aoi_bounds
+    provider = provider or StacProvider(**S2_PROVIDER)
+    bbox = aoi_bounds(aoi_geojson_path)
+    with requests.Session() as session:
+        scenes = (catalog.search(provider, session, bbox, start, end) if catalog is not None
+                  else provider.search(session, bbox, start, end))
+    return [s.to_json() for s in scenes]
@@ -0,0 +1,106 @@
+"""
+Columnar per-tank feature store (Parquet, hive-partitioned by week and sensor).
+
+Layout:
+  <root>/week=<YYYY-MM-DD>/sensor=<s1|s2|landsat|synthetic>/part-<key>-0.parquet
+
+Writes are append-only per scene: every scene gets its own part file (`key` hashes its scene id;
+rows without one share a single part per partition). A write adds parts for new scenes and never
+touches other scenes' files; writing a scene again replaces its part, so re-extracting a week (with
+scenes added or dropped, or in different batches) does not duplicate rows.
+Reads go through pyarrow.dataset, so partition filters (week/sensor) prune directories and
+column/row predicates are pushed down into the Parquet scan, e.g.
+
+  read_features(root, columns=["week", "peak_to_mean"],
+                filters=(ds.field("tank_id") == "tank_001") & (ds.field("week") >= "2023-01-06"))
+"""
+from __future__ import annotations
+import hashlib, operator
+from functools import reduce
+from pathlib import Path
+import pandas as pd
+import pyarrow as pa
+import pyarrow.dataset as ds
+
+PARTITIONING = ds.partitioning(pa.schema([("week", pa.string()), ("sensor", pa.string())]), flavor="hive")
+
+CATEGORICAL = pa.dictionary(pa.int32(), pa.string())
+
+# Typed columns; anything else is stored with its inferred Arrow type.
+COLUMN_TYPES: dict[str, pa.DataType] = {
+    "tank_id": CATEGORICAL,
+    "roof_type": CATEGORICAL,
+    "scene_id": pa.string(),
+    "radius_m": pa.float32(),
+    "peak": pa.float32(),
+    "mean": pa.float32(),
+    "std": pa.float32(),
+    "peak_to_mean": pa.float32(),
+    "arc_width_deg": pa.float32(),
+    "concentration": pa.float32(),
+    "shadow_fraction": pa.float32(),
+    "rim_dark_ratio": pa.float32(),
+    "lo": pa.float32(),
+    "hi": pa.float32(),
+}
+
+def to_table(df: pd.DataFrame) -> pa.Table:
+    """Arrow table with the store's column types applied."""
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    fields = [pa.field(f.name, COLUMN_TYPES.get(f.name, f.type)) for f in table.schema]
+    return table.cast(pa.schema(fields))
+
+def write_features(df: pd.DataFrame, root: str | Path, sensor: str | None = None) -> None:
+    """
+    Append per-tank feature rows to the store, one part per scene (replacing that scene's earlier
+    part). `df` must carry a `week` column; `sensor` is taken from the argument or from a `sensor` column.
+    """
+    df = df.copy()
+    if sensor is not None:
+        df["sensor"] = sensor
+    if "week" not in df or "sensor" not in df:
+        raise ValueError("feature rows need 'week' and 'sensor' to be partitioned")
+    df["week"] = df["week"].astype(str)
+    Path(root).mkdir(parents=True, exist_ok=True)
+    groups = df.groupby(df["scene_id"].astype(str), sort=False) if "scene_id" in df else [("", df)]
+    for scene_id, rows in groups:
+        key = hashlib.sha1(scene_id.encode()).hexdigest()[:16]
+        ds.write_dataset(to_table(rows), root, format="parquet", partitioning=PARTITIONING,
+                         basename_template=f"part-{key}-{{i}}.parquet",
+                         existing_data_behavior="overwrite_or_ignore")
+
+def dataset(root: str | Path) -> ds.Dataset:
+    return ds.dataset(root, format="parquet", partitioning=PARTITIONING)
+
+def read_features(root: str | Path, columns: list[str] | None = None,
+                  filters: ds.Expression | None = None) -> pd.DataFrame:
+    """Read selected columns/rows; only matching partitions and row groups are scanned."""
+    return dataset(root).to_table(columns=columns, filter=filters).to_pandas()
+
+def read_week(root: str | Path, week: str, sensor: str | None = None,
+              columns: list[str] | None = None) -> pd.DataFrame:
+    expr = ds.field("week") == week
+    if sensor is not None:
+        expr = expr & (ds.field("sensor") == sensor)
+    return read_features(root, columns=columns, filters=expr)
+
+def feature_history(root: str | Path, column: str, tank_ids: list[str] | None = None,
+                    start_week: str | None = None, end_week: str | None = None,
+                    sensor: str | None = None) -> pd.DataFrame:
+    """
+    Wide week × tank_id frame of one feature column (mean over multiple acquisitions per week),
+    e.g. peak_to_mean for a tank over two years.
+    """
+    exprs = []
+    if tank_ids is not None:
+        exprs.append(ds.field("tank_id").isin(list(tank_ids)))
+    if start_week is not None:
+        exprs.append(ds.field("week") >= start_week)
+    if end_week is not None:
+        exprs.append(ds.field("week") <= end_week)
+    if sensor is not None:
+        exprs.append(ds.field("sensor") == sensor)
+    expr = reduce(operator.and_, exprs) if exprs else None
+    df = read_features(root, columns=["week", "tank_id", column], filters=expr)
+    df["tank_id"] = df["tank_id"].astype(str)
+    return df.pivot_table(index="week", columns="tank_id", values=column, aggfunc="mean").sort_index()
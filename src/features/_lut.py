@@ -0,0 +1,21 @@
+"""
+Pixel lookup tables shared by the per-tank feature engines (`optical_shadow`, `quality`).
+
+Tables are cached per (sub-pixel offset, radius) and read-only, so every tank with the same key
+shares one gather pattern.
+"""
+from __future__ import annotations
+from functools import lru_cache
+import numpy as np
+
+@lru_cache(maxsize=4096)
+def disk_lut(fx: float, fy: float, r_px: float, rim_frac: float):
+    """Flat (dy, dx, is_rim) arrays for the roof disk of a tank at sub-pixel offset (fx, fy)."""
+    half = int(np.ceil(r_px)) + 1
+    v, u = np.mgrid[-half:half + 1, -half:half + 1]
+    r = np.sqrt((u - fx)**2 + (v - fy)**2)
+    disk = r <= r_px
+    lut = (v[disk].astype(np.intp), u[disk].astype(np.intp), (r[disk] >= r_px * rim_frac))
+    for a in lut:
+        a.flags.writeable = False
+    return lut
@@ -0,0 +1,94 @@
+"""
+Optical shadow features for floating-roof tanks (S2 / Landsat reflectance or panchromatic).
+
+Idea:
+- A floating roof sits below the tank rim; the wall casts a crescent shadow onto the roof that grows
+  as the roof drops (tank emptier).
+- Per tank we split roof pixels into dark/bright with an Otsu threshold (or a fixed one from config)
+  and report:
+    shadow_fraction  fraction of roof-disk pixels in the dark class
+    rim_dark_ratio   mean of the inner disk [0, rim_frac*r) / mean of the rim band [rim_frac*r, r];
+                     ~1 on an evenly lit roof, rising above 1 as the wall shadow darkens the rim
+
+`shadow_metrics_batch` handles every tank of a scene in one pass: disk/rim masks are cached per
+(sub-pixel offset, radius) and shared by all tanks with that key, the per-tank histograms come from
+a single `np.bincount`, and Otsu is evaluated for all tanks at once on those histograms.
+"""
+from __future__ import annotations
+import numpy as np
+
+from ._lut import disk_lut
+
+def _otsu_from_hist(hist: np.ndarray) -> np.ndarray:
+    """Row-wise Otsu on (n, nbins) histograms; returns the last bin index of the dark class."""
+    centers = np.arange(hist.shape[1], dtype=float)
+    w0 = np.cumsum(hist, axis=1)
+    w1 = w0[:, -1:] - w0
+    s0 = np.cumsum(hist * centers, axis=1)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        m0 = s0 / w0
+        m1 = (s0[:, -1:] - s0) / w1
+        between = w0 * w1 * (m0 - m1)**2
+    return np.nanargmax(np.where(np.isfinite(between), between, -1.0), axis=1)
+
+def shadow_metrics_batch(img: np.ndarray, tanks, threshold: str | float = "otsu", rim_frac: float = 0.85,
+                         nbins: int = 256) -> dict[str, np.ndarray]:
+    """
+    Shadow metrics for many tanks in one scene. `tanks` is an (n, 3) array-like of (cx, cy, r_px).
+    Returns a columnar dict with shadow_fraction, rim_dark_ratio and n_pixels (valid roof pixels).
+    Tanks without valid pixels get NaN metrics.
+    """
+    tanks = np.asarray(tanks, dtype=float).reshape(-1, 3)
+    n = len(tanks)
+    H, W = img.shape
+    ix, iy = np.floor(tanks[:, 0]), np.floor(tanks[:, 1])
+    keys = np.column_stack([tanks[:, 0] - ix, tanks[:, 1] - iy, tanks[:, 2]])
+    ix, iy = ix.astype(np.intp), iy.astype(np.intp)
+    uniq, inv = np.unique(keys, axis=0, return_inverse=True) if n else (np.empty((0, 3)), np.empty(0, int))
+    inv = inv.reshape(-1)
+
+    owner, vals, rim = [], [], []
+    for k, (fx, fy, r_px) in enumerate(uniq):
+        members = np.flatnonzero(inv == k)
+        dy, dx, is_rim = disk_lut(float(fx), float(fy), float(r_px), float(rim_frac))
+        # Stacked crops: (members, disk pixels) gathered with the shared mask
+        ys = iy[members, None] + dy[None, :]
+        xs = ix[members, None] + dx[None, :]
+        ok = (ys >= 0) & (ys < H) & (xs >= 0) & (xs < W)
+        v = np.full(ys.shape, np.nan)
+        v[ok] = img[ys[ok], xs[ok]]
+        ok &= np.isfinite(v)
+        owner.append(np.broadcast_to(members[:, None], ys.shape)[ok])
+        vals.append(v[ok])
+        rim.append(np.broadcast_to(is_rim[None, :], ys.shape)[ok])
+    owner = np.concatenate(owner) if owner else np.empty(0, np.intp)
+    vals = np.concatenate(vals) if vals else np.empty(0)
+    rim = np.concatenate(rim) if rim else np.empty(0, bool)
+
+    count = np.bincount(owner, minlength=n).astype(float)
+    if threshold == "otsu":
+        lo = np.full(n, np.inf); hi = np.full(n, -np.inf)
+        np.minimum.at(lo, owner, vals)
+        np.maximum.at(hi, owner, vals)
+        span = np.where(hi > lo, hi - lo, 1.0)
+        b = np.clip(((vals - lo[owner]) / span[owner] * nbins).astype(np.intp), 0, nbins - 1)
+        hist = np.bincount(owner * nbins + b, minlength=n * nbins).reshape(n, nbins).astype(float)
+        k = _otsu_from_hist(hist)
+        dark = np.take_along_axis(np.cumsum(hist, axis=1), k[:, None], axis=1)[:, 0]
+        dark = np.where(hi > lo, dark, 0.0)
+    else:
+        dark = np.bincount(owner, weights=(vals <= float(threshold)).astype(float), minlength=n)
+    rim_sum = np.bincount(owner, weights=np.where(rim, vals, 0.0), minlength=n)
+    rim_cnt = np.bincount(owner, weights=rim.astype(float), minlength=n)
+    in_sum = np.bincount(owner, weights=np.where(rim, 0.0, vals), minlength=n)
+    in_cnt = count - rim_cnt
+    with np.errstate(divide="ignore", invalid="ignore"):
+        shadow_fraction = dark / count
+        rim_dark_ratio = (in_sum / in_cnt) / (rim_sum / rim_cnt + 1e-6)
+    return {"shadow_fraction": shadow_fraction, "rim_dark_ratio": rim_dark_ratio, "n_pixels": count.astype(np.int64)}
+
+def shadow_metrics(img: np.ndarray, cx: float, cy: float, r_px: float, threshold: str | float = "otsu",
+                   rim_frac: float = 0.85) -> dict[str, float]:
+    """Single-tank form of `shadow_metrics_batch`."""
+    m = shadow_metrics_batch(img, [(cx, cy, r_px)], threshold=threshold, rim_frac=rim_frac)
+    return {"shadow_fraction": float(m["shadow_fraction"][0]), "rim_dark_ratio": float(m["rim_dark_ratio"][0])}
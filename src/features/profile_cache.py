@@ -0,0 +1,147 @@
+"""
+Content-addressed cache for raw SAR azimuth profiles.
+
+Each profile is keyed by a hash of (scene id + content checksum, tank pixel center/radius,
+annulus_inner_frac, annulus_outer_frac, azimuth_bins), so:
+- re-running with a changed downstream setting (e.g. an arc-width threshold) never touches rasters,
+- adding a tank only computes that tank's profile,
+- changing the annulus or bin count misses cleanly instead of returning stale profiles.
+
+Profiles are stored as float32 blobs in a single SQLite file with an LRU size cap. Their total size
+is kept in a `meta` row by triggers, so checking the cap after a write does not scan the table.
+"""
+from __future__ import annotations
+import hashlib, sqlite3, time
+from pathlib import Path
+import numpy as np
+
+from .sar_double_bounce import azimuth_profiles
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS profiles (key TEXT PRIMARY KEY, bins INTEGER, data BLOB, nbytes INTEGER, last_used REAL);
+CREATE INDEX IF NOT EXISTS profiles_lru ON profiles (last_used);
+CREATE TABLE IF NOT EXISTS scenes (path TEXT PRIMARY KEY, size INTEGER, mtime_ns INTEGER, digest TEXT);
+CREATE TABLE IF NOT EXISTS meta (name TEXT PRIMARY KEY, value INTEGER);
+INSERT OR IGNORE INTO meta SELECT 'total_bytes', COALESCE(SUM(nbytes), 0) FROM profiles;
+CREATE TRIGGER IF NOT EXISTS profiles_add AFTER INSERT ON profiles
+    BEGIN UPDATE meta SET value = value + NEW.nbytes WHERE name = 'total_bytes'; END;
+CREATE TRIGGER IF NOT EXISTS profiles_drop AFTER DELETE ON profiles
+    BEGIN UPDATE meta SET value = value - OLD.nbytes WHERE name = 'total_bytes'; END;
+"""
+
+def _chunks(seq, n: int = 900):
+    for i in range(0, len(seq), n):
+        yield seq[i:i + n]
+
+class ProfileCache:
+    """
+    SQLite-backed profile store. `max_bytes` caps the total blob size; least recently used
+    profiles are evicted first. `stats` counts hits, misses and evictions for this instance.
+    """
+    def __init__(self, path: str | Path, max_bytes: int = 2 * 1024**3):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes
+        self.db = sqlite3.connect(self.path, timeout=60)
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.execute("PRAGMA recursive_triggers=ON")   # INSERT OR REPLACE fires the delete trigger too
+        self.db.executescript(_SCHEMA)
+        self.stats = {"hits": 0, "misses": 0, "evictions": 0}
+
+    def close(self) -> None:
+        self.db.close()
+
+    def scene_digest(self, scene_path: str | Path, scene_id: str | None = None) -> str:
+        """
+        Scene id + sha1 of the file contents. The checksum is memoized per (path, size, mtime),
+        so unchanged scenes are only hashed once.
+        """
+        p = Path(scene_path).resolve()
+        st = p.stat()
+        row = self.db.execute("SELECT size, mtime_ns, digest FROM scenes WHERE path = ?", (str(p),)).fetchone()
+        if row is None or row[0] != st.st_size or row[1] != st.st_mtime_ns:
+            h = hashlib.sha1()
+            with p.open("rb") as f:
+                for block in iter(lambda: f.read(1 << 20), b""):
+                    h.update(block)
+            with self.db:
+                self.db.execute("INSERT OR REPLACE INTO scenes VALUES (?, ?, ?, ?)",
+                                (str(p), st.st_size, st.st_mtime_ns, h.hexdigest()))
+            row = (st.st_size, st.st_mtime_ns, h.hexdigest())
+        return f"{scene_id or p.stem}:{row[2]}"
+
+    @staticmethod
+    def keys(scene_digest: str, tanks_px: np.ndarray, r_in_frac: float, r_out_frac: float,
+             azimuth_bins: int) -> list[str]:
+        cfg = f"{float(r_in_frac)!r}|{float(r_out_frac)!r}|{int(azimuth_bins)}"
+        return [hashlib.sha1(f"{scene_digest}|{cx!r}|{cy!r}|{r!r}|{cfg}".encode()).hexdigest()
+                for cx, cy, r in np.asarray(tanks_px, dtype=float).reshape(-1, 3).tolist()]
+
+    def get_many(self, keys: list[str]) -> dict[str, np.ndarray]:
+        found = {}
+        for chunk in _chunks(keys):
+            q = f"SELECT key, data FROM profiles WHERE key IN ({','.join('?' * len(chunk))})"
+            for k, blob in self.db.execute(q, chunk):
+                found[k] = np.frombuffer(blob, dtype=np.float32)
+        if found:
+            now = time.time()
+            with self.db:
+                self.db.executemany("UPDATE profiles SET last_used = ? WHERE key = ?", [(now, k) for k in found])
+        self.stats["hits"] += len(found)
+        self.stats["misses"] += len(keys) - len(found)
+        return found
+
+    def put_many(self, keys: list[str], profiles: np.ndarray) -> None:
+        profiles = np.asarray(profiles, dtype=np.float32)
+        now = time.time()
+        with self.db:
+            self.db.executemany("INSERT OR REPLACE INTO profiles VALUES (?, ?, ?, ?, ?)",
+                                [(k, p.size, p.tobytes(), p.nbytes, now) for k, p in zip(keys, profiles)])
+        self.evict()
+
+    def total_bytes(self) -> int:
+        return int(self.db.execute("SELECT value FROM meta WHERE name = 'total_bytes'").fetchone()[0])
+
+    def evict(self) -> int:
+        """Drop least recently used profiles until the store fits in `max_bytes`."""
+        excess = self.total_bytes() - self.max_bytes
+        if excess <= 0:
+            return 0
+        drop, freed = [], 0
+        for k, nbytes in self.db.execute("SELECT key, nbytes FROM profiles ORDER BY last_used"):
+            drop.append(k)
+            freed += nbytes
+            if freed >= excess:
+                break
+        with self.db:
+            self.db.executemany("DELETE FROM profiles WHERE key = ?", [(k,) for k in drop])
+        self.stats["evictions"] += len(drop)
+        return len(drop)
+
+def cached_profiles(cache: ProfileCache, scene_digest: str, tanks_px: np.ndarray, compute,
+                    r_in_frac: float = 0.7, r_out_frac: float = 1.1, azimuth_bins: int = 360) -> np.ndarray:
+    """
+    (n_tanks, azimuth_bins) profiles, computing only cache misses with
+    `compute(tanks_px_subset) -> profiles`, e.g. a partial of `utils.scene.scene_profiles`.
+    """
+    tanks_px = np.asarray(tanks_px, dtype=float).reshape(-1, 3)
+    keys = cache.keys(scene_digest, tanks_px, r_in_frac, r_out_frac, azimuth_bins)
+    found = cache.get_many(keys)
+    out = np.zeros((len(keys), azimuth_bins), dtype=float)
+    miss = [i for i, k in enumerate(keys) if k not in found]
+    for i, k in enumerate(keys):
+        if k in found:
+            out[i] = found[k]
+    if miss:
+        computed = compute(tanks_px[miss])
+        # Round-trip through float32 so hits and misses return identical values
+        out[miss] = np.asarray(computed, dtype=np.float32)
+        cache.put_many([keys[i] for i in miss], computed)
+    return out
+
+def cached_array_profiles(cache: ProfileCache, scene_digest: str, img: np.ndarray, tanks_px: np.ndarray,
+                          r_in_frac: float = 0.7, r_out_frac: float = 1.1, azimuth_bins: int = 360) -> np.ndarray:
+    """`cached_profiles` over an in-memory (or memmapped) scene array."""
+    return cached_profiles(cache, scene_digest, tanks_px,
+                           lambda t: azimuth_profiles(img, t, r_in_frac, r_out_frac, azimuth_bins),
+                           r_in_frac, r_out_frac, azimuth_bins)
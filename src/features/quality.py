@@ -0,0 +1,93 @@
+"""
+Cheap per-tank acquisition quality, computed before any feature extraction so bad crops are skipped.
+
+Scores come from a decimated overview of the scene (or its Sentinel-2 SCL scene classification) over a
+disk around every tank, all tanks of a scene in one gather:
+    valid_fraction  disk pixels inside the raster and not nodata
+    quality         disk pixels that are valid and in a clear SCL class (without SCL: = valid_fraction),
+                    compared against `min_quality`
+    contrast        brightest disk pixel / scene median (overview only; low on washed-out SAR tiles)
+and a skip `reason` per tank ("" when the crop passes):
+    outside       the disk does not touch the raster
+    nodata        too few valid pixels (scene edge, fill values)
+    cloud         too few clear pixels, mostly cloud/cirrus/cloud shadow (SCL)
+    low_contrast  contrast below `min_contrast`
+"""
+from __future__ import annotations
+import numpy as np
+
+from ._lut import disk_lut
+
+# Sentinel-2 L2A SCL classes
+SCL_NODATA = (0, 1)                # no data, saturated/defective
+SCL_CLOUD = (3, 8, 9, 10)          # cloud shadow, cloud medium/high probability, thin cirrus
+SCL_CLEAR = (2, 4, 5, 6, 7, 11)    # dark area, vegetation, not vegetated, water, unclassified, snow
+
+REASONS = ("outside", "nodata", "cloud", "low_contrast")
+
+def disk_pixels(img: np.ndarray, tanks) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """(owner, values, inside) for the disk pixels of every (cx, cy, r_px) tank; off-raster pixels are NaN."""
+    tanks = np.asarray(tanks, dtype=float).reshape(-1, 3)
+    H, W = img.shape
+    ix, iy = np.floor(tanks[:, 0]), np.floor(tanks[:, 1])
+    keys = np.column_stack([tanks[:, 0] - ix, tanks[:, 1] - iy, tanks[:, 2]])
+    ix, iy = ix.astype(np.intp), iy.astype(np.intp)
+    if not len(tanks):
+        return np.empty(0, np.intp), np.empty(0), np.empty(0, bool)
+    uniq, inv = np.unique(keys, axis=0, return_inverse=True)
+    inv = inv.reshape(-1)
+    owner, vals, inside = [], [], []
+    for k, (fx, fy, r_px) in enumerate(uniq):
+        members = np.flatnonzero(inv == k)
+        dy, dx, _ = disk_lut(float(fx), float(fy), float(r_px), 1.0)
+        ys = iy[members, None] + dy[None, :]
+        xs = ix[members, None] + dx[None, :]
+        ok = (ys >= 0) & (ys < H) & (xs >= 0) & (xs < W)
+        v = np.full(ys.shape, np.nan)
+        v[ok] = img[ys[ok], xs[ok]]
+        owner.append(np.broadcast_to(members[:, None], ys.shape).ravel())
+        vals.append(v.ravel())
+        inside.append(ok.ravel())
+    return np.concatenate(owner), np.concatenate(vals), np.concatenate(inside)
+
+def quality_batch(img: np.ndarray, tanks, scl: bool = False, min_quality: float = 0.6,
+                  min_contrast: float = 0.0, nodata: float | None = None) -> dict[str, np.ndarray]:
+    """
+    Quality scores and skip reasons for many tanks of one overview (or SCL raster when `scl`).
+    `tanks` is (n, 3) of (cx, cy, r_px) in the overview's pixel grid. Returns a columnar dict with
+    n_pixels, valid_fraction, quality, contrast, reason and passed.
+    """
+    tanks = np.asarray(tanks, dtype=float).reshape(-1, 3)
+    n = len(tanks)
+    owner, vals, inside = disk_pixels(img, tanks)
+    valid = inside & np.isfinite(vals)
+    if nodata is not None:
+        valid &= vals != nodata
+    if scl:
+        valid &= ~np.isin(vals, SCL_NODATA)
+    total = np.bincount(owner, minlength=n).astype(float)
+    n_inside = np.bincount(owner, weights=inside, minlength=n)
+    n_valid = np.bincount(owner, weights=valid, minlength=n)
+    if scl:
+        n_clear = np.bincount(owner, weights=valid & np.isin(vals, SCL_CLEAR), minlength=n)
+        n_cloud = np.bincount(owner, weights=valid & np.isin(vals, SCL_CLOUD), minlength=n)
+        contrast = np.full(n, np.nan)
+    else:
+        n_clear, n_cloud = n_valid, np.zeros(n)
+        peak = np.full(n, -np.inf)
+        np.maximum.at(peak, owner[valid], vals[valid])
+        good = img[np.isfinite(img)] if nodata is None else img[np.isfinite(img) & (img != nodata)]
+        bg = float(np.median(good)) if good.size else np.nan
+        with np.errstate(divide="ignore", invalid="ignore"):
+            contrast = np.where(n_valid > 0, peak / bg, np.nan) if bg > 0 else np.full(n, np.nan)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        valid_fraction = np.where(total > 0, n_valid / total, 0.0)
+        quality = np.where(total > 0, n_clear / total, 0.0)
+    reason = np.full(n, "", dtype=object)
+    low = quality < min_quality
+    reason[low] = np.where(2 * n_cloud[low] >= (total - n_clear)[low], "cloud", "nodata")
+    reason[(contrast < min_contrast) & (reason == "")] = "low_contrast"
+    reason[n_valid == 0] = "nodata"
+    reason[n_inside == 0] = "outside"
+    return {"n_pixels": total.astype(np.int64), "valid_fraction": valid_fraction, "quality": quality,
+            "contrast": contrast, "reason": reason, "passed": reason == ""}
@@ -0,0 +1,148 @@
+"""
+Typed table handoff between pipeline stages: Arrow IPC files (Feather v2, uncompressed) instead of CSV.
+
+- `SCHEMAS` registers the column sets the pipelines exchange (names, order and Arrow types;
+  `schema(name)` builds the Arrow schema, pyarrow is imported lazily):
+    per_tank_features       synthetic_week --out
+    scene_features          extract_week --out (S1 arc features)
+    optical_scene_features  extract_week --out --sensor s2/landsat
+    quality_skips           extract_week --skipped
+    site_aggregate          aggregate_week --out (weekly_change_bbl/nowcast_ewma_bbl only with --state)
+    site_series             site_series --out
+- The format follows the path suffix: .arrow/.feather/.ipc are Arrow IPC files, anything else is CSV
+  (kept for analysts, e.g. `nowcast export-csv`). Both are written atomically (`.part` + rename).
+- Arrow reads are memory-mapped: `read_arrow` returns a zero-copy table over the file's pages, and
+  `read_table` converts only the requested columns to pandas. Dtypes survive the round trip (week
+  stays a string, counts stay integers, floats are not re-parsed).
+"""
+from __future__ import annotations
+from functools import lru_cache
+from pathlib import Path
+from typing import TYPE_CHECKING
+import pandas as pd
+
+if TYPE_CHECKING:
+    import pyarrow as pa
+
+ARROW_SUFFIXES = (".arrow", ".feather", ".ipc")
+
+# Column names and Arrow type aliases; pyarrow itself is only imported when a table is read/written
+_F = "float64"
+_ARC = [("peak", _F), ("mean", _F), ("std", _F), ("peak_to_mean", _F), ("arc_width_deg", _F), ("concentration", _F)]
+_SCENE_KEYS = [("tank_id", "string"), ("week", "string"), ("scene_id", "string"), ("sensor", "string"),
+               ("radius_m", _F)]
+_SITE = [("week", "string"), ("total_volume_bbl", _F), ("num_tanks", "int64"),
+         ("weekly_change_bbl", _F), ("nowcast_ewma_bbl", _F)]
+
+SCHEMAS: dict[str, list[tuple[str, str]]] = {
+    "per_tank_features": [("tank_id", "string"), ("week", "string"), ("radius_m", _F), ("roof_type", "string"),
+                          *_ARC, ("shadow_fraction", _F), ("rim_dark_ratio", _F), ("lo", _F), ("hi", _F)],
+    "scene_features": [*_SCENE_KEYS, *_ARC],
+    "optical_scene_features": [*_SCENE_KEYS, ("shadow_fraction", _F), ("rim_dark_ratio", _F)],
+    "quality_skips": [*_SCENE_KEYS[:4], ("quality", _F), ("reason", "string")],
+    "site_aggregate": _SITE,
+    "site_series": _SITE,
+}
+OPTIONAL: dict[str, tuple[str, ...]] = {"site_aggregate": ("weekly_change_bbl", "nowcast_ewma_bbl")}
+
+@lru_cache(maxsize=None)
+def schema(name: str) -> pa.Schema:
+    """Arrow schema of the registered table `name`."""
+    import pyarrow as pa
+    return pa.schema([pa.field(n, pa.type_for_alias(t), nullable=True) for n, t in SCHEMAS[name]])
+
+def columns(name: str) -> list[str]:
+    return [n for n, _ in SCHEMAS[name]]
+
+def is_arrow(path: str | Path) -> bool:
+    return Path(path).suffix.lower() in ARROW_SUFFIXES
+
+def conform(df: pd.DataFrame, name: str) -> pa.Table:
+    """`df` as an Arrow table with schema `name`: columns selected and ordered, types cast."""
+    import pyarrow as pa
+    missing = [n for n in columns(name) if n not in df.columns and n not in OPTIONAL.get(name, ())]
+    if missing:
+        raise ValueError(f"{name}: missing columns {missing}")
+    table_schema = pa.schema([f for f in schema(name) if f.name in df.columns])
+    return pa.Table.from_pandas(df[table_schema.names], schema=table_schema, preserve_index=False)
+
+def _pandas_dtypes(name: str) -> dict[str, object]:
+    return {n: (str if t == "string" else t) for n, t in SCHEMAS[name]}
+
+class TableWriter:
+    """
+    Incremental writer for one table (extract_week appends a scene at a time): record batches into an
+    Arrow IPC file, or appended CSV rows. The file appears under `path` on `close()`.
+    """
+    def __init__(self, path: str | Path, name: str):
+        self.path, self.name = Path(path), name
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.part = self.path.with_name(self.path.name + ".part")
+        self.rows = 0
+        self._writer = None
+        if is_arrow(self.path):
+            import pyarrow as pa
+            self._writer = pa.ipc.new_file(str(self.part), schema(name))
+        else:
+            pd.DataFrame(columns=columns(name)).to_csv(self.part, index=False)
+
+    def write(self, df: pd.DataFrame) -> None:
+        if self._writer is not None:
+            self._writer.write_table(conform(df, self.name))
+        else:
+            df[columns(self.name)].to_csv(self.part, mode="a", header=False, index=False)
+        self.rows += len(df)
+
+    def close(self) -> None:
+        if self._writer is not None:
+            self._writer.close()
+        self.part.replace(self.path)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, *exc):
+        if exc_type is None:
+            self.close()
+        else:
+            if self._writer is not None:
+                self._writer.close()
+            self.part.unlink(missing_ok=True)
+
+def write_table(df: pd.DataFrame, path: str | Path, name: str) -> Path:
+    """Write `df` (schema `name`) to `path`, Arrow IPC or CSV by suffix."""
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    part = path.with_name(path.name + ".part")
+    if is_arrow(path):
+        import pyarrow as pa
+        table = conform(df, name)
+        with pa.ipc.new_file(str(part), table.schema) as w:
+            w.write_table(table)
+    else:
+        conform(df, name).to_pandas().to_csv(part, index=False)
+    part.replace(path)
+    return path
+
+def read_arrow(path: str | Path, columns: list[str] | None = None) -> pa.Table:
+    """Memory-mapped (zero-copy) Arrow table of an IPC file."""
+    import pyarrow as pa
+    table = pa.ipc.open_file(pa.memory_map(str(path), "r")).read_all()
+    return table.select(columns) if columns else table
+
+def read_table(path: str | Path, name: str | None = None, columns: list[str] | None = None) -> pd.DataFrame:
+    """
+    DataFrame from an Arrow IPC file (memory-mapped) or a CSV; with `name`, CSV columns are parsed
+    with the registered dtypes so both formats give the same frame.
+    """
+    if is_arrow(path):
+        return read_arrow(path, columns).to_pandas()
+    dtype = _pandas_dtypes(name) if name else None
+    return pd.read_csv(path, usecols=columns, dtype=dtype)
+
+def export_csv(src: str | Path, dst: str | Path) -> Path:
+    """Copy an Arrow IPC table to CSV (for analysts)."""
+    dst = Path(dst)
+    dst.parent.mkdir(parents=True, exist_ok=True)
+    read_table(src).to_csv(dst, index=False)
+    return dst
@@ -5,31 +5,170 @@ Baseline:
 - For each tank, maintain 'low' and 'high' reference values for a chosen index (e.g., SAR peak_to_mean).
 - Map current index to [0..1] via min-max with small margins.
 - Volume = capacity_bbl * height_fraction (if linear assumption).
+- Optionally, a per-roof-type strapping table maps height fraction → volume fraction
+  (piecewise-linear via np.interp) instead of the plain cylinder.
+- `fit_bounds` learns lo/hi for every tank at once from the feature history (robust quantiles after
+  MAD outlier rejection, one sort for all tanks); `save_calibration`/`load_calibration` keep one
+  versioned table per fit week and `apply_calibration` joins the as-of version onto feature rows.
 
+All functions broadcast over NumPy arrays; scalar inputs still return Python floats.
 This is intentionally simple; replace with your physics mapping or Bayesian model.
 """
 from __future__ import annotations
+from pathlib import Path
 import numpy as np
 import pandas as pd
 
-def height_fraction(index_value: float, lo: float, hi: float, eps: float = 1e-6) -> float:
-    if hi <= lo + eps:
-        return 0.5
-    v = (index_value - lo) / (hi - lo)
-    return float(np.clip(v, 0.0, 1.0))
+from ..utils.io import read_yaml
+from ..utils.metrics import count, timed
 
-def volume_from_fraction(diameter_m: float, shell_height_m: float, frac: float, bbl_per_m3: float = 6.28981) -> float:
-    r = diameter_m / 2.0
-    m3 = np.pi * (r**2) * shell_height_m * frac
-    return float(m3 * bbl_per_m3)
+# roof_type -> (height fractions, volume fractions of the nominal cylinder), both increasing in [0, 1].
+# The defaults are the plain cylinder; load real tables with `load_strapping_tables`.
+StrappingTables = dict[str, tuple[np.ndarray, np.ndarray]]
+CYLINDER = (np.array([0.0, 1.0]), np.array([0.0, 1.0]))
 
+def _scalar_or_array(a: np.ndarray):
+    return float(a) if a.ndim == 0 else a
+
+def height_fraction(index_value, lo, hi, eps: float = 1e-6):
+    index_value, lo, hi = (np.asarray(a, dtype=float) for a in (index_value, lo, hi))
+    degenerate = hi <= lo + eps
+    with np.errstate(divide="ignore", invalid="ignore"):
+        v = (index_value - lo) / (hi - lo)
+    return _scalar_or_array(np.where(degenerate, 0.5, np.clip(v, 0.0, 1.0)))
+
+def volume_from_fraction(diameter_m, shell_height_m, frac, bbl_per_m3: float = 6.28981,
+                         strapping: tuple[np.ndarray, np.ndarray] | None = None):
+    r = np.asarray(diameter_m, dtype=float) / 2.0
+    frac = np.asarray(frac, dtype=float)
+    if strapping is not None:
+        frac = np.interp(frac, strapping[0], strapping[1])
+    m3 = np.pi * (r**2) * np.asarray(shell_height_m, dtype=float) * frac
+    return _scalar_or_array(m3 * bbl_per_m3)
+
+def load_strapping_tables(path: str) -> StrappingTables:
+    """
+    YAML of the form:
+      floating: {height_frac: [0.0, 0.08, 1.0], volume_frac: [0.0, 0.06, 1.0]}
+    """
+    return {roof: (np.asarray(t["height_frac"], dtype=float), np.asarray(t["volume_frac"], dtype=float))
+            for roof, t in read_yaml(path).items()}
+
+CALIBRATION_COLUMNS = ["tank_id", "lo", "hi", "n_obs", "n_rejected", "first_week", "last_week"]
+
+def _group_quantile(xs: np.ndarray, starts: np.ndarray, counts: np.ndarray, q: float) -> np.ndarray:
+    """Linear-interpolated quantile of each group of an array sorted by (group, value)."""
+    if len(xs) == 0:
+        return np.full(len(counts), np.nan)
+    last = np.minimum(starts + np.maximum(counts - 1, 0), len(xs) - 1)
+    pos = starts + q * (last - starts)
+    i0 = np.minimum(np.floor(pos).astype(np.int64), last)
+    i1 = np.minimum(i0 + 1, last)
+    return np.where(counts > 0, xs[i0] + (pos - i0) * (xs[i1] - xs[i0]), np.nan)
+
+def _sorted_groups(codes: np.ndarray, x: np.ndarray, n_groups: int):
+    order = np.argsort(x)
+    order = order[np.argsort(codes[order], kind="stable")]   # by (group, value); faster than lexsort
+    counts = np.bincount(codes, minlength=n_groups)
+    starts = np.cumsum(counts) - counts
+    return order, starts, counts
+
+def fit_bounds(df: pd.DataFrame, index_col: str = "peak_to_mean", q_lo: float = 0.05, q_hi: float = 0.95,
+               mad_k: float = 4.0, min_obs: int = 8, tank_col: str = "tank_id", week_col: str = "week") -> pd.DataFrame:
+    """
+    Per-tank lo/hi from history rows (tank_id, week, index_col) in one vectorized pass:
+    rows further than `mad_k` robust SDs (1.4826 × MAD) from their tank's median are rejected,
+    then lo/hi are the `q_lo`/`q_hi` quantiles of the rest. Tanks with fewer than `min_obs`
+    kept rows get NaN bounds (consumers keep their default lo/hi). Columns: CALIBRATION_COLUMNS.
+    """
+    x = df[index_col].to_numpy(dtype=float)
+    ok = np.isfinite(x)
+    codes, tanks = pd.factorize(df[tank_col].astype(str).to_numpy()[ok])
+    x = x[ok]
+    wcodes, weeks = pd.factorize(df[week_col].astype(str).to_numpy()[ok], sort=True)
+    n = len(tanks)
+    order, starts, counts = _sorted_groups(codes, x, n)
+    med = _group_quantile(x[order], starts, counts, 0.5)
+    dev = np.abs(x - med[codes])
+    d_order, _, _ = _sorted_groups(codes, dev, n)
+    mad = _group_quantile(dev[d_order], starts, counts, 0.5)
+    keep = (dev <= mad_k * 1.4826 * mad[codes]) | (mad[codes] == 0)
+    # Dropping rows from the (tank, value)-sorted order keeps it sorted: no second sort
+    kept = order[keep[order]]
+    kcounts = np.bincount(codes[kept], minlength=n)
+    kstarts = np.cumsum(kcounts) - kcounts
+    lo = _group_quantile(x[kept], kstarts, kcounts, q_lo)
+    hi = _group_quantile(x[kept], kstarts, kcounts, q_hi)
+    enough = kcounts >= max(min_obs, 1)
+    span = pd.Series(wcodes).groupby(codes).agg(["min", "max"]).reindex(np.arange(n))
+    return pd.DataFrame({"tank_id": tanks, "lo": np.where(enough, lo, np.nan), "hi": np.where(enough, hi, np.nan),
+                         "n_obs": kcounts, "n_rejected": counts - kcounts,
+                         "first_week": np.asarray(weeks)[span["min"].to_numpy()],
+                         "last_week": np.asarray(weeks)[span["max"].to_numpy()]}, columns=CALIBRATION_COLUMNS)
+
+def save_calibration(table: pd.DataFrame, root: str | Path, through: str, **params) -> Path:
+    """Write `table` as version `through` (the last week it saw): <root>/calibration_<through>.parquet."""
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+    root = Path(root)
+    root.mkdir(parents=True, exist_ok=True)
+    path = root / f"calibration_{through}.parquet"
+    t = pa.Table.from_pandas(table, preserve_index=False)
+    meta = {b"through": str(through).encode(), **{k.encode(): str(v).encode() for k, v in params.items()}}
+    tmp = path.with_suffix(".tmp")
+    pq.write_table(t.replace_schema_metadata({**(t.schema.metadata or {}), **meta}), tmp)
+    tmp.replace(path)
+    return path
+
+def calibration_versions(root: str | Path) -> list[str]:
+    return sorted(p.stem.removeprefix("calibration_") for p in Path(root).glob("calibration_*.parquet"))
+
+def load_calibration(path: str | Path, week: str | None = None) -> pd.DataFrame:
+    """
+    A calibration table file, or from a versions directory the latest version fitted through
+    `week` or earlier (the newest one without `week`). Raises FileNotFoundError if there is none.
+    """
+    path = Path(path)
+    if path.is_dir():
+        versions = [v for v in calibration_versions(path) if week is None or v <= str(week)]
+        if not versions:
+            raise FileNotFoundError(f"no calibration version in {path} fitted through {week}")
+        path = path / f"calibration_{versions[-1]}.parquet"
+    table = pd.read_parquet(path)
+    table["tank_id"] = table["tank_id"].astype(str)
+    return table
+
+def apply_calibration(df: pd.DataFrame, table: pd.DataFrame, lo_col: str = "lo", hi_col: str = "hi") -> pd.DataFrame:
+    """In place: replace lo/hi of rows whose tank has fitted bounds; other rows keep theirs."""
+    fitted = table.dropna(subset=["lo", "hi"]).set_index("tank_id")
+    tank = df["tank_id"].astype(str)
+    for src, dst in (("lo", lo_col), ("hi", hi_col)):
+        new = tank.map(fitted[src]).to_numpy(dtype=float)
+        old = df[dst].to_numpy(dtype=float) if dst in df else np.full(len(df), np.nan)
+        df[dst] = np.where(np.isnan(new), old, new)
+    return df
+
+@timed("calibration")
 def apply_to_dataframe(df: pd.DataFrame, index_col: str, lo_col: str, hi_col: str,
-                       diameter_m_col: str, shell_height_m_col: str, out_col: str = "volume_bbl") -> pd.DataFrame:
-    out = df.copy()
-    out[out_col] = [
-        volume_from_fraction(
-            d, h, height_fraction(idx, lo, hi)
-        )
-        for idx, lo, hi, d, h in zip(out[index_col], out[lo_col], out[hi_col], out[diameter_m_col], out[shell_height_m_col])
-    ]
+                       diameter_m_col: str, shell_height_m_col: str, out_col: str = "volume_bbl",
+                       roof_type_col: str | None = None, strapping: StrappingTables | None = None,
+                       inplace: bool = False) -> pd.DataFrame:
+    """
+    Vectorized volume per row. With `strapping` (and `roof_type_col`), each roof type uses its
+    own piecewise-linear volume curve; roof types without a table fall back to the cylinder.
+    `inplace=True` adds `out_col` to `df` itself instead of returning a copy.
+    """
+    out = df if inplace else df.copy()
+    count("calibrated_rows", len(out))
+    frac = height_fraction(out[index_col].to_numpy(), out[lo_col].to_numpy(), out[hi_col].to_numpy())
+    frac = np.atleast_1d(frac)
+    if strapping and roof_type_col is not None:
+        roof = out[roof_type_col].to_numpy()
+        for rt in pd.unique(roof):
+            table = strapping.get(rt)
+            if table is not None:
+                m = roof == rt
+                frac[m] = np.interp(frac[m], table[0], table[1])
+    out[out_col] = volume_from_fraction(out[diameter_m_col].to_numpy(), out[shell_height_m_col].to_numpy(),
+                                        frac)
     return out
@@ -1,8 +1,157 @@
 """
-Simple nowcast placeholders (EWMA, state-space stubs).
+Nowcast models: EWMA helpers and a local-level Kalman filter/smoother vectorized across series.
+
+Local level model, one independent state per series (tank or site):
+  level_t = level_{t-1} + w,   w ~ N(0, q * dt)      (dt = time since the previous step, e.g. weeks)
+  y_t     = level_t + v,       v ~ N(0, r)           (r per observation, e.g. per sensor)
+Arrays are (T, n) for T steps × n series; NaN observations are missing (no update), so irregular
+acquisitions and sensors that only see some tanks need no special casing. Several observations of
+one series in the same step (an (T, m, n) array, e.g. S1 + optical) are fused by precision weighting,
+which equals sequential updates for independent noise. All loops run over time only.
 """
 from __future__ import annotations
+from dataclasses import dataclass
+from pathlib import Path
+import numpy as np
 import pandas as pd
 
 def ewma(series: pd.Series, alpha: float = 0.5) -> pd.Series:
     return series.ewm(alpha=alpha, adjust=False).mean()
+
+def ewma_from_store(store_root: str, column: str = "peak_to_mean", tank_ids: list[str] | None = None,
+                    start_week: str | None = None, end_week: str | None = None,
+                    alpha: float = 0.5) -> pd.DataFrame:
+    """
+    Per-tank EWMA of one feature read straight from the Parquet feature store (week × tank_id).
+    """
+    from ..feature_store import feature_history
+    hist = feature_history(store_root, column, tank_ids=tank_ids, start_week=start_week, end_week=end_week)
+    return hist.apply(ewma, alpha=alpha)
+
+def ewma_update(prev: float | None, x: float, alpha: float = 0.5) -> float:
+    """
+    One incremental step of `ewma` (adjust=False); the first observation seeds the state.
+    """
+    return float(x) if prev is None else float(alpha * x + (1.0 - alpha) * prev)
+
+def fuse_observations(y, r, axis: int = 1) -> tuple[np.ndarray, np.ndarray]:
+    """Precision-weighted mean and variance of the non-NaN observations along `axis` (NaN if none)."""
+    y = np.asarray(y, dtype=float)
+    r = np.broadcast_to(np.asarray(r, dtype=float), y.shape)
+    w = np.where(np.isnan(y), 0.0, 1.0 / r)
+    prec = w.sum(axis=axis)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.where(prec > 0, (w * np.nan_to_num(y)).sum(axis=axis) / prec, np.nan), 1.0 / prec
+
+def _update(x, p, y, r):
+    """Measurement update; an infinite prior variance (diffuse start) takes the observation as is."""
+    ok = ~np.isnan(y)
+    diffuse = np.isinf(p)
+    with np.errstate(invalid="ignore"):
+        k = np.where(diffuse, 1.0, p / (p + r))
+        x = np.where(ok, np.where(diffuse, y, x + k * (y - x)), x)
+        p = np.where(ok, np.where(diffuse, r, (1.0 - k) * p), p)
+    return x, p
+
+def kalman_filter(y, r, q, t=None, x0=None, p0=None) -> dict[str, np.ndarray]:
+    """
+    Forward pass over (T, n) or (T, m, n) observations `y` with noise variances `r` (broadcastable
+    to `y`), process variance `q` per unit time (scalar or (n,)) and step times `t` (default 0..T-1).
+    `x0`/`p0` is the prior for step 0 (default: diffuse). Returns filtered (x, p) and the one-step
+    predictions (x_pred, p_pred), all (T, n).
+    """
+    y = np.asarray(y, dtype=float)
+    if y.ndim == 3:
+        y, r = fuse_observations(y, r, axis=1)
+    r = np.broadcast_to(np.asarray(r, dtype=float), y.shape)
+    T, n = y.shape
+    t = np.arange(T, dtype=float) if t is None else np.asarray(t, dtype=float)
+    dt = np.diff(t, prepend=t[0])
+    q = np.broadcast_to(np.asarray(q, dtype=float), (n,))
+    x = np.zeros(n) if x0 is None else np.broadcast_to(np.asarray(x0, dtype=float), (n,)).copy()
+    p = np.full(n, np.inf) if p0 is None else np.broadcast_to(np.asarray(p0, dtype=float), (n,)).copy()
+    out = {k: np.empty((T, n)) for k in ("x", "p", "x_pred", "p_pred")}
+    for i in range(T):
+        p = p + q * dt[i]
+        out["x_pred"][i], out["p_pred"][i] = x, p
+        x, p = _update(x, p, y[i], r[i])
+        out["x"][i], out["p"][i] = x, p
+    return out
+
+def kalman_smoother(y, r, q, t=None, x0=None, p0=None) -> dict[str, np.ndarray]:
+    """`kalman_filter` plus a Rauch–Tung–Striebel backward pass; adds smoothed (x_smooth, p_smooth)."""
+    out = kalman_filter(y, r, q, t=t, x0=x0, p0=p0)
+    xs, ps = out["x"].copy(), out["p"].copy()
+    for i in range(len(xs) - 2, -1, -1):
+        # Gain is 0 where the series is still diffuse (never observed) at i or i+1
+        with np.errstate(invalid="ignore", divide="ignore"):
+            c = out["p"][i] / out["p_pred"][i + 1]
+        c = np.where(np.isfinite(c), c, 0.0)
+        with np.errstate(invalid="ignore"):
+            xs[i] = np.where(c > 0, out["x"][i] + c * (xs[i + 1] - out["x_pred"][i + 1]), out["x"][i])
+            ps[i] = np.where(c > 0, out["p"][i] + c**2 * (ps[i + 1] - out["p_pred"][i + 1]), out["p"][i])
+    out["x_smooth"], out["p_smooth"] = xs, ps
+    return out
+
+@dataclass
+class LocalLevelState:
+    """
+    Filter state for n series after the step at time `t`, for one-step updates as weeks land.
+    `update` reproduces `kalman_filter` exactly when fed the same steps in order. `ids` optionally
+    names the series so a state can be carried over to a changed series list with `reindex`.
+    """
+    x: np.ndarray
+    p: np.ndarray
+    t: float | None = None
+    ids: np.ndarray | None = None
+
+    @classmethod
+    def empty(cls, n: int, ids=None) -> LocalLevelState:
+        return cls(np.zeros(n), np.full(n, np.inf), ids=None if ids is None else np.asarray(ids, dtype=str))
+
+    def reindex(self, ids) -> LocalLevelState:
+        """Same state over series `ids`; series new to the state start diffuse."""
+        ids = np.asarray(ids, dtype=str)
+        pos = {k: i for i, k in enumerate((self.ids if self.ids is not None else np.empty(0, str)).tolist())}
+        src = np.array([pos.get(k, -1) for k in ids.tolist()], dtype=np.int64)
+        known = src >= 0
+        x, p = np.zeros(len(ids)), np.full(len(ids), np.inf)
+        x[known], p[known] = self.x[src[known]], self.p[src[known]]
+        return LocalLevelState(x, p, self.t, ids)
+
+    def update(self, y, r, q, t: float) -> LocalLevelState:
+        """Predict to time `t` and fuse the (n,) or (m, n) observations `y`; returns the new state."""
+        y = np.asarray(y, dtype=float)
+        if y.ndim == 2:
+            y, r = fuse_observations(y, r, axis=0)
+        if self.t is not None and t < self.t:
+            raise ValueError(f"state is at t={self.t}; cannot update at earlier t={t}")
+        p = self.p + np.asarray(q, dtype=float) * (0.0 if self.t is None else t - self.t)
+        x, p = _update(self.x, p, y, np.broadcast_to(np.asarray(r, dtype=float), y.shape))
+        return LocalLevelState(x, p, float(t), self.ids)
+
+    def save(self, path: str | Path) -> None:
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_name(path.name + ".tmp.npz")
+        extra = {} if self.ids is None else {"ids": np.asarray(self.ids, dtype=str)}
+        np.savez(tmp, x=self.x, p=self.p, t=np.nan if self.t is None else self.t, **extra)
+        tmp.replace(path)
+
+    @classmethod
+    def load(cls, path: str | Path) -> LocalLevelState:
+        with np.load(path, allow_pickle=False) as z:
+            t = float(z["t"])
+            return cls(z["x"], z["p"], None if np.isnan(t) else t, z["ids"] if "ids" in z else None)
+
+def site_total(x, p, z: float = 1.96, axis: int = -1) -> dict[str, np.ndarray]:
+    """
+    Sum of per-series levels with a ±z·sd band, treating series errors as independent.
+    Series without any observation yet (infinite variance) are left out of the total.
+    """
+    x, p = np.asarray(x, dtype=float), np.asarray(p, dtype=float)
+    seen = np.isfinite(p)
+    total = np.where(seen, x, 0.0).sum(axis=axis)
+    sd = np.sqrt(np.where(seen, p, 0.0).sum(axis=axis))
+    return {"total": total, "sd": sd, "lower": total - z * sd, "upper": total + z * sd,
+            "n_series": seen.sum(axis=axis)}
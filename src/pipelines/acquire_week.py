@@ -0,0 +1,128 @@
+"""
+Search and download a week's imagery for a site (S1 via ASF, S2/Landsat via STAC; `acquisition:` in
+the config). Searches are answered from the SQLite scene catalog when the same AOI/window was searched
+before; downloads run concurrently (bounded per provider), resume interrupted files and are verified
+against the catalog checksums before they enter the quota-bounded cache (`src.data.download`).
+
+The window is the 7 days ending on the week's Friday cutoff (same assignment as `profile_history.week_of`).
+Files are linked from the cache into --out:
+  <out>/*.tif           S1 RTC GeoTIFFs (with --rtc: granules batch-submitted to HyP3 unless a
+                        job of the week already exists, polled, extracted)
+  <out>/s1/*            S1 GRD products (without --rtc)
+  <out>/<sensor>/*      S2 / Landsat assets (+ <item>_SCL.tif scene classification sidecars for S2)
+  <out>/scenes.json     every scene found, with its local file
+"""
+from __future__ import annotations
+import argparse, asyncio, json, os, shutil
+from pathlib import Path
+import pandas as pd
+
+from ..config import AcquisitionConfig
+from ..data.catalog import AsfProvider, Provider, Scene, SceneCatalog, StacProvider
+from ..data.download import AcquisitionManager, SceneCache
+from ..utils.metrics import count, run_log, stage
+
+def week_window(week: str) -> tuple[str, str]:
+    """ISO start/end (UTC) of the 7 days ending on the `week` cutoff date."""
+    end = pd.Timestamp(week).normalize()
+    start = end - pd.Timedelta(days=6)
+    return f"{start.date()}T00:00:00Z", f"{end.date()}T23:59:59Z"
+
+def providers_from_config(cfg: AcquisitionConfig) -> dict[str, Provider]:
+    out: dict[str, Provider] = {}
+    for name, p in cfg.providers.items():
+        if p.kind == "asf":
+            out[name] = AsfProvider(url=p.url, name=name, max_concurrency=p.max_concurrency)
+        elif p.kind == "stac":
+            out[name] = StacProvider(p.url, p.collection, p.asset, name, mask_asset=p.mask_asset,
+                                     max_concurrency=p.max_concurrency)
+        else:
+            raise ValueError(f"provider {name}: unknown kind {p.kind!r} (expected asf or stac)")
+    return out
+
+def build_manager(cfg: AcquisitionConfig) -> AcquisitionManager:
+    max_age = cfg.catalog_max_age_days * 86400 if cfg.catalog_max_age_days is not None else None
+    settle = cfg.catalog_settle_days * 86400 if cfg.catalog_settle_days is not None else None
+    quota = int(cfg.quota_gb * 1e9) if cfg.quota_gb is not None else None
+    return AcquisitionManager(providers_from_config(cfg), SceneCache(cfg.cache_dir, quota),
+                              SceneCatalog(cfg.catalog, max_age, settle), retries=cfg.retries)
+
+def _place(src: Path, dest: Path) -> Path:
+    """Hard-link a cached file into the week directory (copy across filesystems)."""
+    if not dest.exists():
+        dest.parent.mkdir(parents=True, exist_ok=True)
+        try:
+            os.link(src, dest)
+        except OSError:
+            shutil.copy2(src, dest)
+    return dest
+
+async def acquire_week(manager: AcquisitionManager, bbox, week: str, sensors: list[str], out: str | Path,
+                       hyp3=None, poll: float = 60.0, pol: str = "VV") -> list[dict]:
+    """Fetch every scene of the week; `hyp3` (a `Hyp3Client`) turns S1 granules into RTC GeoTIFFs."""
+    from ..data.hyp3 import extract_rtc
+    out = Path(out)
+    start, end = week_window(week)
+    found: dict[str, list[Scene]] = {}
+    with stage("search", sensors=len(sensors)):
+        for sensor in sensors:
+            found[sensor] = await asyncio.to_thread(manager.search, sensor, bbox, start, end)
+            count(f"{sensor}_scenes", len(found[sensor]))
+    records = []
+    if hyp3 is not None and found.get("s1"):
+        with stage("hyp3", granules=len(found["s1"])):
+            job_ids = await asyncio.to_thread(hyp3.jobs_for, [s.scene_id for s in found["s1"]], f"oil-nowcast-{week}")
+            products, failed = await hyp3.wait(job_ids, poll=poll)
+            count("hyp3_failed", len(failed))
+        found["s1"] = products
+    with stage("download", scenes=sum(len(v) for v in found.values())):
+        paths = await manager.fetch([s for v in found.values() for s in v])
+    for sensor, scenes in found.items():
+        for s in scenes:
+            src = paths[s.scene_id]
+            if s.provider == "hyp3":
+                local = extract_rtc(src, out, pol=pol)
+            else:
+                local = _place(src, out / sensor / src.name)
+            records.append({**s.to_json(), "sensor": sensor, "path": str(local)})
+    out.mkdir(parents=True, exist_ok=True)
+    (out / "scenes.json").write_text(json.dumps(records, indent=1))
+    count("cache_hits", manager.cache.stats["hits"])
+    count("downloads", manager.cache.stats["downloads"])
+    return records
+
+def main(argv: list[str] | None = None):
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--aoi", required=True, help="AOI GeoJSON (its bounding box is searched)")
+    ap.add_argument("--week", required=True, help="Friday cutoff date, YYYY-MM-DD")
+    ap.add_argument("--sensors", nargs="+", default=["s1", "s2", "landsat"], help="Provider names from the config")
+    ap.add_argument("--out", required=True, help="Week scene directory, e.g. data/scenes/<site>/<week>")
+    ap.add_argument("--rtc", action="store_true", help="Process S1 granules to RTC on HyP3 (Earthdata auth via ~/.netrc)")
+    ap.add_argument("--poll", type=float, default=60.0, help="HyP3 polling interval (s)")
+    ap.add_argument("--config", default=None, help="Optional config YAML for acquisition")
+    ap.add_argument("--run-log", default=None, help="Append timings/counts to this JSONL run log")
+    args = ap.parse_args(argv)
+    cfg = AcquisitionConfig()
+    if args.config:
+        from ..config import load_config
+        cfg = load_config(args.config).acquisition
+    unknown = set(args.sensors) - set(cfg.providers)
+    if unknown:
+        ap.error(f"no provider configured for {', '.join(sorted(unknown))}")
+    from ..cube import aoi_bounds
+    manager = build_manager(cfg)
+    hyp3 = None
+    if args.rtc:
+        from ..data.hyp3 import Hyp3Client
+        hyp3 = Hyp3Client(cfg.hyp3_url, session=manager.session)
+    try:
+        with run_log(args.run_log, step="acquire_week", week=args.week):
+            records = asyncio.run(acquire_week(manager, aoi_bounds(args.aoi), args.week, args.sensors, args.out,
+                                               hyp3=hyp3, poll=args.poll))
+    finally:
+        manager.close()
+        manager.catalog.close()
+    print(f"{len(records)} scenes -> {args.out}")
+
+if __name__ == "__main__":
+    main()
@@ -1,60 +1,135 @@
 
 """
 Aggregate per-tank features to volumes and site totals for a given week.
-- Converts 'peak_to_mean' via per-tank lo/hi bounds into a height fraction.
-- Maps height fraction → volume using tank geometry (diameter from radius_m) and a default shell height.
+- Converts 'peak_to_mean' via per-tank lo/hi bounds into a height fraction. With --calibration
+  (a versions directory from src.pipelines.fit_calibration, or one table), fitted bounds are joined
+  by tank_id from the latest version fitted through the week; tanks without a fit keep the rows' lo/hi.
+- Maps height fraction → volume using tank geometry (diameter from radius_m) and a default shell height,
+  optionally through per-roof-type strapping tables (--strapping YAML).
+- Features come from the Parquet feature store (a directory, read with a week filter) or a per-tank
+  table (Arrow IPC, memory-mapped, or CSV; see `src.interchange`).
 
-Outputs:
-  outputs/{week}/site_aggregate.csv  with columns: week,total_volume_bbl,num_tanks
+- With --state, folds the week into a persisted running state (see `src.aggregate.WeeklyState`):
+  the tanks GeoJSON is only re-parsed when it changes, re-running a seen week is a lookup, and
+  the row also carries the weekly change and the EWMA nowcast.
+
+Outputs (Arrow IPC for .arrow paths, else CSV; schema site_aggregate):
+  outputs/{site}/{week}/site_aggregate.arrow  with columns: week,total_volume_bbl,num_tanks
+                                              (+ weekly_change_bbl,nowcast_ewma_bbl with --state)
 """
 from __future__ import annotations
-import argparse, json
+import argparse
 from pathlib import Path
 import pandas as pd
 
-from ..models.calibration import apply_to_dataframe
-
-def aggregate(features_csv: str, tanks_geojson: str, out_csv: str, shell_height_m: float,
-              index_col: str = "peak_to_mean", lo_col: str = "lo", hi_col: str = "hi") -> pd.DataFrame:
-    df = pd.read_csv(features_csv)
-    # Merge tanks geometry to get radius (diameter)
-    g = json.loads(Path(tanks_geojson).read_text())
-    geom_df = pd.DataFrame([
-        {"tank_id": f["properties"].get("id", "tank_unknown"),
-         "radius_m": float(f["properties"].get("radius_m", 50.0))}
-        for f in g["features"]
-    ])
-    df = df.merge(geom_df, on="tank_id", how="left")
+from ..aggregate import WeeklyState, input_fingerprint
+from ..interchange import read_table, write_table
+from ..models.calibration import apply_calibration, apply_to_dataframe, load_calibration, load_strapping_tables
+from ..utils.metrics import count, run_log, stage
+
+def load_features(features: str, week: str | None = None, sensor: str | None = None) -> pd.DataFrame:
+    if Path(features).is_dir():
+        from ..feature_store import read_week
+        if week is None:
+            raise ValueError("--week is required when reading from the feature store")
+        df = read_week(features, week, sensor=sensor)
+        df["tank_id"] = df["tank_id"].astype(str)
+        return df
+    df = read_table(features)
+    return df[df["sensor"] == sensor] if sensor is not None and "sensor" in df else df
+
+def tank_volumes(df: pd.DataFrame, radii: pd.Series, shell_height_m: float, index_col: str = "peak_to_mean",
+                 lo_col: str = "lo", hi_col: str = "hi", strapping=None,
+                 calibration: pd.DataFrame | None = None) -> pd.DataFrame:
+    """
+    Add radius_m/diameter_m/shell_height_m (radii by tank_id) and volume_bbl to feature rows, in place.
+    `calibration` (CALIBRATION_COLUMNS) overrides lo/hi of the tanks it has bounds for.
+    """
+    if calibration is not None:
+        apply_calibration(df, calibration, lo_col, hi_col)
+    df["radius_m"] = df["tank_id"].map(radii)
     df["diameter_m"] = df["radius_m"] * 2.0
     df["shell_height_m"] = float(shell_height_m)
+    return apply_to_dataframe(df, index_col=index_col, lo_col=lo_col, hi_col=hi_col,
+                              diameter_m_col="diameter_m", shell_height_m_col="shell_height_m",
+                              out_col="volume_bbl", roof_type_col="roof_type" if "roof_type" in df else None,
+                              strapping=strapping, inplace=True)
 
-    df_vol = apply_to_dataframe(df, index_col=index_col, lo_col=lo_col, hi_col=hi_col,
-                                diameter_m_col="diameter_m", shell_height_m_col="shell_height_m",
-                                out_col="volume_bbl")
+def aggregate(features: str, tanks_geojson: str, out: str, shell_height_m: float,
+              index_col: str = "peak_to_mean", lo_col: str = "lo", hi_col: str = "hi",
+              week: str | None = None, strapping_yaml: str | None = None,
+              state_path: str | None = None, alpha: float = 0.5, calibration: str | None = None,
+              sensor: str | None = None) -> pd.DataFrame:
+    state = fingerprint = None
+    if state_path:
+        state = WeeklyState(state_path, alpha=alpha)
+        source = Path(features) / f"week={week}" if Path(features).is_dir() else features
+        if sensor is not None and Path(source).is_dir():
+            source = Path(source) / f"sensor={sensor}"
+        fingerprint = input_fingerprint(source, tanks_geojson, strapping_yaml or "", calibration or "",
+                                        shell_height_m=shell_height_m, sensor=sensor,
+                                        index_col=index_col, lo_col=lo_col, hi_col=hi_col)
+        cached = state.lookup(week, fingerprint) if week else None
+        if cached is not None:
+            count("state_hits")
+            return _write(pd.DataFrame([cached]), out)
 
-    site_total = df_vol["volume_bbl"].sum()
-    out = pd.DataFrame([{
-        "week": df["week"].iloc[0] if "week" in df else "unknown",
-        "total_volume_bbl": float(site_total),
-        "num_tanks": int(len(df_vol))
+    with stage("load_features") as s:
+        df = load_features(features, week, sensor)
+        s["rows"] = len(df)
+    # Attach tank geometry to get radius (diameter)
+    with stage("load_tanks"):
+        if state is not None:
+            radii = state.tank_radii(tanks_geojson)
+        else:
+            from ..utils.scene import load_tanks
+            radii = load_tanks(tanks_geojson).set_index("tank_id")["radius_m"]
+    strapping = load_strapping_tables(strapping_yaml) if strapping_yaml else None
+    table = load_calibration(calibration, week) if calibration else None
+    df_vol = tank_volumes(df, radii, shell_height_m, index_col, lo_col, hi_col, strapping, table)
+
+    week = week or (df["week"].iloc[0] if "week" in df else "unknown")
+    if state is not None:
+        row = state.add_week(week, df_vol["tank_id"], df_vol["volume_bbl"], fingerprint)
+        state.save()
+        return _write(pd.DataFrame([row]), out)
+
+    # A tank seen in several scenes of the week counts once, at its mean volume
+    per_tank = df_vol.groupby("tank_id", sort=False)["volume_bbl"].mean()
+    row = pd.DataFrame([{
+        "week": week,
+        "total_volume_bbl": float(per_tank.sum()),
+        "num_tanks": int(df_vol["tank_id"].nunique())
     }])
-    Path(out_csv).parent.mkdir(parents=True, exist_ok=True)
-    out.to_csv(out_csv, index=False)
-    return out
+    return _write(row, out)
+
+def _write(row: pd.DataFrame, out: str) -> pd.DataFrame:
+    write_table(row, out, "site_aggregate")
+    return row
 
-def main():
+def main(argv: list[str] | None = None):
     ap = argparse.ArgumentParser()
-    ap.add_argument("--features", required=True)
-    ap.add_argument("--tanks", required=True)
-    ap.add_argument("--out", required=True)
+    ap.add_argument("--features", required=True, help="Feature store root or per-tank table (.arrow/.csv)")
+    ap.add_argument("--week", default=None, help="Week to read from the feature store")
+    ap.add_argument("--sensor", default=None, help="Only aggregate rows of this sensor (default: all)")
+    ap.add_argument("--tanks", required=True, help="Tanks GeoJSON or pre-parsed tanks .parquet")
+    ap.add_argument("--out", required=True, help="Site aggregate: .arrow (Arrow IPC) or .csv")
     ap.add_argument("--shell-height", type=float, default=18.0)
     ap.add_argument("--index-col", default="peak_to_mean")
     ap.add_argument("--lo-col", default="lo")
     ap.add_argument("--hi-col", default="hi")
-    args = ap.parse_args()
-    aggregate(args.features, args.tanks, args.out,
-              shell_height_m=args.shell_height,
-              index_col=args.index_col, lo_col=args.lo_col, hi_col=args.hi_col)
+    ap.add_argument("--strapping", default=None, help="Optional per-roof-type strapping tables (YAML)")
+    ap.add_argument("--state", default=None, help="Running aggregation state (JSON) for incremental weeks")
+    ap.add_argument("--alpha", type=float, default=0.5, help="EWMA alpha for the nowcast state")
+    ap.add_argument("--calibration", default=None, help="Fitted lo/hi: versions directory or one .parquet table")
+    ap.add_argument("--run-log", default=None, help="Append timings/row counts to this JSONL run log")
+    args = ap.parse_args(argv)
+    with run_log(args.run_log, step="aggregate_week", week=args.week):
+        aggregate(args.features, args.tanks, args.out,
+                  shell_height_m=args.shell_height,
+                  index_col=args.index_col, lo_col=args.lo_col, hi_col=args.hi_col, week=args.week,
+                  strapping_yaml=args.strapping, state_path=args.state, alpha=args.alpha,
+                  calibration=args.calibration, sensor=args.sensor)
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,200 @@
+
+"""
+Extract per-tank features for every scene that falls inside a week: SAR arc features for S1,
+optical shadow metrics for S2/Landsat (--sensor).
+
+Scenes are fanned out over a process pool. The tank table (lon, lat, radius_m) is placed
+in shared memory once; each worker attaches to it in its initializer and builds a
+`src.tanks.PointGrid` over it, so tasks only carry a scene path and each scene only
+projects and reads the tanks inside its footprint. Finished scenes are appended to the output CSV and/or the Parquet feature
+store (partition week=<week>/sensor=<sensor>) as they complete. With --profile-cache, raw
+profiles are looked up in a content-addressed cache first and only misses touch the raster.
+
+Before any full-resolution read, each scene's tanks go through a quality pre-pass on a decimated
+overview (S2: the `<scene>_SCL.tif` sidecar when present, see `src.features.quality`); tanks below
+`min_quality`/`min_contrast` (features.optical_shadow / features.sar_arc) are not extracted and are
+listed in --skipped with their score and reason (outside, nodata, cloud, low_contrast).
+
+Outputs one row per (scene, tank), an Arrow IPC file for .arrow/.feather paths, CSV otherwise
+(`src.interchange` schemas scene_features / optical_scene_features / quality_skips) with columns:
+  tank_id, week, scene_id, sensor, radius_m, peak, mean, std, peak_to_mean, arc_width_deg, concentration
+or, for optical sensors:
+  tank_id, week, scene_id, sensor, radius_m, shadow_fraction, rim_dark_ratio
+"""
+from __future__ import annotations
+import argparse, glob, os, time
+from contextlib import ExitStack
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from multiprocessing import shared_memory
+from pathlib import Path
+import numpy as np
+import pandas as pd
+
+from ..config import OpticalShadow, SarArc
+from ..features.profile_cache import ProfileCache, cached_profiles
+from ..features.sar_double_bounce import arc_features_batch
+from ..interchange import TableWriter, columns as schema_columns
+from ..tanks import PointGrid
+from ..utils.metrics import count, event, run_log, stage
+from ..utils.scene import scene_profiles, scene_quality, scene_shadow_metrics, load_tanks, tanks_to_pixels
+
+COLUMNS = schema_columns("scene_features")
+OPTICAL_COLUMNS = schema_columns("optical_scene_features")
+OPTICAL_SENSORS = ("s2", "landsat")
+SKIP_COLUMNS = schema_columns("quality_skips")
+
+_TANKS: np.ndarray | None = None
+_SHM: shared_memory.SharedMemory | None = None
+_GRID: PointGrid | None = None
+_CACHE: ProfileCache | None = None
+
+def _attach_tanks(shm_name: str, shape: tuple[int, int], cache_path: str | None = None) -> None:
+    """Worker initializer: map the shared (lon, lat, radius_m) table once per process."""
+    global _TANKS, _SHM, _CACHE, _GRID
+    _SHM = shared_memory.SharedMemory(name=shm_name)
+    _TANKS = np.ndarray(shape, dtype=np.float64, buffer=_SHM.buf)
+    _GRID = PointGrid(_TANKS[:, 0], _TANKS[:, 1])
+    _CACHE = ProfileCache(cache_path) if cache_path else None
+
+def _scene_features(scene_path: str, sar: dict, optical: dict | None = None,
+                    gate: dict | None = None) -> tuple[pd.DataFrame, dict]:
+    """
+    Worker task: features for the tanks inside one scene's footprint (tank rows by index), plus
+    the scene's wall time and profile-cache hit/miss counts. `optical` selects shadow metrics;
+    with `gate` (`scene_quality` kwargs), tanks failing the quality pre-pass are skipped and
+    returned as stats["skipped"] (tank_idx, quality, reason).
+    """
+    import rasterio
+    t0 = time.perf_counter()
+    from rasterio.warp import transform_bounds
+    with rasterio.open(scene_path) as ds:
+        transform, crs = ds.transform, ds.crs
+        bounds = transform_bounds(crs, "EPSG:4326", *ds.bounds) if crs else tuple(ds.bounds)
+    r_max = float(_TANKS[:, 2].max(initial=0.0)) * max(sar["annulus_outer_frac"], 1.0)
+    idx = _GRID.query(bounds, pad_m=r_max)
+    skipped = None
+    if gate is not None and len(idx):
+        q = scene_quality(scene_path, _TANKS[idx, 0], _TANKS[idx, 1], _TANKS[idx, 2], **gate)
+        bad = ~q["passed"]
+        skipped = pd.DataFrame({"tank_idx": idx[bad], "quality": q["quality"][bad], "reason": q["reason"][bad]})
+        idx = idx[q["passed"]]
+    tanks_px = tanks_to_pixels(_TANKS[idx, 0], _TANKS[idx, 1], _TANKS[idx, 2], transform, crs)
+    if optical is not None:
+        m = scene_shadow_metrics(scene_path, tanks_px, threshold=optical["threshold"])
+        feats = pd.DataFrame({"tank_idx": idx, "scene_id": Path(scene_path).stem,
+                              "shadow_fraction": m["shadow_fraction"], "rim_dark_ratio": m["rim_dark_ratio"]})
+        return feats, {"scene_id": Path(scene_path).stem, "seconds": time.perf_counter() - t0, "skipped": skipped}
+    args = (sar["annulus_inner_frac"], sar["annulus_outer_frac"], sar["azimuth_bins"])
+    stats = {}
+    if _CACHE is not None:
+        before = dict(_CACHE.stats)
+        prof = cached_profiles(_CACHE, _CACHE.scene_digest(scene_path), tanks_px,
+                               lambda t: scene_profiles(scene_path, t, *args), *args)
+        stats = {k: v - before[k] for k, v in _CACHE.stats.items()}
+    else:
+        prof = scene_profiles(scene_path, tanks_px, *args)
+    feats = pd.DataFrame(arc_features_batch(prof))
+    feats.insert(0, "tank_idx", idx)
+    feats.insert(1, "scene_id", Path(scene_path).stem)
+    return feats, {"scene_id": Path(scene_path).stem, "seconds": time.perf_counter() - t0, "skipped": skipped, **stats}
+
+def extract_week(scenes: list[str], tanks_geojson: str, out: str | None, week: str,
+                 workers: int | None = None, sar: SarArc = SarArc(), sensor: str = "s1",
+                 store: str | None = None, profile_cache: str | None = None,
+                 optical: OpticalShadow = OpticalShadow(), use_scl: bool = True, skipped: str | None = None) -> int:
+    """
+    Run `_scene_features` over `scenes` with `workers` processes (default: all cores) and
+    stream rows into `out` and/or `store`, skipped tanks into `skipped` (Arrow IPC or CSV by
+    suffix). Returns the number of rows written.
+    """
+    with stage("load_tanks") as s:
+        tanks = load_tanks(tanks_geojson)
+        s["tanks"] = len(tanks)
+    arr = tanks[["lon", "lat", "radius_m"]].to_numpy(dtype=np.float64)
+    shm = shared_memory.SharedMemory(create=True, size=max(arr.nbytes, 1))
+    np.ndarray(arr.shape, dtype=np.float64, buffer=shm.buf)[:] = arr
+
+    schema = "optical_scene_features" if sensor in OPTICAL_SENSORS else "scene_features"
+    columns = OPTICAL_COLUMNS if sensor in OPTICAL_SENSORS else COLUMNS
+    optical_cfg = optical.model_dump() if sensor in OPTICAL_SENSORS else None
+    q = optical if sensor in OPTICAL_SENSORS else sar
+    gate = None
+    if q.min_quality > 0 or q.min_contrast > 0:
+        gate = {"decimate": q.overview_decimation, "use_scl": use_scl and sensor == "s2",
+                "min_quality": q.min_quality, "min_contrast": q.min_contrast}
+    n_rows = 0
+    cache_stats = {"hits": 0, "misses": 0, "evictions": 0}
+    try:
+        with ExitStack() as files, stage("scenes", scenes=len(scenes)):
+            pool = files.enter_context(ProcessPoolExecutor(max_workers=workers or os.cpu_count(), initializer=_attach_tanks,
+                                                           initargs=(shm.name, arr.shape, profile_cache)))
+            writer = files.enter_context(TableWriter(out, schema)) if out else None
+            skip_writer = files.enter_context(TableWriter(skipped, "quality_skips")) if skipped else None
+            futures = [pool.submit(_scene_features, s, sar.model_dump(), optical_cfg, gate) for s in scenes]
+            for fut in as_completed(futures):
+                feats, stats = fut.result()
+                for k in cache_stats:
+                    cache_stats[k] += stats.get(k, 0)
+                skip = stats["skipped"]
+                n_skip = 0 if skip is None else len(skip)
+                event("scene", scene_id=stats["scene_id"], seconds=stats["seconds"], tanks=len(feats), skipped=n_skip)
+                if n_skip:
+                    for reason, n in skip["reason"].value_counts().items():
+                        count(f"skipped_{reason}", int(n))
+                    if skip_writer is not None:
+                        skip.insert(0, "tank_id", tanks["tank_id"].to_numpy()[skip.pop("tank_idx").to_numpy()])
+                        skip.insert(1, "week", week)
+                        skip.insert(2, "scene_id", stats["scene_id"])
+                        skip.insert(3, "sensor", sensor)
+                        skip_writer.write(skip)
+                idx = feats.pop("tank_idx").to_numpy()
+                feats.insert(0, "tank_id", tanks["tank_id"].to_numpy()[idx])
+                feats.insert(1, "week", week)
+                feats.insert(3, "sensor", sensor)
+                feats.insert(4, "radius_m", tanks["radius_m"].to_numpy()[idx])
+                if writer is not None:
+                    writer.write(feats)
+                if store:
+                    from ..feature_store import write_features
+                    write_features(feats[columns], store)
+                n_rows += len(feats)
+                count("rows", len(feats))
+    finally:
+        shm.close()
+        shm.unlink()
+    if profile_cache:
+        for k, v in cache_stats.items():
+            count(f"profile_cache_{k}", v)
+        event("profile_cache", **cache_stats)
+    return n_rows
+
+def main(argv: list[str] | None = None):
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--scenes", nargs="+", required=True, help="Scene GeoTIFFs or glob patterns for the week")
+    ap.add_argument("--tanks", required=True, help="Tanks GeoJSON (points with radius_m) or pre-parsed tanks .parquet")
+    ap.add_argument("--out", default=None, help="Optional per-(scene, tank) table: .arrow (Arrow IPC) or .csv")
+    ap.add_argument("--store", default=None, help="Feature store root (Parquet, partitioned by week/sensor)")
+    ap.add_argument("--week", required=True, help="Week label, e.g., 2025-01-03")
+    ap.add_argument("--sensor", default="s1", choices=["s1", *OPTICAL_SENSORS])
+    ap.add_argument("--workers", type=int, default=None, help="Worker processes (default: all cores)")
+    ap.add_argument("--config", default=None, help="Optional config YAML for features.sar_arc/optical_shadow")
+    ap.add_argument("--profile-cache", default=None, help="SQLite profile cache path (content-addressed)")
+    ap.add_argument("--skipped", default=None, help="Optional table (.arrow/.csv) of tanks skipped by the quality pre-pass")
+    ap.add_argument("--run-log", default=None, help="Append per-stage/per-scene timings to this JSONL run log")
+    args = ap.parse_args(argv)
+    if not (args.out or args.store):
+        ap.error("one of --out/--store is required")
+    scenes = sorted(p for pat in args.scenes for p in (glob.glob(pat) or [pat]) if not Path(p).stem.endswith("_SCL"))
+    sar, optical, use_scl = SarArc(), OpticalShadow(), True
+    if args.config:
+        from ..config import load_config
+        cfg = load_config(args.config)
+        sar, optical = cfg.features.sar_arc, cfg.features.optical_shadow
+        use_scl = cfg.sensors.sentinel2.use_scl
+    with run_log(args.run_log, step="extract_week", week=args.week, sensor=args.sensor):
+        extract_week(scenes, args.tanks, args.out, args.week, workers=args.workers, sar=sar, sensor=args.sensor,
+                     store=args.store, profile_cache=args.profile_cache, optical=optical, use_scl=use_scl,
+                     skipped=args.skipped)
+
+if __name__ == "__main__":
+    main()
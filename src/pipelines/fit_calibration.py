@@ -0,0 +1,51 @@
+"""
+Fit per-tank lo/hi calibration bounds from the feature store history and save them as a new
+version (`models.calibration.save_calibration`): <out>/calibration_<through>.parquet.
+
+Only the trailing `window_weeks` up to --through are read (partition pruning on week, three
+columns). All tanks are fitted in one vectorized pass (`models.calibration.fit_bounds`).
+aggregate_week --calibration <out> then joins the latest version fitted through its week.
+"""
+from __future__ import annotations
+import argparse
+import pandas as pd
+
+from ..config import CalibrationConfig
+from ..models.calibration import fit_bounds, save_calibration
+from ..utils.metrics import run_log, stage
+
+def fit_calibration(store: str, out_dir: str, through: str, cfg: CalibrationConfig = CalibrationConfig(),
+                    sensor: str | None = None) -> pd.DataFrame:
+    import pyarrow.dataset as ds
+    from ..feature_store import read_features
+    start = (pd.Timestamp(through) - pd.Timedelta(weeks=cfg.window_weeks)).date().isoformat()
+    expr = (ds.field("week") > start) & (ds.field("week") <= str(through))
+    if sensor is not None:
+        expr = expr & (ds.field("sensor") == sensor)
+    with stage("read_history") as s:
+        df = read_features(store, columns=["tank_id", "week", cfg.index_col], filters=expr)
+        s["rows"] = len(df)
+    with stage("fit_bounds"):
+        table = fit_bounds(df, cfg.index_col, cfg.q_lo, cfg.q_hi, cfg.mad_k, cfg.min_obs)
+    save_calibration(table, out_dir, through, sensor=sensor or "all", **cfg.model_dump())
+    return table
+
+def main(argv: list[str] | None = None):
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--features", required=True, help="Feature store root")
+    ap.add_argument("--out", required=True, help="Calibration versions directory")
+    ap.add_argument("--through", required=True, help="Last week of history to fit (the version label)")
+    ap.add_argument("--sensor", default=None, help="Only fit on this sensor's rows")
+    ap.add_argument("--config", default=None, help="Config YAML for the calibration section")
+    ap.add_argument("--run-log", default=None, help="Append timings/row counts to this JSONL run log")
+    args = ap.parse_args(argv)
+    cfg = CalibrationConfig()
+    if args.config:
+        from ..config import load_config
+        cfg = load_config(args.config).calibration
+    with run_log(args.run_log, step="fit_calibration", week=args.through):
+        table = fit_calibration(args.features, args.out, args.through, cfg, sensor=args.sensor)
+    print(f"calibration {args.through}: {int(table['lo'].notna().sum())}/{len(table)} tanks fitted")
+
+if __name__ == "__main__":
+    main()
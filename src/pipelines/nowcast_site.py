@@ -0,0 +1,181 @@
+"""
+Site nowcast from the feature store: a per-tank local-level Kalman filter (`models.nowcast`) over
+volume observations from every sensor, summed to a site total with an uncertainty band.
+
+- Batch (default): every week in the store up to --through is filtered and smoothed in one pass,
+  vectorized across tanks; one row per week (backfills).
+- Incremental (--week W --state S): one predict/update step from the saved filter state when week W
+  lands. Re-running W restarts from the state before W (kept next to S as <S>.prev.npz).
+
+Observation noise per row is (sensor_sd_frac[sensor] × tank capacity)², process noise is
+(process_sd_frac × capacity)² per week (`config.NowcastConfig`); several scenes/sensors of a tank
+in one week are fused by precision weighting and weeks without observations only widen the band.
+Rows carry the EIA release (EIAConfig.release_time_local) the week's nowcast is due for.
+With --calibration (fit_calibration versions), each week's lo/hi come from the latest version
+fitted through that week, as in aggregate_week; weeks older than the first version keep their own.
+
+Outputs columns:
+  week, eia_release, nowcast_bbl, nowcast_sd_bbl, nowcast_lower_bbl, nowcast_upper_bbl,
+  tanks_observed, tanks_estimated   (+ smoothed_bbl, smoothed_sd_bbl in batch mode)
+"""
+from __future__ import annotations
+import argparse
+from pathlib import Path
+import numpy as np
+import pandas as pd
+
+from ..config import NowcastConfig
+from ..models.calibration import apply_calibration, calibration_versions, load_calibration, load_strapping_tables, volume_from_fraction
+from ..models.nowcast import LocalLevelState, kalman_smoother, site_total
+from ..utils.metrics import run_log, stage
+from ..utils.scene import load_tanks
+from .aggregate_week import load_features, tank_volumes
+
+# Fallback only; the release time lives in config (eia.release_time_local), see _settings.
+RELEASE_TIME_LOCAL = "WED 10:30 America/New_York"
+_DAYS = {d: i for i, d in enumerate(["MON", "TUE", "WED", "THU", "FRI", "SAT", "SUN"])}
+
+def eia_release_time(week: str, release_time_local: str = RELEASE_TIME_LOCAL) -> pd.Timestamp:
+    """First "<DAY> HH:MM <tz>" release strictly after the week's cutoff date."""
+    day, hhmm, tz = release_time_local.split()
+    d = pd.Timestamp(week)
+    ahead = (_DAYS[day[:3].upper()] - d.weekday() - 1) % 7 + 1
+    return pd.Timestamp(f"{(d + pd.Timedelta(days=ahead)).date()} {hhmm}").tz_localize(tz)
+
+def week_time(week) -> float:
+    """Weeks since the epoch, the time axis of the filter (gaps between weeks scale the drift)."""
+    return pd.Timestamp(week).value / (7 * 86400e9)
+
+def _tanks(tanks: str, shell_height_m: float) -> tuple[np.ndarray, pd.Series, np.ndarray]:
+    t = load_tanks(tanks)
+    radii = t.set_index("tank_id")["radius_m"]
+    capacity = np.asarray(volume_from_fraction(2.0 * t["radius_m"].to_numpy(), shell_height_m, 1.0), dtype=float)
+    return t["tank_id"].to_numpy(dtype=str), radii, capacity
+
+def _observations(rows: pd.DataFrame, ids: np.ndarray, capacity: np.ndarray,
+                  cfg: NowcastConfig) -> tuple[np.ndarray, np.ndarray]:
+    """Per-tank (y, r) for one week: precision-weighted fusion of all rows of a tank (NaN if none)."""
+    idx = rows["tank_id"].map(pd.Series(np.arange(len(ids)), index=ids)).to_numpy(dtype=float)
+    vol = rows["volume_bbl"].to_numpy(dtype=float)
+    ok = ~np.isnan(idx) & np.isfinite(vol)
+    idx = idx[ok].astype(np.int64)
+    sensor = rows["sensor"] if "sensor" in rows else pd.Series("", index=rows.index)
+    sd = sensor.map(cfg.sensor_sd_frac).fillna(cfg.default_sd_frac).to_numpy(dtype=float)[ok]
+    w = 1.0 / (sd * capacity[idx])**2
+    prec = np.bincount(idx, weights=w, minlength=len(ids))
+    num = np.bincount(idx, weights=w * vol[ok], minlength=len(ids))
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.where(prec > 0, num / prec, np.nan), 1.0 / prec
+
+def _calibrated(rows: pd.DataFrame, calibration: str, week: str, lo_col: str, hi_col: str) -> pd.DataFrame:
+    """`rows` with the calibration version as of `week`; unchanged if `week` precedes every version."""
+    if Path(calibration).is_dir() and not any(v <= week for v in calibration_versions(calibration)):
+        return rows
+    return apply_calibration(rows.copy(), load_calibration(calibration, week), lo_col, hi_col)
+
+def _rows(weeks, filt: dict, observed, release_time_local: str) -> pd.DataFrame:
+    return pd.DataFrame({"week": list(weeks),
+                         "eia_release": [eia_release_time(w, release_time_local).isoformat() for w in weeks],
+                         "nowcast_bbl": filt["total"], "nowcast_sd_bbl": filt["sd"],
+                         "nowcast_lower_bbl": filt["lower"], "nowcast_upper_bbl": filt["upper"],
+                         "tanks_observed": observed, "tanks_estimated": filt["n_series"]})
+
+def _write(out: pd.DataFrame, out_csv: str | None) -> pd.DataFrame:
+    if out_csv:
+        Path(out_csv).parent.mkdir(parents=True, exist_ok=True)
+        out.to_csv(out_csv, index=False)
+    return out
+
+def nowcast_series(store: str, tanks: str, out_csv: str | None, through: str | None = None,
+                   shell_height_m: float = 18.0, cfg: NowcastConfig = NowcastConfig(),
+                   release_time_local: str = RELEASE_TIME_LOCAL, index_col: str = "peak_to_mean",
+                   lo_col: str = "lo", hi_col: str = "hi", strapping_yaml: str | None = None,
+                   calibration: str | None = None) -> pd.DataFrame:
+    """Filtered (and smoothed) site totals for every week in the store up to `through`."""
+    from ..feature_store import read_features
+    import pyarrow.dataset as ds
+    ids, radii, capacity = _tanks(tanks, shell_height_m)
+    df = read_features(store, filters=None if through is None else ds.field("week") <= through)
+    df["tank_id"], df["week"] = df["tank_id"].astype(str), df["week"].astype(str)
+    strapping = load_strapping_tables(strapping_yaml) if strapping_yaml else None
+    if calibration:
+        df = pd.concat([_calibrated(rows, calibration, w, lo_col, hi_col) for w, rows in df.groupby("week", sort=True)],
+                       ignore_index=True)
+    df = tank_volumes(df, radii, shell_height_m, index_col, lo_col, hi_col, strapping)
+    weeks = sorted(df["week"].unique())
+    Y, R = np.full((len(weeks), len(ids)), np.nan), np.full((len(weeks), len(ids)), np.inf)
+    for i, (_, rows) in enumerate(df.groupby("week", sort=True)):
+        Y[i], R[i] = _observations(rows, ids, capacity, cfg)
+    with stage("kalman_smoother", weeks=len(weeks), tanks=len(ids)):
+        out = kalman_smoother(Y, R, (cfg.process_sd_frac * capacity)**2, t=[week_time(w) for w in weeks])
+    filt, smooth = site_total(out["x"], out["p"], cfg.z), site_total(out["x_smooth"], out["p_smooth"], cfg.z)
+    res = _rows(weeks, filt, (~np.isnan(Y)).sum(axis=1), release_time_local)
+    res["smoothed_bbl"], res["smoothed_sd_bbl"] = smooth["total"], smooth["sd"]
+    return _write(res, out_csv)
+
+def nowcast_update(store: str, tanks: str, week: str, out_csv: str | None, state_path: str,
+                   shell_height_m: float = 18.0, cfg: NowcastConfig = NowcastConfig(),
+                   release_time_local: str = RELEASE_TIME_LOCAL, index_col: str = "peak_to_mean",
+                   lo_col: str = "lo", hi_col: str = "hi", strapping_yaml: str | None = None,
+                   calibration: str | None = None) -> pd.DataFrame:
+    """One filter step for `week` from the state at `state_path` (weeks must arrive in order)."""
+    state_path = Path(state_path)
+    prev_path = state_path.with_name(state_path.stem + ".prev.npz")
+    t = week_time(week)
+    state = LocalLevelState.load(state_path) if state_path.exists() else LocalLevelState.empty(0)
+    if state.t is not None and t < state.t:
+        raise ValueError(f"nowcast state is past week {week}; only the latest week can be redone")
+    if state.t is not None and t == state.t:
+        state = LocalLevelState.load(prev_path) if prev_path.exists() else LocalLevelState.empty(0)
+    elif state.t is not None:
+        state.save(prev_path)
+
+    ids, radii, capacity = _tanks(tanks, shell_height_m)
+    rows = load_features(store, week)
+    strapping = load_strapping_tables(strapping_yaml) if strapping_yaml else None
+    if calibration:
+        rows = _calibrated(rows, calibration, week, lo_col, hi_col)
+    rows = tank_volumes(rows, radii, shell_height_m, index_col, lo_col, hi_col, strapping)
+    y, r = _observations(rows, ids, capacity, cfg)
+    state = state.reindex(ids).update(y, r, (cfg.process_sd_frac * capacity)**2, t)
+    state.save(state_path)
+    filt = site_total(state.x, state.p, cfg.z)
+    return _write(_rows([week], {k: np.atleast_1d(v) for k, v in filt.items()}, [int((~np.isnan(y)).sum())],
+                        release_time_local), out_csv)
+
+def _settings(config: str | None) -> tuple[NowcastConfig, str]:
+    """Nowcast noise and EIA release time from `config`; built-in defaults when it does not exist."""
+    if not config or not Path(config).exists():
+        return NowcastConfig(), RELEASE_TIME_LOCAL
+    from ..config import load_config
+    root = load_config(config)
+    return root.nowcast, root.eia.release_time_local
+
+def main(argv: list[str] | None = None):
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--features", required=True, help="Feature store root")
+    ap.add_argument("--tanks", required=True, help="Tanks GeoJSON, registry .npz or .parquet")
+    ap.add_argument("--out", required=True)
+    ap.add_argument("--week", default=None, help="Incremental: the week that just landed (needs --state)")
+    ap.add_argument("--state", default=None, help="Incremental: filter state (.npz)")
+    ap.add_argument("--through", default=None, help="Batch: last week to include")
+    ap.add_argument("--shell-height", type=float, default=18.0)
+    ap.add_argument("--strapping", default=None, help="Optional per-roof-type strapping tables (YAML)")
+    ap.add_argument("--calibration", default=None, help="Fitted lo/hi versions directory (as-of join by week)")
+    ap.add_argument("--config", default="config/default.yaml",
+                    help="Config YAML for nowcast noise and eia.release_time_local (built-in defaults if missing)")
+    ap.add_argument("--run-log", default=None, help="Append timings to this JSONL run log")
+    args = ap.parse_args(argv)
+    if bool(args.week) != bool(args.state):
+        ap.error("--week and --state go together")
+    cfg, release = _settings(args.config)
+    kw = dict(shell_height_m=args.shell_height, cfg=cfg, release_time_local=release, strapping_yaml=args.strapping,
+              calibration=args.calibration)
+    with run_log(args.run_log, step="nowcast_site", week=args.week or args.through):
+        if args.state:
+            nowcast_update(args.features, args.tanks, args.week, args.out, args.state, **kw)
+        else:
+            nowcast_series(args.features, args.tanks, args.out, through=args.through, **kw)
+
+if __name__ == "__main__":
+    main()
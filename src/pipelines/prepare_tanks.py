@@ -0,0 +1,33 @@
+"""
+Parse a site's tanks GeoJSON once into a binary tank table that every week of the backfill reads
+through --tanks, so the GeoJSON is not re-parsed per week:
+  .npz      `src.tanks.TankRegistry` cache (struct-of-arrays, loads in milliseconds)
+  .parquet  typed tank_id, lon, lat, radius_m, roof_type table
+"""
+from __future__ import annotations
+import argparse
+from pathlib import Path
+
+from ..tanks import TankRegistry
+from ..utils.scene import tank_table
+
+def prepare_tanks(tanks_geojson: str, out_path: str, site: str = "") -> int:
+    if Path(out_path).suffix == ".npz":
+        reg = TankRegistry.from_geojson(tanks_geojson, site=site)
+        reg.save(out_path)
+        return len(reg)
+    df = tank_table(tanks_geojson)
+    Path(out_path).parent.mkdir(parents=True, exist_ok=True)
+    df.to_parquet(out_path, index=False)
+    return len(df)
+
+def main(argv: list[str] | None = None):
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--tanks", required=True, help="Path to tanks GeoJSON (points with radius_m)")
+    ap.add_argument("--out", required=True, help="Output tank table (.npz registry or .parquet)")
+    ap.add_argument("--site", default="", help="Site code stored in the registry")
+    args = ap.parse_args(argv)
+    prepare_tanks(args.tanks, args.out, site=args.site)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+"""
+Per-tank SAR profile histories over many acquisitions in one job, through the lazy scene cube
+(`src.cube`): every scene is clipped to the AOI, and profiles are computed as a dask reduction that
+only reads the chunks around tanks, `--time-block` scenes at a time so memory stays bounded.
+
+- Arc features per (scene, tank) go to the Parquet feature store, partitioned by the week the
+  acquisition counts for (the Friday cutoff on or after its date), same columns as extract_week.
+- With --profiles-out, the raw (time, tank, azimuth) float32 profiles are written to a `.npy`
+  memmap, with `<name>.index.csv` (time, scene_id of every row) and `<name>.tanks.csv` (tank order).
+
+Tanks a scene does not fully cover (NaN ring pixels) produce no feature rows for that scene.
+"""
+from __future__ import annotations
+import argparse, glob
+from pathlib import Path
+import numpy as np
+import pandas as pd
+
+from ..config import SarArc
+from ..features.sar_double_bounce import arc_features_batch
+from ..utils.metrics import count, run_log, stage
+from ..utils.scene import load_tanks
+from .extract_week import COLUMNS
+
+def week_of(t) -> str:
+    """Friday cutoff (YYYY-MM-DD) on or after the acquisition date."""
+    d = pd.Timestamp(t).normalize()
+    return (d + pd.Timedelta(days=(4 - d.weekday()) % 7)).date().isoformat()
+
+def profile_history(scenes: list[str], tanks_path: str, aoi: str | None, store: str | None,
+                    profiles_out: str | None = None, sar: SarArc = SarArc(), chunk: int = 1024,
+                    time_block: int = 8, sensor: str = "s1") -> int:
+    """Compute and store profile features for every scene; returns the number of feature rows."""
+    from ..cube import open_cube, tank_profiles
+    tanks = load_tanks(tanks_path)
+    cube = open_cube(scenes, aoi=aoi, chunk=chunk)
+    prof = tank_profiles(cube, tanks, sar.annulus_inner_frac, sar.annulus_outer_frac, sar.azimuth_bins)
+    T = prof.sizes["time"]
+    out = None
+    if profiles_out:
+        Path(profiles_out).parent.mkdir(parents=True, exist_ok=True)
+        out = np.lib.format.open_memmap(profiles_out, mode="w+", dtype=np.float32, shape=prof.shape)
+        pd.DataFrame({"time": prof.time.values, "scene_id": prof.scene_id.values}).to_csv(
+            Path(profiles_out).with_suffix(".index.csv"), index=False)
+        pd.Series(prof.tank.values, name="tank_id").to_csv(Path(profiles_out).with_suffix(".tanks.csv"), index=False)
+    radius = tanks["radius_m"].to_numpy()
+    n_rows = 0
+    for t0 in range(0, T, time_block):
+        with stage("profiles", scenes=min(time_block, T - t0), tanks=len(tanks)):
+            block = prof.isel(time=slice(t0, t0 + time_block)).values
+        if out is not None:
+            out[t0:t0 + len(block)] = block
+        frames = []
+        for k in range(len(block)):
+            ok = ~np.isnan(block[k]).any(axis=1)
+            feats = pd.DataFrame(arc_features_batch(block[k][ok]))
+            feats.insert(0, "tank_id", tanks["tank_id"].to_numpy()[ok])
+            feats.insert(1, "week", week_of(prof.time.values[t0 + k]))
+            feats.insert(2, "scene_id", str(prof.scene_id.values[t0 + k]))
+            feats.insert(3, "sensor", sensor)
+            feats.insert(4, "radius_m", radius[ok])
+            frames.append(feats[COLUMNS])
+        rows = pd.concat(frames, ignore_index=True)
+        if store and len(rows):
+            from ..feature_store import write_features
+            write_features(rows, store)
+        n_rows += len(rows)
+        count("rows", len(rows))
+    if out is not None:
+        out.flush()
+    return n_rows
+
+def main(argv: list[str] | None = None):
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--scenes", nargs="+", required=True, help="RTC GeoTIFFs or glob patterns (any number of weeks)")
+    ap.add_argument("--tanks", required=True, help="Tanks GeoJSON, registry .npz or .parquet")
+    ap.add_argument("--aoi", default=None, help="AOI GeoJSON the cube is clipped to")
+    ap.add_argument("--store", default=None, help="Feature store root (Parquet, partitioned by week/sensor)")
+    ap.add_argument("--profiles-out", default=None, help="Optional raw (time, tank, azimuth) profiles .npy")
+    ap.add_argument("--chunk", type=int, default=1024, help="Spatial dask chunk size (pixels)")
+    ap.add_argument("--time-block", type=int, default=8, help="Scenes computed per step (bounds memory)")
+    ap.add_argument("--config", default=None, help="Optional config YAML for features.sar_arc")
+    ap.add_argument("--run-log", default=None, help="Append timings/row counts to this JSONL run log")
+    args = ap.parse_args(argv)
+    if not (args.store or args.profiles_out):
+        ap.error("one of --store/--profiles-out is required")
+    scenes = sorted(p for pat in args.scenes for p in (glob.glob(pat) or [pat]))
+    sar = SarArc()
+    if args.config:
+        from ..config import load_config
+        sar = load_config(args.config).features.sar_arc
+    with run_log(args.run_log, step="profile_history", scenes=len(scenes)):
+        profile_history(scenes, args.tanks, args.aoi, args.store, args.profiles_out, sar=sar,
+                        chunk=args.chunk, time_block=args.time_block)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,38 @@
+"""
+Stitch per-week site aggregates (outputs/<site>/<week>/site_aggregate.arrow) into one weekly series
+with the week-over-week change and the EWMA nowcast (`models.nowcast.ewma`).
+
+Weeks are aggregated independently so the backfill can run them concurrently; this step only
+reads the small per-week tables (Arrow IPC, memory-mapped, or CSV), so it is cheap to redo whenever
+any week changes.
+
+Outputs (CSV for analysts, or Arrow IPC for .arrow paths; schema site_series):
+  outputs/<site>/site_series.csv  with columns: week,total_volume_bbl,num_tanks,weekly_change_bbl,nowcast_ewma_bbl
+"""
+from __future__ import annotations
+import argparse
+import pandas as pd
+
+from ..aggregate import weekly_change
+from ..interchange import read_table, write_table
+from ..models.nowcast import ewma
+
+def site_series(week_tables: list[str], out: str, alpha: float = 0.5) -> pd.DataFrame:
+    df = pd.concat([read_table(p, "site_aggregate", columns=["week", "total_volume_bbl", "num_tanks"])
+                    for p in week_tables], ignore_index=True)
+    df = df.sort_values("week", kind="stable").drop_duplicates("week", keep="last").reset_index(drop=True)
+    df["weekly_change_bbl"] = weekly_change(df["total_volume_bbl"])
+    df["nowcast_ewma_bbl"] = ewma(df["total_volume_bbl"], alpha=alpha)
+    write_table(df, out, "site_series")
+    return df
+
+def main(argv: list[str] | None = None):
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--weeks", nargs="+", required=True, help="Per-week site_aggregate tables (.arrow/.csv)")
+    ap.add_argument("--out", required=True)
+    ap.add_argument("--alpha", type=float, default=0.5, help="EWMA alpha for the nowcast")
+    args = ap.parse_args(argv)
+    site_series(args.weeks, args.out, alpha=args.alpha)
+
+if __name__ == "__main__":
+    main()
@@ -3,24 +3,25 @@
 Generate synthetic per-tank SAR + optical features for a given week.
 This lets you exercise the pipeline end-to-end without any external data.
 
-Outputs a CSV with columns:
-  tank_id, week, radius_m, peak, mean, std, peak_to_mean, arc_width_deg, concentration,
+Writes to the Parquet feature store (partition week=<week>/sensor=synthetic) and/or a table
+(Arrow IPC for .arrow/.feather, else CSV; `src.interchange` schema per_tank_features) with columns:
+  tank_id, week, radius_m, roof_type, peak, mean, std, peak_to_mean, arc_width_deg, concentration,
   shadow_fraction, rim_dark_ratio, lo, hi
 """
 from __future__ import annotations
-import argparse, json, random, math
-from pathlib import Path
+import argparse, random, math
 import pandas as pd
 
-def generate_synthetic_features(tanks_geojson: str, out_csv: str, week: str) -> pd.DataFrame:
-    g = json.loads(Path(tanks_geojson).read_text())
+from ..utils.metrics import run_log, stage
+from ..utils.scene import load_tanks
+
+def generate_synthetic_features(tanks_geojson: str, out: str | None, week: str,
+                                store: str | None = None) -> pd.DataFrame:
+    with stage("load_tanks"):
+        tanks = load_tanks(tanks_geojson)
     rows = []
     rng = random.Random(42)  # deterministic for demo
-    for feat in g["features"]:
-        pid = feat["properties"].get("id", "tank_unknown")
-        radius_m = float(feat["properties"].get("radius_m", 50.0))
-        roof_type = feat["properties"].get("roof_type", "floating")
-
+    for pid, radius_m, roof_type in tanks[["tank_id", "radius_m", "roof_type"]].itertuples(index=False):
         # Synthetic "height fraction" (0 empty .. 1 full)
         frac = rng.uniform(0.1, 0.9)
         # Map to SAR index (peak_to_mean) with plausible bounds
@@ -55,17 +56,27 @@ def generate_synthetic_features(tanks_geojson: str, out_csv: str, week: str) ->
             "hi": hi
         })
     df = pd.DataFrame(rows)
-    Path(out_csv).parent.mkdir(parents=True, exist_ok=True)
-    df.to_csv(out_csv, index=False)
+    with stage("write", rows=len(df)):
+        if store:
+            from ..feature_store import write_features
+            write_features(df, store, sensor="synthetic")
+        if out:
+            from ..interchange import write_table
+            write_table(df, out, "per_tank_features")
     return df
 
-def main():
+def main(argv: list[str] | None = None):
     ap = argparse.ArgumentParser()
-    ap.add_argument("--tanks", required=True, help="Path to tanks GeoJSON (points with radius_m)")
-    ap.add_argument("--out", required=True, help="Output CSV path")
+    ap.add_argument("--tanks", required=True, help="Tanks GeoJSON (points with radius_m) or pre-parsed tanks .parquet")
+    ap.add_argument("--out", default=None, help="Optional per-tank table: .arrow (Arrow IPC) or .csv")
+    ap.add_argument("--store", default=None, help="Feature store root (Parquet, partitioned by week/sensor)")
     ap.add_argument("--week", required=True, help="Week label, e.g., 2025-01-03")
-    args = ap.parse_args()
-    generate_synthetic_features(args.tanks, args.out, args.week)
+    ap.add_argument("--run-log", default=None, help="Append timings/row counts to this JSONL run log")
+    args = ap.parse_args(argv)
+    if not (args.out or args.store):
+        ap.error("one of --out/--store is required")
+    with run_log(args.run_log, step="synthetic_week", week=args.week):
+        generate_synthetic_features(args.tanks, args.out, args.week, store=args.store)
 
 if __name__ == "__main__":
     main()
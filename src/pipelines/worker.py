@@ -0,0 +1,54 @@
+"""
+Long-lived pipeline worker: run several pipeline steps in one Python process, so numpy/pandas/
+pyarrow/rasterio are imported once instead of once per Snakemake rule.
+
+Each step is "<module> <args...>" where <module> is one of STEPS and <args> are that module's CLI flags:
+
+  python -m src.pipelines.worker \\
+      "synthetic_week --tanks data/tanks.geojson --store outputs/store --week 2025-01-03" \\
+      "aggregate_week --features outputs/store --week 2025-01-03 --tanks data/tanks.geojson --out site.csv"
+
+With "-" (or no steps) the worker reads one step per line from stdin until EOF; blank lines and
+lines starting with "#" are skipped. The first failing step stops the worker with exit code 1.
+"""
+from __future__ import annotations
+import argparse, importlib, shlex, sys, time
+
+STEPS = ("prepare_tanks", "synthetic_week", "extract_week", "aggregate_week", "site_series", "nowcast_site",
+         "profile_history", "fit_calibration", "acquire_week")
+
+def run_step(line: str) -> None:
+    """Run one step in this process."""
+    argv = shlex.split(line)
+    if not argv or argv[0] not in STEPS:
+        raise ValueError(f"unknown step {argv[0] if argv else ''!r}; expected one of {', '.join(STEPS)}")
+    importlib.import_module(f"{__package__}.{argv[0]}").main(argv[1:])
+
+def _lines(steps: list[str]):
+    if not steps or steps == ["-"]:
+        steps = sys.stdin
+    for line in steps:
+        line = line.strip()
+        if line and not line.startswith("#"):
+            yield line
+
+def main(argv: list[str] | None = None) -> int:
+    ap = argparse.ArgumentParser(description="Run several pipeline steps in one process")
+    ap.add_argument("steps", nargs="*", help='Quoted "<step> <args>" command lines, or "-" for stdin')
+    args = ap.parse_args(argv)
+    for line in _lines(args.steps):
+        t0 = time.perf_counter()
+        try:
+            run_step(line)
+        except SystemExit as e:  # argparse errors / ap.error() inside a step
+            if e.code:
+                print(f"worker: step failed (exit {e.code}): {line}", file=sys.stderr)
+                return 1
+        except Exception as e:
+            print(f"worker: step failed: {line}\n  {type(e).__name__}: {e}", file=sys.stderr)
+            return 1
+        print(f"worker: {line.split()[0]} done in {time.perf_counter() - t0:.2f}s", file=sys.stderr)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,181 @@
+"""
+Tank registry: every tank of every site in one struct-of-arrays table.
+
+- Integer ids are row positions; string `tank_id`s are kept for joins, `index_of` maps them back.
+- lon/lat are float64, radius_m float32; roof type and site are small-int codes into category tuples.
+- `save`/`load` use an uncompressed `.npz` (no pickling), which loads in milliseconds for tens of
+  thousands of tanks; `cached` rebuilds it only when a source GeoJSON changes.
+- `PointGrid` is a uniform lon/lat grid over the tank centers (cells sorted once), answering
+  "tanks inside this scene footprint" with one `searchsorted` per grid row; polygon footprints are
+  refined with `shapely.contains_xy` after the bbox pass.
+- `to_pixels` projects (a subset of) tanks into a raster's pixel grid via `utils.scene.tanks_to_pixels`.
+"""
+from __future__ import annotations
+import hashlib, json
+from dataclasses import dataclass
+from functools import cached_property
+from pathlib import Path
+import numpy as np
+import pandas as pd
+
+from .utils.scene import METERS_PER_DEGREE, tank_table, tanks_to_pixels
+
+class PointGrid:
+    """Uniform grid index over lon/lat points."""
+    def __init__(self, lon: np.ndarray, lat: np.ndarray, cell_deg: float = 0.05):
+        self.lon, self.lat = np.asarray(lon, dtype=np.float64), np.asarray(lat, dtype=np.float64)
+        self.cell = float(cell_deg)
+        n = len(self.lon)
+        self.x0 = float(self.lon.min()) if n else 0.0
+        self.y0 = float(self.lat.min()) if n else 0.0
+        self.nx = int((self.lon.max() - self.x0) // self.cell) + 1 if n else 1
+        self.ny = int((self.lat.max() - self.y0) // self.cell) + 1 if n else 1
+        keys = self._cells(self.lon, self.lat)
+        self.order = np.argsort(keys, kind="stable")
+        self.keys = keys[self.order]
+
+    def _cells(self, lon, lat) -> np.ndarray:
+        ix = np.clip(((lon - self.x0) // self.cell).astype(np.int64), 0, self.nx - 1)
+        iy = np.clip(((lat - self.y0) // self.cell).astype(np.int64), 0, self.ny - 1)
+        return iy * self.nx + ix
+
+    def query(self, bounds: tuple[float, float, float, float], pad_m: float = 0.0) -> np.ndarray:
+        """Sorted indices of points inside (lon_min, lat_min, lon_max, lat_max) grown by `pad_m` meters."""
+        x_min, y_min, x_max, y_max = bounds
+        pad_deg = pad_degrees(bounds, pad_m)
+        x_min, y_min, x_max, y_max = x_min - pad_deg, y_min - pad_deg, x_max + pad_deg, y_max + pad_deg
+        if not len(self.lon) or x_max < self.x0 or y_max < self.y0:
+            return np.empty(0, dtype=np.intp)
+        ix0, ix1 = ((np.array([x_min, x_max]) - self.x0) // self.cell).clip(0, self.nx - 1).astype(np.int64)
+        iy0, iy1 = ((np.array([y_min, y_max]) - self.y0) // self.cell).clip(0, self.ny - 1).astype(np.int64)
+        rows = np.arange(iy0, iy1 + 1) * self.nx
+        lo = np.searchsorted(self.keys, rows + ix0, side="left")
+        hi = np.searchsorted(self.keys, rows + ix1, side="right")
+        cand = np.concatenate([self.order[a:b] for a, b in zip(lo, hi)]) if len(rows) else self.order[:0]
+        x, y = self.lon[cand], self.lat[cand]
+        return np.sort(cand[(x >= x_min) & (x <= x_max) & (y >= y_min) & (y <= y_max)])
+
+@dataclass(eq=False)
+class TankRegistry:
+    tank_id: np.ndarray                  # str ids (unicode), row position is the integer id
+    lon: np.ndarray                      # float64
+    lat: np.ndarray                      # float64
+    radius_m: np.ndarray                 # float32
+    roof_code: np.ndarray                # int8 codes into roof_types
+    site_code: np.ndarray                # int16 codes into sites
+    roof_types: tuple[str, ...] = ("floating",)
+    sites: tuple[str, ...] = ("",)
+    source: str = ""                     # fingerprint of the GeoJSON(s) it was built from
+
+    def __len__(self) -> int:
+        return len(self.lon)
+
+    @classmethod
+    def from_frame(cls, df: pd.DataFrame, site: str = "") -> TankRegistry:
+        """From a `utils.scene.tank_table`-style frame (an optional `site` column overrides `site`)."""
+        roof = pd.Categorical(df["roof_type"] if "roof_type" in df else ["floating"] * len(df))
+        sites = pd.Categorical(df["site"] if "site" in df else [site] * len(df))
+        return cls(tank_id=df["tank_id"].to_numpy(dtype=str), lon=df["lon"].to_numpy(dtype=np.float64),
+                   lat=df["lat"].to_numpy(dtype=np.float64), radius_m=df["radius_m"].to_numpy(dtype=np.float32),
+                   roof_code=roof.codes.astype(np.int8), site_code=sites.codes.astype(np.int16),
+                   roof_types=tuple(map(str, roof.categories)), sites=tuple(map(str, sites.categories)))
+
+    @classmethod
+    def from_geojson(cls, tanks_geojson: str | Path, site: str = "") -> TankRegistry:
+        reg = cls.from_frame(tank_table(tanks_geojson), site=site)
+        reg.source = _fingerprint({site: tanks_geojson})
+        return reg
+
+    @classmethod
+    def from_sites(cls, sites: dict[str, str | Path]) -> TankRegistry:
+        """One registry over several sites, e.g. {name: area.tanks_geojson for RootConfig.areas}."""
+        frames = [tank_table(p).assign(site=name) for name, p in sites.items()]
+        reg = cls.from_frame(pd.concat(frames, ignore_index=True))
+        reg.source = _fingerprint(sites)
+        return reg
+
+    @classmethod
+    def cached(cls, sites: dict[str, str | Path], cache_path: str | Path) -> TankRegistry:
+        """`load(cache_path)` if it was built from the current GeoJSONs, else rebuild and save it."""
+        cache_path = Path(cache_path)
+        if cache_path.exists():
+            reg = cls.load(cache_path)
+            if reg.source == _fingerprint(sites):
+                return reg
+        reg = cls.from_sites(sites)
+        reg.save(cache_path)
+        return reg
+
+    def save(self, path: str | Path) -> Path:
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_name(path.name + ".tmp.npz")
+        np.savez(tmp, tank_id=self.tank_id, lon=self.lon, lat=self.lat, radius_m=self.radius_m,
+                 roof_code=self.roof_code, site_code=self.site_code, roof_types=np.array(self.roof_types, dtype=str),
+                 sites=np.array(self.sites, dtype=str), source=np.array(self.source))
+        tmp.replace(path)
+        return path
+
+    @classmethod
+    def load(cls, path: str | Path) -> TankRegistry:
+        with np.load(path, allow_pickle=False) as z:
+            return cls(tank_id=z["tank_id"], lon=z["lon"], lat=z["lat"], radius_m=z["radius_m"],
+                       roof_code=z["roof_code"], site_code=z["site_code"],
+                       roof_types=tuple(z["roof_types"].tolist()), sites=tuple(z["sites"].tolist()),
+                       source=str(z["source"]))
+
+    def to_frame(self) -> pd.DataFrame:
+        """tank_id, lon, lat, radius_m, roof_type, site (the `utils.scene.tank_table` layout + site)."""
+        return pd.DataFrame({"tank_id": self.tank_id.astype(object), "lon": self.lon, "lat": self.lat,
+                             "radius_m": self.radius_m.astype(np.float64),
+                             "roof_type": np.asarray(self.roof_types, dtype=object)[self.roof_code],
+                             "site": np.asarray(self.sites, dtype=object)[self.site_code]})
+
+    def site(self, name: str) -> np.ndarray:
+        """Row indices of the tanks of one site."""
+        return np.flatnonzero(self.site_code == self.sites.index(name))
+
+    @cached_property
+    def _positions(self) -> dict[str, int]:
+        return {t: i for i, t in enumerate(self.tank_id.tolist())}
+
+    def index_of(self, tank_ids) -> np.ndarray:
+        """Integer ids for string tank ids (-1 if unknown)."""
+        pos = self._positions
+        return np.array([pos.get(t, -1) for t in tank_ids], dtype=np.int64)
+
+    @cached_property
+    def grid(self) -> PointGrid:
+        return PointGrid(self.lon, self.lat)
+
+    def within(self, footprint, pad_m: float | None = None) -> np.ndarray:
+        """
+        Row indices of tanks whose center lies inside `footprint`: a lon/lat bbox tuple or a shapely
+        geometry in EPSG:4326. The bbox is grown by `pad_m` (default: the largest tank radius), so
+        tanks straddling the edge are kept.
+        """
+        bounds = tuple(footprint) if isinstance(footprint, (tuple, list)) else footprint.bounds
+        pad_m = float(self.radius_m.max(initial=0.0)) if pad_m is None else pad_m
+        idx = self.grid.query(bounds, pad_m)
+        if not isinstance(footprint, (tuple, list)) and len(idx):
+            import shapely
+            area = shapely.buffer(footprint, pad_degrees(bounds, pad_m))
+            idx = idx[shapely.contains_xy(area, self.lon[idx], self.lat[idx])]
+        return idx
+
+    def to_pixels(self, transform, crs=None, idx: np.ndarray | None = None) -> np.ndarray:
+        """(n, 3) pixel (cx, cy, r_px) for all tanks, or for rows `idx`."""
+        sel = slice(None) if idx is None else idx
+        return tanks_to_pixels(self.lon[sel], self.lat[sel], self.radius_m[sel], transform, crs)
+
+def pad_degrees(bounds: tuple[float, float, float, float], pad_m: float) -> float:
+    """`pad_m` meters as degrees, conservative in longitude at the bbox's highest latitude."""
+    lat = max(abs(bounds[1]), abs(bounds[3]))
+    return pad_m / (METERS_PER_DEGREE * max(np.cos(np.radians(min(lat, 89.0))), 1e-3))
+
+def _fingerprint(sites: dict[str, str | Path]) -> str:
+    h = hashlib.sha1()
+    for name in sorted(sites):
+        h.update(json.dumps([name, str(sites[name])]).encode())
+        h.update(Path(sites[name]).read_bytes())
+    return h.hexdigest()
@@ -2,16 +2,18 @@
 Geometry helpers: tank circles to masks, ring sampling of raster, etc.
 """
 from __future__ import annotations
+from typing import TYPE_CHECKING
 import numpy as np
-from shapely.geometry import Point
-from shapely.affinity import scale
-from shapely import prepared
 
-def circle_from_center_radius(lon: float, lat: float, radius_m: float, meters_per_degree: float = 111_320) -> Point.buffer:
+if TYPE_CHECKING:
+    from shapely.geometry import Polygon
+
+def circle_from_center_radius(lon: float, lat: float, radius_m: float, meters_per_degree: float = 111_320) -> Polygon:
     """
     Approximate a circle on a local tangent plane by buffering a Point in degrees.
     meters_per_degree ~ 111.32 km at equator; acceptable for small AOIs.
     """
+    from shapely.geometry import Point
     # Convert meters to degrees roughly (lat only; AOI small so okay for starter)
     deg = radius_m / meters_per_degree
     return Point(lon, lat).buffer(deg, resolution=64)
@@ -0,0 +1,142 @@
+"""
+Lightweight run instrumentation: stage timers, counters and RSS samples written as JSONL.
+
+    with run_log("outputs/cushing/2025-01-03/run_log.jsonl", step="aggregate_week", week="2025-01-03"):
+        with stage("calibration", rows=len(df)) as s:
+            ...
+            s["tanks"] = n
+        count("rows_read", len(df))
+
+Without an active run log `stage` returns a shared no-op context and `count`/`event`/`timed`
+do a single global check, so library code can stay instrumented at no cost.
+
+One JSON object per line, appended (every step of a week can share one file):
+  {"event": "stage", "name": "aggregate/calibration", "seconds", "rss_mb", "peak_rss_mb", ...fields}
+  {"event": <name>, ...fields}                                  from `event`
+  {"event": "run", "step", "seconds", "peak_rss_mb", "counters", "status", ...fields}   at exit
+Nested stages are named by their path. RSS is sampled at stage exit; peak_rss_mb is the process
+high-water mark so far (a stage that raised it is the one that set the peak).
+"""
+from __future__ import annotations
+import functools, json, os, sys, time
+from contextlib import contextmanager
+from pathlib import Path
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+_RUN: _Run | None = None
+
+def rss_mb() -> float | None:
+    """Current resident set size (Linux /proc), else None."""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 2**20
+    except (OSError, ValueError, AttributeError):
+        return None
+
+def peak_rss_mb() -> float | None:
+    """Process peak RSS (ru_maxrss is KiB on Linux, bytes on macOS)."""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (2**20 if sys.platform == "darwin" else 2**10)
+
+class _Run:
+    def __init__(self, path: str | Path, fields: dict):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.file = self.path.open("a", encoding="utf-8")
+        self.fields = fields
+        self.counters: dict[str, float] = {}
+        self.stack: list[str] = []
+        self.t0 = time.perf_counter()
+
+    def emit(self, rec: dict) -> None:
+        self.file.write(json.dumps(rec, default=str) + "\n")
+        self.file.flush()
+
+class _NullFields(dict):
+    def __setitem__(self, key, value):
+        pass
+
+class _NullStage:
+    _fields = _NullFields()
+
+    def __enter__(self):
+        return self._fields
+
+    def __exit__(self, *exc):
+        return False
+
+_NULL_STAGE = _NullStage()
+
+def enabled() -> bool:
+    return _RUN is not None
+
+@contextmanager
+def _stage(run: _Run, name: str, fields: dict):
+    run.stack.append(name)
+    t0 = time.perf_counter()
+    try:
+        yield fields
+    finally:
+        seconds = time.perf_counter() - t0
+        run.emit({"event": "stage", "name": "/".join(run.stack), "seconds": seconds,
+                  "rss_mb": rss_mb(), "peak_rss_mb": peak_rss_mb(), **run.fields, **fields})
+        run.stack.pop()
+
+def stage(name: str, **fields):
+    """Time a block; yields a dict of extra fields (rows, tanks, ...) to record with it."""
+    if _RUN is None:
+        return _NULL_STAGE
+    return _stage(_RUN, name, fields)
+
+def timed(name: str | None = None):
+    """Decorator form of `stage` (name defaults to the function name)."""
+    def deco(fn):
+        label = name or fn.__name__
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            if _RUN is None:
+                return fn(*args, **kwargs)
+            with _stage(_RUN, label, {}):
+                return fn(*args, **kwargs)
+        return wrapper
+    return deco
+
+def count(name: str, n: float = 1) -> None:
+    if _RUN is not None:
+        _RUN.counters[name] = _RUN.counters.get(name, 0) + n
+
+def event(name: str, **fields) -> None:
+    """One free-form record (e.g. per-scene timings reported back by worker processes)."""
+    if _RUN is not None:
+        _RUN.emit({"event": name, **_RUN.fields, **fields})
+
+@contextmanager
+def run_log(path: str | Path | None, step: str = "", **fields):
+    """Enable instrumentation for the block, appending to `path` (None: disabled). Nests: the outer run is restored."""
+    global _RUN
+    if path is None:
+        yield None
+        return
+    prev, run = _RUN, _Run(path, {"step": step, **fields})
+    _RUN, status = run, "ok"
+    try:
+        yield run
+    except BaseException as e:
+        status = f"error: {type(e).__name__}"
+        raise
+    finally:
+        _RUN = prev
+        run.emit({"event": "run", **run.fields, "seconds": time.perf_counter() - run.t0,
+                  "peak_rss_mb": peak_rss_mb(), "counters": run.counters, "status": status,
+                  "time": time.strftime("%Y-%m-%dT%H:%M:%S%z")})
+        run.file.close()
+
+def read_run_log(path: str | Path) -> list[dict]:
+    with Path(path).open(encoding="utf-8") as f:
+        return [json.loads(line) for line in f if line.strip()]
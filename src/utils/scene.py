@@ -0,0 +1,247 @@
+"""
+Windowed scene access: pull per-tank crops out of large rasters without decoding the whole scene.
+
+- Tank lon/lat + radius_m (from data/tanks/*.geojson) → pixel (cx, cy, r_px) via the raster transform.
+- Per-tank pixel windows (bounding box of the outer annulus), clipped to the raster.
+- Cheap quality pre-pass (`scene_quality`) on a decimated overview or the S2 SCL sidecar.
+- Reads (SAR profiles or optical shadow metrics) either through rasterio windowed reads, or through an uncompressed `.npy` cache that is
+  opened as a `np.memmap`; crops from the cache are zero-copy views.
+
+Peak memory stays proportional to the tank windows, not the scene size.
+"""
+from __future__ import annotations
+from functools import lru_cache
+from pathlib import Path
+import numpy as np
+import pandas as pd
+
+from .io import read_geojson
+from ..features.optical_shadow import shadow_metrics_batch
+from ..features.quality import quality_batch
+from ..features.sar_double_bounce import azimuth_profiles
+
+METERS_PER_DEGREE = 111_320
+
+TANK_COLUMNS = ["tank_id", "lon", "lat", "radius_m", "roof_type"]
+
+def tank_table(tanks_geojson: str | Path) -> pd.DataFrame:
+    """
+    tank_id, lon, lat, radius_m, roof_type for every point feature in a tanks GeoJSON.
+    """
+    g = read_geojson(tanks_geojson)
+    return pd.DataFrame([
+        {"tank_id": f["properties"].get("id", "tank_unknown"),
+         "lon": float(f["geometry"]["coordinates"][0]),
+         "lat": float(f["geometry"]["coordinates"][1]),
+         "radius_m": float(f["properties"].get("radius_m", 50.0)),
+         "roof_type": f["properties"].get("roof_type", "floating")}
+        for f in g["features"]
+    ], columns=TANK_COLUMNS)
+
+def load_tanks(path: str | Path) -> pd.DataFrame:
+    """
+    Tank table from a tanks GeoJSON, a `src.tanks.TankRegistry` cache (`.npz`), or a pre-parsed
+    `.parquet` (both written once per site by src.pipelines.prepare_tanks and shared across weeks).
+    """
+    if Path(path).suffix == ".npz":
+        from ..tanks import TankRegistry
+        return TankRegistry.load(path).to_frame()[TANK_COLUMNS]
+    if Path(path).suffix == ".parquet":
+        df = pd.read_parquet(path)
+        df["tank_id"] = df["tank_id"].astype(str)
+        return df[TANK_COLUMNS]
+    return tank_table(path)
+
+@lru_cache(maxsize=32)
+def _from_lonlat(crs_wkt: str):
+    """EPSG:4326 → `crs_wkt` transformer, built once per CRS (scenes of a site share a few CRSs)."""
+    from pyproj import Transformer
+    return Transformer.from_crs("EPSG:4326", crs_wkt, always_xy=True)
+
+def tanks_to_pixels(lon, lat, radius_m, transform, crs=None) -> np.ndarray:
+    """
+    Project tank centers to pixel space. Returns an (n, 3) array of (cx, cy, r_px), the
+    layout `azimuth_profiles` expects, with integer (cx, cy) at pixel centres like array indices
+    (so `round(cy), round(cx)` is `rasterio.transform.rowcol`). `crs` is the raster CRS (None/EPSG:4326 = lon/lat).
+    Pixel sizes are taken from the transform; geographic rasters use ~111.32 km/degree.
+    """
+    lon = np.asarray(lon, dtype=float)
+    lat = np.asarray(lat, dtype=float)
+    radius_m = np.asarray(radius_m, dtype=float)
+    xs, ys = lon, lat
+    geographic = crs is None
+    if crs is not None:
+        from pyproj import CRS
+        crs = CRS.from_user_input(crs)
+        geographic = crs.is_geographic
+        if not crs.equals(CRS.from_epsg(4326)):
+            xs, ys = _from_lonlat(crs.to_wkt()).transform(lon, lat)
+    # ~transform measures from pixel corners; shift by half a pixel so index i is the centre of pixel i
+    cx, cy = ~transform * (np.asarray(xs), np.asarray(ys))
+    cx, cy = np.asarray(cx) - 0.5, np.asarray(cy) - 0.5
+    px_size = abs(transform.e)
+    if geographic:
+        px_size = px_size * METERS_PER_DEGREE
+    return np.column_stack([np.asarray(cx, dtype=float), np.asarray(cy, dtype=float), radius_m / px_size])
+
+def tank_windows(tanks_px: np.ndarray, shape: tuple[int, int], r_out_frac: float = 1.1) -> np.ndarray:
+    """
+    Bounding-box windows (row_off, col_off, height, width) around each tank's outer annulus,
+    clipped to a raster of `shape`. Tanks entirely outside get zero-size windows.
+    """
+    tanks_px = np.asarray(tanks_px, dtype=float).reshape(-1, 3)
+    H, W = shape
+    half = np.ceil(tanks_px[:, 2] * r_out_frac) + 1
+    r0 = np.clip(np.floor(tanks_px[:, 1] - half), 0, H).astype(np.int64)
+    r1 = np.clip(np.ceil(tanks_px[:, 1] + half) + 1, 0, H).astype(np.int64)
+    c0 = np.clip(np.floor(tanks_px[:, 0] - half), 0, W).astype(np.int64)
+    c1 = np.clip(np.ceil(tanks_px[:, 0] + half) + 1, 0, W).astype(np.int64)
+    return np.column_stack([r0, c0, np.maximum(r1 - r0, 0), np.maximum(c1 - c0, 0)])
+
+def build_scene_cache(tif_path: str | Path, cache_path: str | Path, band: int = 1) -> Path:
+    """
+    Decode band `band` of a (possibly compressed) GeoTIFF into an uncompressed `.npy` file,
+    one block row at a time, so memory stays bounded by the raster's block height.
+    Skips the work when the cache is newer than the source.
+    """
+    import rasterio
+    tif_path, cache_path = Path(tif_path), Path(cache_path)
+    if cache_path.exists() and cache_path.stat().st_mtime >= tif_path.stat().st_mtime:
+        return cache_path
+    cache_path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = cache_path.with_suffix(".tmp.npy")
+    with rasterio.open(tif_path) as ds:
+        out = np.lib.format.open_memmap(tmp, mode="w+", dtype=ds.dtypes[band - 1], shape=(ds.height, ds.width))
+        block_h = ds.block_shapes[band - 1][0]
+        for r0 in range(0, ds.height, block_h):
+            h = min(block_h, ds.height - r0)
+            out[r0:r0 + h] = ds.read(band, window=((r0, r0 + h), (0, ds.width)))
+        out.flush()
+        del out
+    tmp.replace(cache_path)
+    return cache_path
+
+def open_scene_cache(cache_path: str | Path) -> np.memmap:
+    """
+    Read-only memmap of a cache written by `build_scene_cache`. Slices are zero-copy views.
+    """
+    return np.load(cache_path, mmap_mode="r")
+
+def tank_crops(scene: np.ndarray, windows: np.ndarray):
+    """
+    Yield (crop, row_off, col_off) per window. On a memmap the crops are views; pages are
+    only faulted in for the pixels the caller touches.
+    """
+    for r0, c0, h, w in windows:
+        yield scene[r0:r0 + h, c0:c0 + w], int(r0), int(c0)
+
+def scene_profiles(tif_path: str | Path, tanks_px: np.ndarray, r_in_frac: float = 0.7,
+                   r_out_frac: float = 1.1, azimuth_bins: int = 360, band: int = 1,
+                   cache_path: str | Path | None = None, gdal_cache_mb: int = 64) -> np.ndarray:
+    """
+    (n_tanks, azimuth_bins) profile matrix for one scene without decoding the full raster.
+
+    With `cache_path`, the scene is decoded once into an uncompressed cache and the profile
+    engine gathers ring pixels straight from the memmap. Otherwise every tank window is read
+    with a rasterio windowed read, with GDAL's block cache capped at `gdal_cache_mb`.
+    """
+    tanks_px = np.asarray(tanks_px, dtype=float).reshape(-1, 3)
+    if cache_path is not None:
+        scene = open_scene_cache(build_scene_cache(tif_path, cache_path, band=band))
+        return azimuth_profiles(scene, tanks_px, r_in_frac, r_out_frac, azimuth_bins)
+
+    out = np.zeros((len(tanks_px), azimuth_bins), dtype=float)
+    for i, crop, local in read_tank_crops(tif_path, tanks_px, r_out_frac, band, gdal_cache_mb):
+        out[i] = azimuth_profiles(crop, local[None, :], r_in_frac, r_out_frac, azimuth_bins)[0]
+    return out
+
+def read_tank_crops(tif_path: str | Path, tanks_px: np.ndarray, pad_frac: float = 1.1, band: int = 1,
+                    gdal_cache_mb: int = 64):
+    """
+    Yield (tank index, crop, local (cx, cy, r_px)) for every tank whose window of radius
+    `pad_frac * r_px` intersects the raster, using rasterio windowed reads.
+    """
+    import rasterio
+    tanks_px = np.asarray(tanks_px, dtype=float).reshape(-1, 3)
+    with rasterio.Env(GDAL_CACHEMAX=gdal_cache_mb * 1024 * 1024), rasterio.open(tif_path) as ds:
+        windows = tank_windows(tanks_px, (ds.height, ds.width), pad_frac)
+        for i, (r0, c0, h, w) in enumerate(windows):
+            if h == 0 or w == 0:
+                continue
+            crop = ds.read(band, window=((r0, r0 + h), (c0, c0 + w)))
+            yield i, crop, tanks_px[i] - (c0, r0, 0)
+
+def scene_shadow_metrics(tif_path: str | Path, tanks_px: np.ndarray, threshold: str | float = "otsu",
+                         band: int = 1, cache_path: str | Path | None = None) -> dict[str, np.ndarray]:
+    """
+    Optical shadow metrics for every tank of one scene (see `features.optical_shadow`), through
+    the memmap cache when given, otherwise through per-tank windowed reads.
+    """
+    tanks_px = np.asarray(tanks_px, dtype=float).reshape(-1, 3)
+    if cache_path is not None:
+        scene = open_scene_cache(build_scene_cache(tif_path, cache_path, band=band))
+        return shadow_metrics_batch(scene, tanks_px, threshold=threshold)
+    n = len(tanks_px)
+    out = {"shadow_fraction": np.full(n, np.nan), "rim_dark_ratio": np.full(n, np.nan),
+           "n_pixels": np.zeros(n, dtype=np.int64)}
+    for i, crop, local in read_tank_crops(tif_path, tanks_px, 1.0, band):
+        m = shadow_metrics_batch(crop.astype(float), local[None, :], threshold=threshold)
+        for k in out:
+            out[k][i] = m[k][0]
+    return out
+
+def scl_path(scene_path: str | Path) -> Path | None:
+    """Sentinel-2 SCL sidecar of a scene (`<stem>_SCL.tif` next to it, as acquire_week stores it), if any."""
+    p = Path(scene_path)
+    sidecar = p.with_name(f"{p.stem}_SCL{p.suffix}")
+    return sidecar if sidecar.exists() else None
+
+def read_overview(tif_path: str | Path, decimate: int = 4, band: int = 1, resampling: str = "nearest"):
+    """
+    (array, transform, crs) of band `band` read at 1/`decimate` resolution (GDAL uses the internal
+    overviews when the file has them). Nodata pixels are NaN.
+    """
+    import rasterio
+    from rasterio.enums import Resampling
+    from rasterio.transform import Affine
+    with rasterio.open(tif_path) as ds:
+        h, w = max(1, ds.height // decimate), max(1, ds.width // decimate)
+        arr = ds.read(band, out_shape=(h, w), resampling=Resampling[resampling], masked=True)
+        transform = ds.transform * Affine.scale(ds.width / w, ds.height / h)
+        return np.ma.filled(arr.astype(float), np.nan), transform, ds.crs
+
+def read_tank_region(tif_path: str | Path, lon, lat, radius_m, band: int = 1, min_radius_px: float = 0.0):
+    """
+    (array, tanks_px, nodata) of band `band` over the one window that holds every tank's disk, in the
+    file's own dtype (uint8 for an SCL), with (cx, cy, r_px) relative to that window. Disks are at
+    least `min_radius_px`; when no tank touches the raster the array is empty.
+    """
+    import rasterio
+    with rasterio.open(tif_path) as ds:
+        tanks_px = tanks_to_pixels(lon, lat, radius_m, ds.transform, ds.crs)
+        tanks_px[:, 2] = np.maximum(tanks_px[:, 2], min_radius_px)
+        win = tank_windows(tanks_px, (ds.height, ds.width), 1.0)
+        win = win[(win[:, 2] > 0) & (win[:, 3] > 0)]
+        if not len(win):
+            return np.zeros((0, 0), dtype=ds.dtypes[band - 1]), tanks_px, ds.nodata
+        r0, c0 = win[:, 0].min(), win[:, 1].min()
+        r1, c1 = (win[:, 0] + win[:, 2]).max(), (win[:, 1] + win[:, 3]).max()
+        arr = ds.read(band, window=((r0, r1), (c0, c1)))
+        return arr, tanks_px - (c0, r0, 0), ds.nodata
+
+def scene_quality(tif_path: str | Path, lon, lat, radius_m, decimate: int = 4, use_scl: bool = True,
+                  min_quality: float = 0.6, min_contrast: float = 0.0, min_radius_px: float = 1.5) -> dict[str, np.ndarray]:
+    """
+    Per-tank quality scores and skip reasons for one scene (see `features.quality`), from the SCL
+    sidecar when `use_scl` and it exists (full resolution, but only the window around the tanks and
+    as uint8), otherwise from a decimated overview of the scene itself. Disks are at least
+    `min_radius_px` pixels so small tanks still sample their surroundings.
+    """
+    scl = scl_path(tif_path) if use_scl else None
+    if scl is not None:
+        img, tanks_px, nodata = read_tank_region(scl, lon, lat, radius_m, min_radius_px=min_radius_px)
+        return quality_batch(img, tanks_px, scl=True, min_quality=min_quality, nodata=nodata)
+    img, transform, crs = read_overview(tif_path, decimate=decimate)
+    tanks_px = tanks_to_pixels(lon, lat, radius_m, transform, crs)
+    tanks_px[:, 2] = np.maximum(tanks_px[:, 2], min_radius_px)
+    return quality_batch(img, tanks_px, min_quality=min_quality, min_contrast=min_contrast)
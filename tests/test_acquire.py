@@ -0,0 +1,155 @@
+import asyncio, hashlib, io, json, threading, time, zipfile
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from src.data.catalog import AsfProvider, Scene, SceneCatalog, StacProvider
+from src.data.download import AcquisitionManager, QuotaExceeded, SceneCache
+from src.data.hyp3 import Hyp3Client
+from src.pipelines.acquire_week import acquire_week, week_window
+
+GRANULE = "S1A_IW_GRDH_1SDV_20250101T002345_20250101T002410_057000_070000_ABCD"
+_zip = io.BytesIO()
+with zipfile.ZipFile(_zip, "w") as z:
+    z.writestr(f"{GRANULE}_RTC/{GRANULE}_VV.tif", b"vv" * 100)
+    z.writestr(f"{GRANULE}_RTC/{GRANULE}_VH.tif", b"vh" * 100)
+FILES = {"grd.zip": b"g" * 3000, "a.tif": bytes(range(256)) * 12288, "b.tif": b"b" * 5000, "rtc.zip": _zip.getvalue()}
+
+class FakeProviders(BaseHTTPRequestHandler):
+    """STAC /stac/search (2 pages), ASF /asf, HyP3 /jobs, and /files/<name> with Range support.
+    a.tif is cut off halfway on its first GET, b.tif is served corrupted once."""
+    log, polls, jobs = [], {}, []
+
+    def _json(self, obj, status=200):
+        body = json.dumps(obj).encode()
+        self.send_response(status); self.send_header("Content-Length", str(len(body))); self.end_headers()
+        self.wfile.write(body)
+
+    def _item(self, name):
+        data = FILES[name]
+        return {"id": name.split(".")[0], "bbox": [-97, 35, -96, 36], "properties": {"datetime": "2025-01-02T17:00:00Z"},
+                "assets": {"red": {"href": f"{self.base}/files/{name}", "file:size": len(data),
+                                   "file:checksum": "1220" + hashlib.sha256(data).hexdigest()}}}
+
+    @property
+    def base(self):
+        return f"http://127.0.0.1:{self.server.server_port}"
+
+    def do_POST(self):
+        body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        FakeProviders.log.append(("POST", self.path))
+        if self.path == "/stac/search":
+            if body.get("page") == 2:
+                return self._json({"features": [self._item("b.tif")], "links": []})
+            return self._json({"features": [self._item("a.tif")],
+                               "links": [{"rel": "next", "href": f"{self.base}/stac/search", "body": {"page": 2}, "merge": True}]})
+        if self.path == "/jobs":
+            new = [{**j, "job_id": f"job{len(FakeProviders.jobs) + i}", "status_code": "PENDING"}
+                   for i, j in enumerate(body["jobs"])]
+            FakeProviders.jobs += new
+            return self._json({"jobs": new})
+        self._json({}, 404)
+
+    def do_GET(self):
+        path = self.path.partition("?")[0]
+        FakeProviders.log.append(("GET", path, self.headers.get("Range")))
+        if path == "/asf":
+            data = FILES["grd.zip"]
+            return self._json({"features": [{"geometry": {"type": "Polygon", "coordinates": [[[-97, 35], [-96, 36], [-97, 36]]]},
+                                             "properties": {"sceneName": GRANULE, "startTime": "2025-01-01T00:23:45Z",
+                                                            "url": f"{self.base}/files/grd.zip", "bytes": len(data),
+                                                            "md5sum": hashlib.md5(data).hexdigest()}}]})
+        if path == "/jobs":
+            name = self.path.partition("name=")[2]
+            return self._json({"jobs": [j for j in FakeProviders.jobs if j["name"] == name], "next": None})
+        if path.startswith("/jobs/"):
+            job_id = path.rsplit("/", 1)[1]
+            n = FakeProviders.polls[job_id] = FakeProviders.polls.get(job_id, 0) + 1
+            if n == 1:
+                return self._json({"job_id": job_id, "status_code": "RUNNING"})
+            return self._json({"job_id": job_id, "status_code": "SUCCEEDED", "job_parameters": {"granules": [GRANULE]},
+                               "files": [{"filename": f"{GRANULE}_RTC.zip", "url": f"{self.base}/files/rtc.zip",
+                                          "size": len(FILES["rtc.zip"])}]})
+        name = path.removeprefix("/files/")
+        data = FILES[name]
+        first = sum(1 for e in FakeProviders.log if e[1] == path) == 1
+        rng = self.headers.get("Range")
+        start = int(rng[6:].split("-")[0]) if rng else 0
+        self.send_response(206 if rng else 200)
+        if rng:
+            self.send_header("Content-Range", f"bytes {start}-{len(data) - 1}/{len(data)}")
+        self.send_header("Content-Length", str(len(data) - start)); self.end_headers()
+        if name == "a.tif" and first:
+            self.wfile.write(data[:len(data) // 2]); self.wfile.flush()
+            self.close_connection = True
+            return
+        self.wfile.write(b"x" * len(data) if name == "b.tif" and first else data[start:])
+
+    def log_message(self, *args):
+        pass
+
+@pytest.fixture
+def server():
+    srv = ThreadingHTTPServer(("127.0.0.1", 0), FakeProviders)
+    threading.Thread(target=srv.serve_forever, daemon=True).start()
+    FakeProviders.log, FakeProviders.polls, FakeProviders.jobs = [], {}, []
+    yield f"http://127.0.0.1:{srv.server_port}"
+    srv.shutdown()
+
+def _manager(base, tmp_path, quota=None):
+    providers = {"s1": AsfProvider(url=f"{base}/asf", max_concurrency=2),
+                 "s2": StacProvider(f"{base}/stac", "sentinel-2-l2a", "red", "s2", max_concurrency=2)}
+    return AcquisitionManager(providers, SceneCache(tmp_path / "cache", quota), SceneCatalog(tmp_path / "cat.sqlite"),
+                              backoff=0.01, timeout=10)
+
+def test_acquire_week_resumes_verifies_and_caches(server, tmp_path):
+    assert week_window("2025-01-03") == ("2024-12-28T00:00:00Z", "2025-01-03T23:59:59Z")
+    bbox = (-97.0, 35.0, -96.0, 36.0)
+    m = _manager(server, tmp_path)
+    hyp3 = Hyp3Client(server, session=m.session)
+    out = tmp_path / "scenes"
+    recs = asyncio.run(acquire_week(m, bbox, "2025-01-03", ["s1", "s2"], out, hyp3=hyp3, poll=0.01))
+    assert sorted(r["scene_id"] for r in recs) == [f"{GRANULE}_RTC", "a", "b"]
+    assert (out / f"{GRANULE}_VV.tif").read_bytes() == b"vv" * 100
+    assert (out / "s2" / "a.tif").read_bytes() == FILES["a.tif"]
+    assert (out / "s2" / "b.tif").read_bytes() == FILES["b.tif"]
+    a_gets = [e[2] for e in FakeProviders.log if e[1] == "/files/a.tif"]
+    assert a_gets == [None, f"bytes={1 << 20}-"]     # resumed after the last full block before the cut
+    assert sum(1 for e in FakeProviders.log if e[1] == "/files/b.tif") == 2   # checksum mismatch → refetched
+    assert FakeProviders.polls == {"job0": 2}
+    assert json.loads((out / "scenes.json").read_text())[0]["path"]
+
+    # rerun with --rtc: the week's HyP3 job is found by name and reused, not resubmitted
+    recs = asyncio.run(acquire_week(m, bbox, "2025-01-03", ["s1"], out, hyp3=hyp3, poll=0.01))
+    assert [r["scene_id"] for r in recs] == [f"{GRANULE}_RTC"]
+    assert sum(1 for e in FakeProviders.log if e[:2] == ("POST", "/jobs")) == 1
+    assert [j["job_id"] for j in FakeProviders.jobs] == ["job0"]
+
+    # same week again: searches come from the catalog, files from the cache
+    n = len(FakeProviders.log)
+    recs = asyncio.run(acquire_week(m, bbox, "2025-01-03", ["s2"], out))
+    assert len(recs) == 2 and m.catalog.stats == {"hits": 2, "misses": 2}
+    assert len(FakeProviders.log) == n and m.cache.stats["hits"] == 3   # + the RTC zip of the rerun
+    m.close()
+
+def test_cache_quota_evicts_least_recently_used(server, tmp_path):
+    m = _manager(server, tmp_path, quota=len(FILES["a.tif"]) + len(FILES["b.tif"]))
+    a, b = m.search("s2", (-97.0, 35.0, -96.0, 36.0), "2025-01-01", "2025-01-03")
+    grd = Scene("s1", GRANULE, "", f"{server}/files/grd.zip", len(FILES["grd.zip"]))
+    paths = asyncio.run(m.fetch([a, b]))
+    assert set(paths) == {"a", "b"}
+    asyncio.run(m.fetch([grd]))                      # needs room: evicts the older of a/b only
+    assert m.cache.stats["evictions"] == 1 and m.cache.usage() <= m.cache.quota
+    with pytest.raises(QuotaExceeded):
+        asyncio.run(m.fetch([Scene("s1", "huge", "", f"{server}/files/huge", m.cache.quota + 1)]))
+    m.close()
+
+def test_catalog_refreshes_windows_cached_before_they_settled(server, tmp_path):
+    m = _manager(server, tmp_path)
+    bbox = (-97.0, 35.0, -96.0, 36.0)
+    today = time.strftime("%Y-%m-%d", time.gmtime())
+    for _ in range(2):
+        m.search("s2", bbox, "2025-01-01", "2025-01-03")     # long past: cached for good
+        m.search("s2", bbox, today, f"{today}T23:59:59Z")    # still open: searched again
+    assert m.catalog.stats == {"hits": 1, "misses": 3}
+    m.close()
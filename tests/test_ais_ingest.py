@@ -0,0 +1,117 @@
+import asyncio, threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import unquote
+
+import pandas as pd
+import pytest
+
+from ais.erddap import build_erddap_url
+from ais.ingest import _fetch_chunk, _session, ingest, read_ingested, split_window
+
+ROWS = pd.DataFrame({
+    "time": pd.date_range("2025-01-01", periods=48, freq="h", tz="UTC"),
+    "mmsi": [f"3660{i % 4:05d}" for i in range(48)],
+    "longitude": -97.5 + 0.001 * pd.RangeIndex(48),
+    "latitude": 27.8,
+})
+
+class StubERDDAP(BaseHTTPRequestHandler):
+    """Minimal tabledap: filters ROWS by time>= / time< and fails the first call per chunk once."""
+    requests, failed = [], set()
+
+    def do_GET(self):
+        path, _, query = self.path.partition("?")
+        parts = [unquote(p) for p in query.split("&")]
+        StubERDDAP.requests.append(parts[1])
+        t0 = pd.Timestamp(next(p[6:] for p in parts if p.startswith("time>=")))
+        t1 = pd.Timestamp(next(p[5:] for p in parts if p.startswith("time<")))
+        if parts[1] not in StubERDDAP.failed:
+            StubERDDAP.failed.add(parts[1])
+            self.send_response(503); self.end_headers(); return
+        sel = ROWS[(ROWS["time"] >= t0) & (ROWS["time"] < t1)]
+        if sel.empty:
+            self.send_response(404); self.end_headers()
+            self.wfile.write(b"Error {message=\"Your query produced no matching results.\"}")
+            return
+        body = "time,mmsi,longitude,latitude\nUTC,,degrees_east,degrees_north\n"
+        body += sel.assign(time=sel["time"].dt.strftime("%Y-%m-%dT%H:%M:%SZ")).to_csv(header=False, index=False)
+        self.send_response(200); self.end_headers(); self.wfile.write(body.encode())
+
+    def log_message(self, *args):
+        pass
+
+@pytest.fixture
+def erddap():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StubERDDAP)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    StubERDDAP.requests, StubERDDAP.failed = [], set()
+    yield f"http://127.0.0.1:{server.server_port}"
+    server.shutdown()
+
+def test_chunked_ingest_retries_and_resumes(erddap, tmp_path):
+    chunks = split_window("2025-01-01", "2025-01-03T12:00", (-97.6, 27.7, -97.2, 27.9), time_step="12h")
+    assert len(chunks) == 5
+    done = asyncio.run(ingest(erddap, "ais", tmp_path, chunks, max_concurrency=3, backoff=0.01, batch_rows=5))
+    assert sum(done.values()) == 48 and done[chunks[-1].chunk_id] == 0
+    assert len(StubERDDAP.requests) == 10   # every chunk failed once, then succeeded
+
+    df = read_ingested(tmp_path).sort_values("time").reset_index(drop=True)
+    pd.testing.assert_series_equal(df["time"], ROWS["time"], check_dtype=False)
+    assert df["mmsi"].iloc[0] == "366000000"
+
+    # Resume: only the missing chunk is fetched again
+    (tmp_path / f"chunk-{chunks[1].chunk_id}.parquet").unlink()
+    again = asyncio.run(ingest(erddap, "ais", tmp_path, chunks, backoff=0.01))
+    assert list(again) == [chunks[1].chunk_id] and again[chunks[1].chunk_id] == 12
+
+def test_tiles_do_not_overlap_on_internal_edges():
+    import operator
+    ops = {">=": operator.ge, "<=": operator.le, "<": operator.lt}
+    chunks = split_window("2025-01-01", "2025-01-01T06:00", (-97.6, 27.7, -97.2, 27.9), time_step="6h", tiles=2)
+
+    def owners(lon, lat):
+        point = {"longitude": lon, "latitude": lat}
+        return sum(all(ops[k[len(var):]](point[var], v) for k, v in c.constraints().items()
+                       for var in point if k.startswith(var)) for c in chunks)
+
+    mid_lon, mid_lat = chunks[0].bbox[2], chunks[0].bbox[3]
+    for lon, lat in [(mid_lon, 27.8), (-97.5, mid_lat), (mid_lon, mid_lat), (-97.2, 27.9), (-97.6, 27.7)]:
+        assert owners(lon, lat) == 1
+
+class CutOffERDDAP(BaseHTTPRequestHandler):
+    """Serves a CSV whose last row was cut mid-stream (`bad` times), then the full body."""
+    calls, bad = 0, 1
+
+    def do_GET(self):
+        CutOffERDDAP.calls += 1
+        body = "time,mmsi,longitude,latitude\nUTC,,degrees_east,degrees_north\n2025-01-01T00:00:00Z,366000000,-97.5,27.8\n"
+        if CutOffERDDAP.calls <= CutOffERDDAP.bad:
+            body += '2025-01-01T01:00:00Z,"3660'
+        self.send_response(200); self.end_headers(); self.wfile.write(body.encode())
+
+    def log_message(self, *args):
+        pass
+
+@pytest.mark.parametrize("bad, rows", [(1, 1), (5, None)])
+def test_truncated_bodies_are_retried_and_leave_no_part_file(tmp_path, bad, rows):
+    server = ThreadingHTTPServer(("127.0.0.1", 0), CutOffERDDAP)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    CutOffERDDAP.calls, CutOffERDDAP.bad = 0, bad
+    out = tmp_path / "chunk-x.parquet"
+    fetch = lambda: _fetch_chunk(_session(1), f"http://127.0.0.1:{server.server_port}/x", out, "csv",
+                                 {"mmsi": "string"}, 100, 2, 0.01, 10)
+    try:
+        if rows is None:
+            with pytest.raises(pd.errors.ParserError):
+                fetch()
+            assert CutOffERDDAP.calls == 3 and not list(tmp_path.iterdir())
+        else:
+            assert fetch() == rows and CutOffERDDAP.calls == 2
+    finally:
+        server.shutdown()
+
+def test_time_constraints_are_bare_whatever_the_variable_name():
+    url = build_erddap_url("http://x", "ais", {"BaseDateTime>=": pd.Timestamp("2025-01-01", tz="UTC"),
+                                               "VesselName=": "EAGLE"})
+    query = unquote(url.partition("?")[2])
+    assert "BaseDateTime>=2025-01-01T00:00:00Z" in query and 'VesselName="EAGLE"' in query
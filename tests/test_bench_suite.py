@@ -0,0 +1,26 @@
+import json
+
+import numpy as np
+
+from benchmarks.suite import compare, main
+from src.features.sar_double_bounce import arc_features_batch, azimuth_profiles
+from src.utils.synthetic import synthetic_scene
+
+def test_synthetic_scene_tanks_are_separate_and_detectable():
+    img, tanks, fill = synthetic_scene(50, "sar", seed=1)
+    assert (tanks[:, :2] - 1.1 * tanks[:, 2:] >= 0).all() and (tanks[:, :2] + 1.1 * tanks[:, 2:] < img.shape[0]).all()
+    d = np.hypot(*(tanks[:, None, :2] - tanks[None, :, :2]).transpose(2, 0, 1)) + np.eye(len(tanks)) * 1e9
+    assert (d > 1.1 * (tanks[:, None, 2] + tanks[None, :, 2])).all()
+    feats = arc_features_batch(azimuth_profiles(img, tanks, 0.7, 1.1, 360))
+    # Every tank shows a double-bounce arc above its roof level
+    assert (feats["peak_to_mean"] > 1.5).all() and ((fill >= 0.1) & (fill <= 0.9)).all()
+
+def test_suite_appends_history_and_flags_regressions(tmp_path):
+    hist = tmp_path / "history.json"
+    args = ["--tanks", "20", "40", "--stages", "arc_features", "calibration", "--repeat", "1", "--history", str(hist)]
+    assert main(args) == 0 and main(args + ["--compare", "--tolerance", "1000"]) == 0
+    runs = json.loads(hist.read_text())
+    assert len(runs) == 2 and {r["stage"] for r in runs[0]["results"]} == {"arc_features", "calibration"}
+    assert set(runs[0]["scaling"]) == {"arc_features", "calibration"}
+    slow = {**runs[1], "results": [{**r, "seconds": r["seconds"] * 2} for r in runs[1]["results"]]}
+    assert len(compare(runs[1], slow)) == 4
@@ -0,0 +1,20 @@
+import numpy as np
+import pandas as pd
+
+from src.models.calibration import apply_to_dataframe, height_fraction, volume_from_fraction
+
+def test_height_fraction_broadcasts_with_degenerate_bounds():
+    idx = np.array([0.5, 1.5, 3.0, 1.0])
+    lo = np.array([1.0, 1.0, 1.0, 2.0])
+    hi = np.array([2.0, 2.0, 2.0, 2.0])   # last row: hi <= lo -> 0.5
+    np.testing.assert_allclose(height_fraction(idx, lo, hi), [0.0, 0.5, 1.0, 0.5])
+    assert height_fraction(1.5, 1.0, 2.0) == 0.5 and isinstance(height_fraction(1.5, 1.0, 2.0), float)
+
+def test_apply_to_dataframe_inplace_with_strapping():
+    df = pd.DataFrame({"idx": [1.5, 1.5], "lo": 1.0, "hi": 2.0, "d": 10.0, "h": 4.0,
+                       "roof": ["floating", "fixed"]})
+    tables = {"floating": (np.array([0.0, 0.5, 1.0]), np.array([0.0, 0.25, 1.0]))}
+    out = apply_to_dataframe(df, "idx", "lo", "hi", "d", "h", roof_type_col="roof", strapping=tables, inplace=True)
+    assert out is df
+    cylinder = volume_from_fraction(10.0, 4.0, 0.5)
+    np.testing.assert_allclose(df["volume_bbl"], [cylinder / 2, cylinder])
@@ -0,0 +1,97 @@
+import numpy as np
+import pandas as pd
+import rasterio
+from rasterio.transform import from_origin, rowcol
+
+from src.features.quality import quality_batch
+from src.pipelines.extract_week import COLUMNS, OPTICAL_COLUMNS, SKIP_COLUMNS, extract_week
+from src.utils.metrics import read_run_log, run_log
+from src.utils.scene import load_tanks, read_tank_region
+
+TANKS = "data/tanks/tanks_sample.geojson"
+
+def _grid(res):
+    """Grid whose pixel centres fall on the sample tanks (their lon/lat are multiples of 1e-4)."""
+    return from_origin(-96.80 - res / 2, 36.00 + res / 2, res, res)
+
+def test_extract_week_fans_out_scenes(tmp_path):
+    rng = np.random.default_rng(0)
+    scenes = []
+    for i in range(3):
+        path = tmp_path / f"S1_scene_{i}.tif"
+        with rasterio.open(path, "w", driver="GTiff", height=500, width=600, count=1, dtype="float32",
+                           crs="EPSG:4326", transform=from_origin(-96.80, 36.00, 0.0001, 0.0001)) as ds:
+            ds.write(rng.random((500, 600)).astype("float32"), 1)
+        scenes.append(str(path))
+    out = tmp_path / "features.csv"
+    n = extract_week(scenes, "data/tanks/tanks_sample.geojson", str(out), "2025-01-03", workers=2)
+    df = pd.read_csv(out)
+    assert n == len(df) == 3 * 3
+    assert list(df.columns) == COLUMNS
+    assert set(df["scene_id"]) == {f"S1_scene_{i}" for i in range(3)}
+    assert (df["peak_to_mean"] > 1.0).all()  # every sample tank is inside the scenes
+
+    # Second run through the profile cache: first pass misses, rerun skips all raster work
+    cache = str(tmp_path / "profiles.sqlite")
+    extract_week(scenes, "data/tanks/tanks_sample.geojson", None, "2025-01-03", workers=2,
+                 store=str(tmp_path / "store"), profile_cache=cache)
+    log = tmp_path / "run_log.jsonl"
+    with run_log(log, step="extract_week"):
+        extract_week(scenes, "data/tanks/tanks_sample.geojson", str(tmp_path / "again.csv"), "2025-01-03",
+                     workers=2, profile_cache=cache)
+    counters = read_run_log(log)[-1]["counters"]
+    assert counters["profile_cache_hits"] == 9 and counters["profile_cache_misses"] == 0
+    again = pd.read_csv(tmp_path / "again.csv").sort_values(["scene_id", "tank_id"]).reset_index(drop=True)
+    ref = df.sort_values(["scene_id", "tank_id"]).reset_index(drop=True)
+    pd.testing.assert_series_equal(again["peak_to_mean"], ref["peak_to_mean"], rtol=1e-5)
+
+def test_extract_week_optical_sensor(tmp_path):
+    path, transform = tmp_path / "S2_scene.tif", _grid(0.0001)
+    img = np.random.default_rng(1).normal(0.6, 0.02, (500, 600)).astype("float32")
+    y, x = np.indices(img.shape)
+    tanks = load_tanks(TANKS)
+    for lon, lat, r_m in tanks[["lon", "lat", "radius_m"]].itertuples(index=False):
+        row, col = rowcol(transform, lon, lat)
+        d, r = np.hypot(x - col, y - row), r_m / (0.0001 * 111_320)
+        img[(d >= 0.85 * r) & (d <= r)] -= 0.3            # wall shadow on the rim band
+    with rasterio.open(path, "w", driver="GTiff", height=500, width=600, count=1, dtype="float32",
+                       crs="EPSG:4326", transform=transform) as ds:
+        ds.write(img, 1)
+    out = tmp_path / "optical.csv"
+    extract_week([str(path)], TANKS, str(out), "2025-01-03", workers=1, sensor="s2")
+    df = pd.read_csv(out)
+    assert list(df.columns) == OPTICAL_COLUMNS and (df["sensor"] == "s2").all()
+    assert df["shadow_fraction"].between(0, 1).all()
+    assert (df["rim_dark_ratio"] > 1.3).all()                # the rim band lines up with the painted one
+
+def test_extract_week_quality_gate_skips_cloudy_and_empty_crops(tmp_path):
+    path = tmp_path / "S2_cloudy.tif"
+    profile = dict(driver="GTiff", count=1, crs="EPSG:4326")
+    with rasterio.open(path, "w", height=500, width=600, dtype="float32",
+                       transform=_grid(0.0001), **profile) as ds:
+        ds.write(np.random.default_rng(2).normal(0.6, 0.05, (500, 600)).astype("float32"), 1)
+    scl = np.full((250, 300), 4, dtype="uint8")   # 20 m SCL sidecar: vegetation everywhere ...
+    scl[:, :100] = 9                              # ... cloud over tank_001
+    scl[130:171, 130:171] = 0                     # ... no data centred on tank_002 (pixel 150, 150)
+    with rasterio.open(tmp_path / "S2_cloudy_SCL.tif", "w", height=250, width=300, dtype="uint8",
+                       transform=_grid(0.0002), **profile) as ds:
+        ds.write(scl, 1)
+    out, skipped = tmp_path / "optical.csv", tmp_path / "skipped.csv"
+    n = extract_week([str(path)], "data/tanks/tanks_sample.geojson", str(out), "2025-01-03", workers=1,
+                     sensor="s2", skipped=str(skipped))
+    df, skip = pd.read_csv(out), pd.read_csv(skipped)
+    assert n == len(df) == 1 and df["tank_id"].tolist() == ["tank_003"]
+    assert dict(zip(skip["tank_id"], skip["reason"])) == {"tank_001": "cloud", "tank_002": "nodata"}
+    assert (skip["quality"] < 0.6).all() and list(skip.columns) == SKIP_COLUMNS
+
+    tanks = load_tanks("data/tanks/tanks_sample.geojson")
+    region, _, _ = read_tank_region(tmp_path / "S2_cloudy_SCL.tif", tanks["lon"], tanks["lat"], tanks["radius_m"])
+    assert region.dtype == np.uint8 and region.size < scl.size   # only the window around the tanks
+
+def test_quality_batch_flags_low_contrast_and_outside():
+    img = np.ones((50, 50))
+    img[10, 10] = 8.0                                  # bright double bounce at the first tank only
+    q = quality_batch(img, [(10, 10, 3), (30, 30, 3), (-20, -20, 3)], min_quality=0.5, min_contrast=2.0)
+    assert q["reason"].tolist() == ["", "low_contrast", "outside"]
+    assert q["passed"].tolist() == [True, False, False]
+    np.testing.assert_allclose(q["contrast"][:2], [8.0, 1.0])
@@ -0,0 +1,53 @@
+import pandas as pd
+import pyarrow as pa
+
+from src.feature_store import dataset, feature_history, read_week, write_features
+from src.models.nowcast import ewma_from_store
+from src.pipelines.aggregate_week import aggregate
+from src.pipelines.synthetic_week import generate_synthetic_features
+
+def test_store_partitions_types_and_history(tmp_path):
+    store = tmp_path / "store"
+    for week in ["2025-01-03", "2025-01-10", "2025-01-17"]:
+        generate_synthetic_features("data/tanks/tanks_sample.geojson", None, week, store=str(store))
+    assert (store / "week=2025-01-10" / "sensor=synthetic").is_dir()
+
+    schema = dataset(store).schema
+    assert schema.field("tank_id").type == pa.dictionary(pa.int32(), pa.string())
+    assert schema.field("peak_to_mean").type == pa.float32()
+
+    hist = feature_history(store, "peak_to_mean", tank_ids=["tank_002"], start_week="2025-01-10")
+    assert list(hist.columns) == ["tank_002"]
+    assert list(hist.index) == ["2025-01-10", "2025-01-17"]
+
+    week = read_week(store, "2025-01-03", columns=["tank_id", "peak_to_mean"])
+    assert len(week) == 3
+
+    out = aggregate(str(store), "data/tanks/tanks_sample.geojson", str(tmp_path / "agg.csv"),
+                    shell_height_m=18.0, week="2025-01-10")
+    assert out["week"].iloc[0] == "2025-01-10"
+    assert out["num_tanks"].iloc[0] == 3
+
+    smooth = ewma_from_store(str(store), "peak_to_mean", alpha=0.5)
+    assert smooth.shape == (3, 3)
+
+def test_rewriting_a_week_replaces_its_rows(tmp_path):
+    store, tanks = str(tmp_path / "store"), "data/tanks/tanks_sample.geojson"
+    generate_synthetic_features(tanks, None, "2025-01-03", store=store)
+    first = aggregate(store, tanks, str(tmp_path / "a.csv"), shell_height_m=18.0, week="2025-01-03")
+    generate_synthetic_features(tanks, None, "2025-01-03", store=store)   # rerun of the same week
+    again = aggregate(store, tanks, str(tmp_path / "b.csv"), shell_height_m=18.0, week="2025-01-03",
+                      sensor="synthetic")
+    assert len(read_week(store, "2025-01-03")) == 3
+    assert again["num_tanks"].iloc[0] == 3
+    assert again["total_volume_bbl"].iloc[0] == first["total_volume_bbl"].iloc[0]
+
+def test_rewriting_a_subset_of_scenes_keeps_one_row_per_scene(tmp_path):
+    store = tmp_path / "store"
+    rows = lambda scenes, v: pd.DataFrame({"tank_id": "tank_001", "week": "2025-01-03", "scene_id": scenes,
+                                            "peak_to_mean": v})
+    write_features(rows(["a", "b"], 1.0), store, sensor="s1")          # one batch of two scenes
+    write_features(rows(["b", "c"], 2.0), store, sensor="s1")          # b re-extracted, c added
+    write_features(rows(["a"], 3.0), store, sensor="s1")               # a alone
+    week = read_week(store, "2025-01-03").sort_values("scene_id")
+    assert week["scene_id"].tolist() == ["a", "b", "c"] and week["peak_to_mean"].tolist() == [3.0, 2.0, 2.0]
@@ -0,0 +1,64 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.feature_store import write_features
+from src.models.calibration import apply_calibration, calibration_versions, fit_bounds, load_calibration
+from src.pipelines.aggregate_week import aggregate
+from src.pipelines.fit_calibration import fit_calibration
+from src.pipelines.nowcast_site import nowcast_series, nowcast_update
+from src.pipelines.synthetic_week import generate_synthetic_features
+
+TANKS = "data/tanks/tanks_sample.geojson"
+
+def test_fit_bounds_matches_per_tank_quantiles_and_rejects_outliers():
+    rng = np.random.default_rng(0)
+    df = pd.DataFrame({"tank_id": np.repeat(["a", "b", "c"], [200, 150, 3]),
+                       "week": [f"2024-{i % 12 + 1:02d}-05" for i in range(353)],
+                       "peak_to_mean": np.r_[rng.uniform(1.2, 2.4, 200), rng.uniform(1.0, 3.0, 150), [1.5, 1.6, 1.7]]})
+    df.loc[[5, 17], "peak_to_mean"] = [40.0, -30.0]   # glints / bad scenes in tank a
+    df.loc[210, "peak_to_mean"] = np.nan
+    out = fit_bounds(df, q_lo=0.1, q_hi=0.9, mad_k=4.0, min_obs=8).set_index("tank_id")
+    clean = df.drop(index=[5, 17, 210])
+    ref = clean.groupby("tank_id")["peak_to_mean"].quantile([0.1, 0.9]).unstack()
+    np.testing.assert_allclose(out.loc[["a", "b"], ["lo", "hi"]].to_numpy(), ref.loc[["a", "b"]].to_numpy())
+    assert out.loc["a", "n_rejected"] == 2 and out.loc["a", "n_obs"] == 198 and out.loc["b", "n_obs"] == 149
+    assert np.isnan(out.loc["c", "lo"]) and out.loc["a", "first_week"] == "2024-01-05"
+
+def test_versions_are_joined_as_of_the_week(tmp_path):
+    store, cal = str(tmp_path / "store"), tmp_path / "calibration"
+    weeks = [d.date().isoformat() for d in pd.date_range("2024-01-05", periods=12, freq="7D")]
+    rng = np.random.default_rng(1)
+    for w in weeks:
+        write_features(pd.DataFrame({"tank_id": ["tank_001", "tank_002", "tank_003"], "week": w,
+                                     "peak_to_mean": rng.uniform(1.5, 2.0, 3), "lo": 1.15, "hi": 2.6}),
+                       store, sensor="s1")
+    fit_calibration(store, str(cal), weeks[9])
+    table = fit_calibration(store, str(cal), weeks[11])
+    assert calibration_versions(cal) == [weeks[9], weeks[11]] and table["lo"].between(1.5, 2.0).all()
+    assert (load_calibration(cal, weeks[10])["n_obs"] == 10).all()
+    with pytest.raises(FileNotFoundError):
+        load_calibration(cal, weeks[0])
+
+    rows = pd.DataFrame({"tank_id": ["tank_001", "tank_999"], "lo": 1.15, "hi": 2.6})
+    apply_calibration(rows, table)
+    assert rows.loc[0, "lo"] == pytest.approx(table.loc[table["tank_id"] == "tank_001", "lo"].iloc[0])
+    assert rows.loc[1, ["lo", "hi"]].tolist() == [1.15, 2.6]
+
+    # aggregate_week joins the fitted bounds: volumes differ from the default bounds
+    generate_synthetic_features(TANKS, None, weeks[11], store=store)
+    base = aggregate(store, TANKS, str(tmp_path / "base.csv"), 18.0, week=weeks[11])
+    fitted = aggregate(store, TANKS, str(tmp_path / "fit.csv"), 18.0, week=weeks[11], calibration=str(cal))
+    assert fitted["total_volume_bbl"].iloc[0] != pytest.approx(base["total_volume_bbl"].iloc[0])
+
+    # and so does the nowcast step for the same week
+    kw = dict(week=weeks[11], out_csv=None)
+    plain = nowcast_update(store, TANKS, state_path=str(tmp_path / "a.npz"), **kw)
+    cal_now = nowcast_update(store, TANKS, state_path=str(tmp_path / "b.npz"), calibration=str(cal), **kw)
+    assert cal_now["nowcast_bbl"].iloc[0] != pytest.approx(plain["nowcast_bbl"].iloc[0])
+
+    # weeks before the first version (weeks[0..8]) keep their own lo/hi instead of failing
+    series = nowcast_series(store, TANKS, None, through=weeks[11], calibration=str(cal))
+    plain = nowcast_series(store, TANKS, None, through=weeks[11])
+    np.testing.assert_allclose(series["nowcast_bbl"][:9], plain["nowcast_bbl"][:9])
+    assert series["nowcast_bbl"].iloc[-1] != pytest.approx(plain["nowcast_bbl"].iloc[-1])
@@ -0,0 +1,58 @@
+import pkgutil, subprocess, sys
+
+import pandas as pd
+
+import src.pipelines
+
+from src.pipelines.worker import main as worker_main
+
+HEAVY = {"pandas", "geopandas", "shapely", "rasterio", "pyarrow", "matplotlib"}
+# Generous: typer alone is ~50 ms; the eager imports used to cost well over a second
+BUDGET_US = 600_000
+
+def _importtime(module: str) -> dict[str, int]:
+    """Cumulative import time (us) per top-level package loaded by `import module` in a fresh interpreter."""
+    res = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {module}"],
+                         capture_output=True, text=True, check=True)
+    out = {}
+    for line in res.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line or "cumulative" in line:
+            continue
+        _, cumulative, name = line.split("|")
+        top = name.strip().split(".")[0]
+        # Nested imports are indented; only count each top-level package's own outermost entry
+        if not name.startswith("  ") or top not in out:
+            out[top] = max(out.get(top, 0), int(cumulative))
+    return out
+
+def test_cli_startup_skips_heavy_deps():
+    for module in ("src.cli.nowcast", "src.pipelines.worker"):
+        loaded = _importtime(module)
+        assert not HEAVY & loaded.keys(), f"{module} eagerly imports {sorted(HEAVY & loaded.keys())}"
+        assert loaded["src"] < BUDGET_US, f"{module} took {loaded['src'] / 1e3:.0f} ms to import"
+
+def test_pipeline_entry_points_import_without_pyarrow():
+    # pandas >= 3 pulls in pyarrow itself, so block it outright: only a module-level import in src would fail
+    modules = [f"src.pipelines.{m.name}" for m in pkgutil.iter_modules(src.pipelines.__path__)]
+    code = ("import sys, pandas\n"
+            "for name in [n for n in sys.modules if n == 'pyarrow' or n.startswith('pyarrow.')]:\n"
+            "    sys.modules[name] = None\n"
+            "sys.modules['pyarrow'] = None\n"
+            + "".join(f"import {m}\n" for m in ["src.interchange", *modules]))
+    res = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True)
+    assert res.returncode == 0, res.stderr.strip().splitlines()[-1]
+
+def test_aggregation_skips_feature_engines():
+    code = ("import sys, src.aggregate, src.pipelines.aggregate_week\n"
+            "print(sorted(m for m in sys.modules if m.startswith('src.features') or m == 'src.utils.scene'))")
+    res = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True)
+    assert res.stdout.strip() == "[]"
+
+def test_worker_runs_several_steps(tmp_path):
+    tanks, store, out = "data/tanks/tanks_sample.geojson", tmp_path / "store", tmp_path / "agg.csv"
+    steps = [f"synthetic_week --tanks {tanks} --store {store} --week {w}" for w in ("2025-01-03", "2025-01-10")]
+    steps.append(f"aggregate_week --features {store} --week 2025-01-10 --tanks {tanks} --out {out}")
+    assert worker_main(steps) == 0
+    assert pd.read_csv(out)["week"].tolist() == ["2025-01-10"]
+    assert worker_main([f"aggregate_week --features {store} --week 2025-01-10"]) == 1
+    assert worker_main(["nowcast --help"]) == 1
@@ -0,0 +1,45 @@
+from pathlib import Path
+
+import pandas as pd
+import pytest
+
+from src.aggregate import WeeklyState
+from src.models.nowcast import ewma
+from src.pipelines.aggregate_week import aggregate
+from src.pipelines.synthetic_week import generate_synthetic_features
+
+TANKS = str(Path("data/tanks/tanks_sample.geojson").resolve())
+
+def test_incremental_weeks_match_full_history(tmp_path, monkeypatch):
+    store, state = str(tmp_path / "store"), str(tmp_path / "state.json")
+    weeks = ["2025-01-03", "2025-01-10", "2025-01-17"]
+    rows = []
+    for w in weeks:
+        generate_synthetic_features(TANKS, None, w, store=store)
+        rows.append(aggregate(store, TANKS, str(tmp_path / w / "agg.csv"), 18.0, week=w, state_path=state))
+    inc = pd.concat(rows, ignore_index=True)
+
+    full = pd.concat([aggregate(store, TANKS, str(tmp_path / "full.csv"), 18.0, week=w) for w in weeks],
+                     ignore_index=True)
+    pd.testing.assert_series_equal(inc["total_volume_bbl"], full["total_volume_bbl"])
+    pd.testing.assert_series_equal(inc["weekly_change_bbl"], full["total_volume_bbl"].diff(), check_names=False)
+    pd.testing.assert_series_equal(inc["nowcast_ewma_bbl"], ewma(full["total_volume_bbl"]), check_names=False)
+
+    # Re-running a week with unchanged inputs is a lookup in the state, also when the outputs and the
+    # state itself live under the working directory (unset strapping/calibration paths are skipped)
+    monkeypatch.chdir(tmp_path)
+    def recompute(*args, **kwargs):
+        raise AssertionError("unchanged week was recomputed")
+    monkeypatch.setattr(WeeklyState, "add_week", recompute)
+    again = aggregate(store, TANKS, str(tmp_path / "again.csv"), 18.0, week=weeks[-1], state_path=state)
+    pd.testing.assert_frame_equal(again, inc.iloc[[2]].reset_index(drop=True))
+
+def test_weeks_older_than_the_latest_are_rejected(tmp_path):
+    state = WeeklyState(tmp_path / "state.json")
+    state.add_week("2025-01-10", ["t1"], [100.0], "a")
+    state.add_week("2025-01-17", ["t1"], [50.0], "b")
+    for week in ("2025-01-10", "2025-01-03"):       # seen, and never seen
+        with pytest.raises(ValueError, match="precedes"):
+            state.add_week(week, ["t1"], [75.0], "c")
+    assert state.last_week == "2025-01-17" and state.data["last_volumes"] == {"t1": 50.0}
+    assert state.add_week("2025-01-17", ["t1"], [60.0], "d")["weekly_change_bbl"] == -40.0   # latest may be redone
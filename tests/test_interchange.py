@@ -0,0 +1,37 @@
+import pandas as pd
+import pyarrow as pa
+import pytest
+
+from src.interchange import TableWriter, columns, export_csv, read_arrow, read_table, write_table
+from src.pipelines.extract_week import COLUMNS, OPTICAL_COLUMNS
+from src.pipelines.synthetic_week import generate_synthetic_features
+
+TANKS = "data/tanks/tanks_sample.geojson"
+
+def test_arrow_and_csv_round_trip_to_the_same_frame(tmp_path):
+    df = generate_synthetic_features(TANKS, str(tmp_path / "f.arrow"), "2025-01-03")
+    generate_synthetic_features(TANKS, str(tmp_path / "f.csv"), "2025-01-03")
+    a, c = read_table(tmp_path / "f.arrow"), read_table(tmp_path / "f.csv", "per_tank_features")
+    assert list(a.columns) == columns("per_tank_features")
+    pd.testing.assert_frame_equal(a, c, check_exact=False, rtol=1e-12)
+    pd.testing.assert_series_equal(a["peak_to_mean"], df["peak_to_mean"], check_exact=True)   # no text round trip
+    table = read_arrow(tmp_path / "f.arrow", ["week", "peak_to_mean"])
+    assert table.schema.field("week").type == pa.string() and table.num_rows == len(df)
+
+def test_schema_registry_and_incremental_writer(tmp_path):
+    assert COLUMNS == columns("scene_features") and "shadow_fraction" in OPTICAL_COLUMNS
+    with pytest.raises(ValueError, match="num_tanks"):
+        write_table(pd.DataFrame({"week": ["2025-01-03"], "total_volume_bbl": [1.0]}), tmp_path / "a.arrow",
+                    "site_aggregate")
+    agg = write_table(pd.DataFrame({"week": ["2025-01-03"], "total_volume_bbl": [1.5], "num_tanks": [3]}),
+                      tmp_path / "a.arrow", "site_aggregate")
+    assert read_table(agg).dtypes["num_tanks"] == "int64"          # optional --state columns may be absent
+
+    rows = pd.DataFrame({"tank_id": ["t1", "t2"], "week": "2025-01-03", "scene_id": "s", "sensor": "s1",
+                         "quality": [0.1, 0.2], "reason": ["cloud", "nodata"]})
+    with TableWriter(tmp_path / "skips.arrow", "quality_skips") as w:
+        w.write(rows)
+        w.write(rows.iloc[:1])
+        assert not (tmp_path / "skips.arrow").exists()              # appears only once complete
+    out = export_csv(tmp_path / "skips.arrow", tmp_path / "skips.csv")
+    assert read_table(out, "quality_skips")["tank_id"].tolist() == ["t1", "t2", "t1"]
@@ -0,0 +1,42 @@
+import pytest
+
+from src.pipelines import aggregate_week, synthetic_week
+from src.utils import metrics
+
+TANKS = "data/tanks/tanks_sample.geojson"
+
+def test_disabled_is_a_no_op():
+    assert not metrics.enabled()
+    with metrics.stage("x", rows=1) as s:
+        s["tanks"] = 2
+    metrics.count("rows", 3)
+    assert metrics.timed()(lambda a: a + 1)(1) == 2
+
+def test_run_log_records_nested_stages_counters_and_errors(tmp_path):
+    log = tmp_path / "run_log.jsonl"
+    with metrics.run_log(log, step="demo", week="2025-01-03"):
+        with metrics.stage("outer"):
+            with metrics.stage("inner", rows=5) as s:
+                s["tanks"] = 2
+        metrics.count("rows", 5)
+        metrics.count("rows", 1)
+    with pytest.raises(ValueError), metrics.run_log(log, step="boom"):
+        raise ValueError
+    assert not metrics.enabled()
+    recs = metrics.read_run_log(log)
+    assert [r.get("name", r["event"]) for r in recs] == ["outer/inner", "outer", "run", "run"]
+    assert recs[0]["rows"] == 5 and recs[0]["tanks"] == 2 and recs[0]["week"] == "2025-01-03"
+    assert recs[2]["counters"] == {"rows": 6} and recs[2]["status"] == "ok"
+    assert recs[3]["status"] == "error: ValueError"
+
+def test_pipelines_append_to_the_weeks_run_log(tmp_path):
+    log, store = str(tmp_path / "2025-01-03" / "run_log.jsonl"), str(tmp_path / "store")
+    synthetic_week.main(["--tanks", TANKS, "--store", store, "--week", "2025-01-03", "--run-log", log])
+    aggregate_week.main(["--features", store, "--week", "2025-01-03", "--tanks", TANKS,
+                         "--out", str(tmp_path / "agg.csv"), "--run-log", log])
+    recs = metrics.read_run_log(log)
+    runs = [r for r in recs if r["event"] == "run"]
+    assert [r["step"] for r in runs] == ["synthetic_week", "aggregate_week"]
+    assert runs[1]["counters"]["calibrated_rows"] == 3
+    assert {r["name"] for r in recs if r["step"] == "aggregate_week" and r["event"] == "stage"} >= \
+        {"load_features", "load_tanks", "calibration"}
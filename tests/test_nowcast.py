@@ -0,0 +1,78 @@
+import numpy as np
+import pandas as pd
+import yaml
+
+from src.config import load_config
+from src.models.nowcast import LocalLevelState, kalman_filter, kalman_smoother
+from src.pipelines.nowcast_site import RELEASE_TIME_LOCAL, _settings, eia_release_time, nowcast_series, nowcast_update
+from src.pipelines.synthetic_week import generate_synthetic_features
+from src.utils.io import read_yaml
+
+def _scalar_filter(y, r, q, t):
+    """Textbook one-series local-level filter with a diffuse start."""
+    x, p, out = 0.0, np.inf, []
+    for i in range(len(y)):
+        p += q * (t[i] - t[i - 1] if i else 0.0)
+        if not np.isnan(y[i]):
+            x, p = (y[i], r[i]) if np.isinf(p) else (x + p / (p + r[i]) * (y[i] - x), r[i] * p / (p + r[i]))
+        out.append((x, p))
+    return np.array(out)
+
+def test_vectorized_filter_matches_scalar_and_incremental():
+    rng = np.random.default_rng(0)
+    T, n = 40, 25
+    t = np.cumsum(rng.integers(1, 3, T)).astype(float)          # irregular steps
+    y = np.cumsum(rng.normal(0, 1, (T, n)), axis=0) + rng.normal(0, 0.5, (T, n))
+    y[rng.random((T, n)) < 0.3] = np.nan                          # missing acquisitions
+    r = np.where(rng.random((T, n)) < 0.5, 0.25, 1.0)             # two sensors' noise
+    q = rng.uniform(0.5, 2.0, n)
+    out = kalman_filter(y, r, q, t=t)
+    for j in range(n):
+        ref = _scalar_filter(y[:, j], r[:, j], q[j], t)
+        np.testing.assert_allclose(out["x"][:, j], ref[:, 0], rtol=1e-12)
+        np.testing.assert_allclose(out["p"][:, j], ref[:, 1], rtol=1e-12)
+
+    state = LocalLevelState.empty(n)
+    for i in range(T):
+        state = state.update(y[i], r[i], q, t[i])
+    np.testing.assert_allclose(state.x, out["x"][-1], rtol=1e-12)
+    np.testing.assert_allclose(state.p, out["p"][-1], rtol=1e-12)
+
+    sm = kalman_smoother(y, r, q, t=t)
+    seen = np.isfinite(sm["p"])
+    assert (sm["p_smooth"][seen] <= sm["p"][seen] + 1e-12).all()
+
+    # Two sensors in one step == sequential updates
+    both = kalman_filter(np.stack([y, y[::-1]], axis=1), np.stack([r, r[::-1]], axis=1), q, t=t)
+    seq = LocalLevelState.empty(n)
+    for i in range(T):
+        seq = seq.update(y[i], r[i], q, t[i]).update(y[T - 1 - i], r[T - 1 - i], q, t[i])
+    np.testing.assert_allclose(both["x"][-1], seq.x, rtol=1e-9)
+
+def test_site_nowcast_batch_matches_incremental(tmp_path):
+    tanks, store = "data/tanks/tanks_sample.geojson", str(tmp_path / "store")
+    weeks = ["2025-01-03", "2025-01-10", "2025-01-24"]
+    for w in weeks:
+        generate_synthetic_features(tanks, None, w, store=store)
+    batch = nowcast_series(store, tanks, str(tmp_path / "series.csv"))
+    assert batch["week"].tolist() == weeks
+    assert (batch["nowcast_lower_bbl"] < batch["nowcast_bbl"]).all()
+    assert (batch["nowcast_bbl"] < batch["nowcast_upper_bbl"]).all()
+
+    state = str(tmp_path / "kalman.npz")
+    rows = [nowcast_update(store, tanks, w, None, state) for w in weeks]
+    rows.append(nowcast_update(store, tanks, weeks[-1], None, state))   # redo the latest week
+    inc = pd.concat(rows, ignore_index=True)
+    np.testing.assert_allclose(inc["nowcast_bbl"][:3], batch["nowcast_bbl"], rtol=1e-12)
+    np.testing.assert_allclose(inc["nowcast_sd_bbl"][3], batch["nowcast_sd_bbl"].iloc[-1], rtol=1e-12)
+
+    assert eia_release_time("2025-01-03") == pd.Timestamp("2025-01-08 10:30", tz="America/New_York")
+
+def test_release_time_comes_from_config(tmp_path):
+    _, release = _settings("config/default.yaml")
+    assert release == load_config("config/default.yaml").eia.release_time_local
+    cfg = read_yaml("config/default.yaml")
+    cfg["eia"]["release_time_local"] = "THU 12:00 America/New_York"
+    (tmp_path / "c.yaml").write_text(yaml.safe_dump(cfg))
+    assert _settings(str(tmp_path / "c.yaml"))[1] == "THU 12:00 America/New_York"
+    assert _settings(str(tmp_path / "missing.yaml"))[1] == RELEASE_TIME_LOCAL
@@ -0,0 +1,43 @@
+import numpy as np
+
+from src.features.optical_shadow import shadow_metrics, shadow_metrics_batch
+
+def _scene(tanks, wedge_deg, size=(160, 220)):
+    """Bright roofs with a dark wedge of `wedge_deg` degrees (starting at 0 deg) per tank."""
+    rng = np.random.default_rng(0)
+    img = rng.normal(0.6, 0.02, size)
+    y, x = np.indices(size)
+    for (cx, cy, r), w in zip(tanks, wedge_deg):
+        theta = (np.degrees(np.arctan2(-(y - cy), x - cx)) + 360) % 360
+        img[((x - cx)**2 + (y - cy)**2 <= r**2) & (theta < w)] -= 0.3
+    return img
+
+def test_batch_matches_single_and_tracks_shadow_size():
+    tanks = np.array([[40, 40, 25], [120, 50, 25], [180, 110, 20], [60, 120, 20.5]])
+    wedges = [30, 90, 180, 60]
+    img = _scene(tanks, wedges)
+    batch = shadow_metrics_batch(img, tanks)
+    np.testing.assert_allclose(batch["shadow_fraction"], np.array(wedges) / 360, atol=0.03)
+    np.testing.assert_allclose(batch["rim_dark_ratio"], 1.0, atol=0.1)   # wedges darken rim and inner alike
+    for i, (cx, cy, r) in enumerate(tanks):
+        single = shadow_metrics(img, cx, cy, r)
+        assert single["shadow_fraction"] == batch["shadow_fraction"][i]
+        assert single["rim_dark_ratio"] == batch["rim_dark_ratio"][i]
+
+    fixed = shadow_metrics_batch(img, tanks, threshold=0.45)
+    np.testing.assert_allclose(fixed["shadow_fraction"], batch["shadow_fraction"], atol=0.01)
+
+def test_rim_dark_ratio_rises_as_the_rim_darkens():
+    y, x = np.indices((80, 80))
+    d = np.hypot(x - 40, y - 40)
+    ratios = []
+    for shade in (0.0, 0.1, 0.3):
+        img = np.full((80, 80), 0.6)
+        img[(d >= 0.85 * 30) & (d <= 30)] -= shade          # wall shadow on the rim band
+        ratios.append(shadow_metrics(img, 40, 40, 30)["rim_dark_ratio"])
+    assert abs(ratios[0] - 1.0) < 1e-3
+    assert 1.0 < ratios[1] < ratios[2]
+
+def test_tank_outside_scene_is_nan():
+    m = shadow_metrics_batch(np.ones((50, 50)), [(500, 500, 10)])
+    assert m["n_pixels"][0] == 0 and np.isnan(m["shadow_fraction"][0])
@@ -0,0 +1,32 @@
+import geopandas as gpd
+import pandas as pd
+from shapely.geometry import box
+
+from ais.ports import count_port_calls, detect_port_calls
+
+PORTS = gpd.GeoDataFrame({"name": ["A", "B"]}, geometry=[box(0, 0, 1, 1), box(5, 5, 6, 6)], crs="EPSG:4326")
+
+def _track(mmsi, fixes):
+    return pd.DataFrame([{"mmsi": mmsi, "time": pd.Timestamp(t, tz="UTC"), "lon": x, "lat": y} for t, x, y in fixes])
+
+def test_visits_with_debounce_and_chunk_carry_over():
+    ais = pd.concat([
+        # v1: in A, a 1h excursion (bridged by the 2h debounce), leaves, then visits B
+        _track("v1", [("2025-01-01 00:00", 0.5, 0.5), ("2025-01-01 01:00", 0.5, 0.5),
+                      ("2025-01-01 02:00", 2.0, 2.0), ("2025-01-01 03:00", 0.5, 0.5),
+                      ("2025-01-01 09:00", 3.0, 3.0), ("2025-01-01 12:00", 5.5, 5.5),
+                      ("2025-01-01 13:00", 5.5, 5.5)]),
+        # v2: two separate calls at A, 5h apart
+        _track("v2", [("2025-01-01 00:30", 0.2, 0.2), ("2025-01-01 05:30", 0.2, 0.2)]),
+    ]).sort_values("time").reset_index(drop=True)
+
+    whole = detect_port_calls([ais], PORTS)
+    assert whole[["vessel", "port"]].values.tolist() == [["v1", "A"], ["v1", "B"], ["v2", "A"], ["v2", "A"]]
+    assert whole["dwell"].iloc[0] == pd.Timedelta("3h") and whole["n_obs"].iloc[0] == 3
+
+    # Same answer when streamed in small time-ordered chunks
+    streamed = detect_port_calls((ais.iloc[i:i + 2] for i in range(0, len(ais), 2)), PORTS)
+    pd.testing.assert_frame_equal(streamed, whole)
+
+    counts = count_port_calls(ais, PORTS)
+    assert counts.set_index("name")["calls"].to_dict() == {"A": 3, "B": 1}
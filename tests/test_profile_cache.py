@@ -0,0 +1,44 @@
+import numpy as np
+
+from src.features.profile_cache import ProfileCache, cached_array_profiles
+from src.features.sar_double_bounce import azimuth_profiles
+
+def test_cache_hits_misses_and_lru_eviction(tmp_path):
+    rng = np.random.default_rng(0)
+    img = rng.random((120, 120))
+    tanks = np.array([[30, 30, 8.0], [80, 60, 10.0]])
+    cache = ProfileCache(tmp_path / "profiles.sqlite")
+
+    first = cached_array_profiles(cache, "scene_a:abc", img, tanks, 0.7, 1.1, 90)
+    np.testing.assert_allclose(first, azimuth_profiles(img, tanks, 0.7, 1.1, 90), rtol=1e-6)
+    assert cache.stats == {"hits": 0, "misses": 2, "evictions": 0}
+
+    # One new tank: only that one is computed
+    more = np.vstack([tanks, [[60, 100, 6.0]]])
+    second = cached_array_profiles(cache, "scene_a:abc", img, more, 0.7, 1.1, 90)
+    np.testing.assert_array_equal(second[:2], first)
+    assert cache.stats["hits"] == 2 and cache.stats["misses"] == 3
+
+    # A different annulus is a different key
+    cached_array_profiles(cache, "scene_a:abc", img, tanks, 0.6, 1.1, 90)
+    assert cache.stats["misses"] == 5
+
+    # The running size total follows replaces (no double counting) and matches the table
+    sql = []
+    cache.db.set_trace_callback(sql.append)
+    cache.put_many(cache.keys("scene_a:abc", tanks, 0.7, 1.1, 90), first)
+    cache.db.set_trace_callback(None)
+    assert not any("SUM(" in q for q in sql)              # the cap check does not scan the table
+    assert cache.total_bytes() == 5 * 90 * 4
+    assert cache.total_bytes() == cache.db.execute("SELECT SUM(nbytes) FROM profiles").fetchone()[0]
+
+    cache.max_bytes = 2 * 90 * 4
+    assert cache.evict() == 3 and cache.total_bytes() == 2 * 90 * 4
+
+def test_scene_digest_tracks_file_content(tmp_path):
+    f = tmp_path / "S1_x.tif"
+    f.write_bytes(b"abc")
+    cache = ProfileCache(tmp_path / "profiles.sqlite")
+    d1 = cache.scene_digest(f)
+    f.write_bytes(b"abcd")
+    assert d1.startswith("S1_x:") and cache.scene_digest(f) != d1
@@ -1,4 +1,4 @@
-from src.features.sar_double_bounce import annulus_azimuth_profile, arc_features
+from src.features.sar_double_bounce import annulus_azimuth_profile, arc_features, arc_features_batch, azimuth_profiles
 import numpy as np
 
 def test_annulus_profile_peak_position():
@@ -20,3 +20,27 @@ def test_annulus_profile_peak_position():
     feats = arc_features(prof)
     assert feats["peak_to_mean"] > 1.5
     assert feats["arc_width_deg"] > 10
+
+def test_batched_profiles_match_per_tank():
+    rng = np.random.default_rng(0)
+    img = rng.random((200, 240))
+    # Interior, sub-pixel, shared-radius and edge-clipped tanks
+    tanks = np.array([[60, 70, 20], [120.5, 100.25, 15], [180, 50, 20], [5, 195, 12], [239, 0, 8]], dtype=float)
+    batch = azimuth_profiles(img, tanks, 0.7, 1.1, 90)
+    assert batch.shape == (len(tanks), 90)
+    for row, (cx, cy, r) in zip(batch, tanks):
+        ref = annulus_azimuth_profile(img, cx, cy, r, 0.7, 1.1, 90)
+        np.testing.assert_allclose(row, ref, rtol=1e-10)
+    assert azimuth_profiles(img, np.empty((0, 3)), azimuth_bins=90).shape == (0, 90)
+
+def test_arc_features_batch_matches_scalar():
+    rng = np.random.default_rng(1)
+    profiles = rng.random((50, 360))
+    profiles[0] = 1.0                                   # flat: no run
+    profiles[1, :10] = profiles[1, -10:] = 5.0          # run wrapping around 0 deg
+    profiles[2] = np.where(np.arange(360) % 7 == 0, 3.0, 0.1)
+    batch = arc_features_batch(profiles)
+    for i, row in enumerate(profiles):
+        for k, v in arc_features(row).items():
+            np.testing.assert_allclose(batch[k][i], v, rtol=1e-12, err_msg=f"{i} {k}")
+    assert batch["arc_width_deg"][1] == 20.0
@@ -0,0 +1,37 @@
+import numpy as np
+import rasterio
+from rasterio.transform import from_origin, rowcol
+
+from src.features.sar_double_bounce import azimuth_profiles
+from src.utils.scene import scene_profiles, tank_table, tank_windows, tanks_to_pixels
+
+def _write_scene(path, img, transform, crs="EPSG:32614"):
+    with rasterio.open(path, "w", driver="GTiff", height=img.shape[0], width=img.shape[1], count=1,
+                       dtype=img.dtype, crs=crs, transform=transform, tiled=True,
+                       blockxsize=64, blockysize=64, compress="deflate") as ds:
+        ds.write(img, 1)
+
+def test_windowed_and_memmap_profiles_match_full_scene(tmp_path):
+    rng = np.random.default_rng(0)
+    img = rng.random((300, 260)).astype("float32")
+    tif = tmp_path / "scene.tif"
+    _write_scene(tif, img, from_origin(500_000, 4_000_000, 10, 10))
+    tanks = np.array([[40, 50, 6.0], [130, 150, 4.5], [255, 2, 3.0], [1000, 1000, 5.0]])
+    full = azimuth_profiles(img, tanks, 0.7, 1.1, 72)
+    np.testing.assert_allclose(scene_profiles(tif, tanks, 0.7, 1.1, 72), full)
+    np.testing.assert_allclose(scene_profiles(tif, tanks, 0.7, 1.1, 72, cache_path=tmp_path / "scene.npy"), full)
+    assert tank_windows(tanks, img.shape)[3].tolist()[2:] == [0, 0]
+
+def test_tanks_to_pixels_projects_sample_tanks():
+    t = tank_table("data/tanks/tanks_sample.geojson")
+    transform = from_origin(-96.80, 36.00, 0.0001, 0.0001)
+    px = tanks_to_pixels(t["lon"], t["lat"], t["radius_m"], transform, crs="EPSG:4326")
+    np.testing.assert_allclose(px[0, :2], [99.5, 199.5], atol=1e-6)   # tank_001 sits on a pixel corner
+    np.testing.assert_allclose(px[0, 2], 45 / (0.0001 * 111_320))
+
+def test_tanks_to_pixels_puts_pixel_centres_on_integer_indices():
+    transform = from_origin(-96.80, 36.00, 0.0001, 0.0001)
+    lon, lat = transform * (60.5, 50.5)                     # centre of row 50, col 60
+    px = tanks_to_pixels([lon], [lat], [30.0], transform, crs="EPSG:4326")
+    np.testing.assert_allclose(px[0, :2], [60, 50], atol=1e-6)
+    assert rowcol(transform, lon, lat) == (int(round(px[0, 1])), int(round(px[0, 0])))
@@ -0,0 +1,48 @@
+import numpy as np
+import pandas as pd
+import rasterio
+import shapely
+from rasterio.transform import from_origin
+
+from src.pipelines.extract_week import extract_week
+from src.tanks import PointGrid, TankRegistry
+from src.utils.scene import load_tanks, tank_table, tanks_to_pixels
+
+TANKS = "data/tanks/tanks_sample.geojson"
+
+def test_registry_roundtrip_and_projection(tmp_path):
+    reg = TankRegistry.from_geojson(TANKS, site="cushing")
+    path = reg.save(tmp_path / "tanks.npz")
+    back = TankRegistry.load(path)
+    assert back.lon.dtype == np.float64 and back.radius_m.dtype == np.float32 and back.roof_code.dtype == np.int8
+    assert back.sites == ("cushing",) and back.source == reg.source
+    pd.testing.assert_frame_equal(load_tanks(path), tank_table(TANKS))
+    assert back.index_of(["tank_002", "nope"]).tolist() == [1, -1]
+
+    t = tank_table(TANKS)
+    transform = from_origin(-96.80, 36.00, 0.0001, 0.0001)
+    np.testing.assert_allclose(back.to_pixels(transform, "EPSG:32614", idx=[2]),
+                               tanks_to_pixels(t["lon"][2:], t["lat"][2:], t["radius_m"][2:], transform, "EPSG:32614"))
+    assert TankRegistry.cached({"cushing": TANKS}, tmp_path / "cache.npz").source == reg.source
+
+def test_footprint_queries_match_brute_force():
+    rng = np.random.default_rng(0)
+    lon, lat = rng.uniform(-104, -88, 20_000), rng.uniform(26, 42, 20_000)
+    grid = PointGrid(lon, lat)
+    for x0, y0 in rng.uniform([-105, 25], [-89, 41], (20, 2)):
+        box = (x0, y0, x0 + 0.8, y0 + 0.5)
+        inside = np.flatnonzero((lon >= box[0]) & (lon <= box[2]) & (lat >= box[1]) & (lat <= box[3]))
+        np.testing.assert_array_equal(grid.query(box), inside)
+
+    df = pd.DataFrame({"tank_id": [f"t{i}" for i in range(len(lon))], "lon": lon, "lat": lat, "radius_m": 40.0})
+    reg = TankRegistry.from_frame(df)
+    poly = shapely.Polygon([(-100, 30), (-98, 30), (-99, 32)])
+    idx = reg.within(poly, pad_m=0.0)
+    np.testing.assert_array_equal(idx, np.flatnonzero(shapely.contains_xy(poly, lon, lat)))
+
+def test_extract_week_skips_tanks_outside_scene(tmp_path):
+    path = tmp_path / "S1_far.tif"
+    with rasterio.open(path, "w", driver="GTiff", height=200, width=200, count=1, dtype="float32",
+                       crs="EPSG:4326", transform=from_origin(-90.0, 30.0, 0.0001, 0.0001)) as ds:
+        ds.write(np.ones((200, 200), dtype="float32"), 1)
+    assert extract_week([str(path)], TANKS, str(tmp_path / "f.csv"), "2025-01-03", workers=1) == 0